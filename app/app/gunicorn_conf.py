@@ -0,0 +1,65 @@
+"""
+Gunicorn settings for the production server.
+
+Start it with ``gunicorn -c python:app.gunicorn_conf app.wsgi``. Worker
+and thread counts default to the CPUs available to the container and
+can be overridden with WEB_CONCURRENCY and WEB_THREADS.
+"""
+
+import os
+import shutil
+
+
+def cpu_count():
+    """Returns number of CPUs this process may run on"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Load django once in the master, workers share its memory pages
+preload_app = True
+
+workers = int(os.environ.get('WEB_CONCURRENCY', cpu_count() * 2 + 1))
+threads = int(os.environ.get('WEB_THREADS', 2))
+worker_class = 'gthread' if threads > 1 else 'sync'
+
+# Replace workers after a number of requests, the jitter keeps them
+# from restarting at the same time
+max_requests = int(os.environ.get('WEB_MAX_REQUESTS', 1000))
+max_requests_jitter = max_requests // 10
+timeout = int(os.environ.get('WEB_TIMEOUT', 30))
+graceful_timeout = 30
+keepalive = 5
+
+# Heartbeat files in memory, docker mounts /tmp on the overlay disk
+worker_tmp_dir = '/dev/shm' if os.path.isdir('/dev/shm') else None
+
+accesslog = '-'
+errorlog = '-'
+
+# Workers write prometheus samples to files merged by the /metrics
+# view, the directory is emptied on every server start
+prometheus_dir = os.environ.setdefault(
+    'prometheus_multiproc_dir', '/tmp/prometheus')
+shutil.rmtree(prometheus_dir, ignore_errors=True)
+os.makedirs(prometheus_dir)
+
+
+def pre_fork(server, worker):
+    """Closes connections of the master so workers do not share them"""
+    from django.db import connections
+    from core.backends.postgresql_pool.base import close_idle_connections
+
+    connections.close_all()
+    close_idle_connections()
+
+
+def child_exit(server, worker):
+    """Removes prometheus samples of a worker which is gone"""
+    from prometheus_client import multiprocess
+
+    multiprocess.mark_process_dead(worker.pid)
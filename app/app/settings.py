@@ -12,20 +12,31 @@ https://docs.djangoproject.com/en/2.1/ref/settings/
 
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
-# Quick-start development settings - unsuitable for production
+# Development settings are used unless DJANGO_ENV is production
 # See https://docs.djangoproject.com/en/2.1/howto/deployment/checklist/
 
+PRODUCTION = os.environ.get('DJANGO_ENV') == 'production'
+
 # SECURITY WARNING: keep the secret key used in production secret!
-SECRET_KEY = '#!!6lb@_vhb*i0m*p*1_8jv4ta!3x6ao_8m1*4s5ax$50l+c-#'
+# The fallback key is public and only used for development
+if PRODUCTION and not os.environ.get('SECRET_KEY'):
+    raise ImproperlyConfigured('SECRET_KEY must be set in production')
+SECRET_KEY = os.environ.get(
+    'SECRET_KEY', '#!!6lb@_vhb*i0m*p*1_8jv4ta!3x6ao_8m1*4s5ax$50l+c-#')
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Debug mode also keeps every executed query in memory
+DEBUG = os.environ.get('DJANGO_DEBUG', '0' if PRODUCTION else '1') == '1'
 
-ALLOWED_HOSTS = []
+ALLOWED_HOSTS = [
+    host for host in os.environ.get('ALLOWED_HOSTS', '').split(',') if host
+]
 
 
 # Application definition
@@ -37,6 +48,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'rest_framework.authtoken',
     'phonenumber_field',
@@ -48,6 +60,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestMetricsMiddleware',
+    'core.middleware.CompressionMiddleware',
+    'core.middleware.SlowQueryLogMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -55,6 +71,7 @@ MIDDLEWARE = [
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'core.profiling.RequestProfilerMiddleware',
 ]
 
 ROOT_URLCONF = 'app.urls'
@@ -75,6 +92,16 @@ TEMPLATES = [
     },
 ]
 
+if not DEBUG:
+    # Compile every template only once per process
+    TEMPLATES[0]['APP_DIRS'] = False
+    TEMPLATES[0]['OPTIONS']['loaders'] = [
+        ('django.template.loaders.cached.Loader', [
+            'django.template.loaders.filesystem.Loader',
+            'django.template.loaders.app_directories.Loader',
+        ]),
+    ]
+
 WSGI_APPLICATION = 'app.wsgi.application'
 
 
@@ -85,12 +112,112 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.postgresql',
         'HOST': os.environ.get('DB_HOST'),
+        'PORT': os.environ.get('DB_PORT', ''),
         'NAME': os.environ.get('DB_NAME'),
         'USER': os.environ.get('DB_USER'),
         'PASSWORD': os.environ.get('DB_PASS'),
+        # Seconds to keep a connection open between requests
+        'CONN_MAX_AGE': int(os.environ.get(
+            'DB_CONN_MAX_AGE', 60 if PRODUCTION else 0)),
     }
 }
 
+# Read replicas, DB_REPLICA_HOSTS is a comma separated list of hosts
+# sharing name and credentials with the primary
+
+REPLICA_DATABASES = []
+for index, host in enumerate(
+        filter(None, os.environ.get('DB_REPLICA_HOSTS', '').split(',')), 1):
+    alias = f'replica{index}'
+    DATABASES[alias] = dict(
+        DATABASES['default'], HOST=host, TEST={'MIRROR': 'default'})
+    REPLICA_DATABASES.append(alias)
+
+DATABASE_ROUTERS = ['core.routers.ReplicaRouter']
+
+# Replicas lagging more are taken out of rotation until the next check
+REPLICA_MAX_LAG_SECONDS = float(
+    os.environ.get('DB_REPLICA_MAX_LAG_SECONDS', 5))
+REPLICA_CHECK_SECONDS = 5
+
+# Seconds a client reads from the primary after writing to it
+REPLICA_PIN_SECONDS = 15
+
+# Connection handling, DB_POOL_MODE is one of
+#   direct: every thread opens its own connections, kept for
+#       DB_CONN_MAX_AGE seconds
+#   pgbouncer: DB_HOST is a PgBouncer in transaction pooling mode,
+#       which cannot keep server side cursors between transactions.
+#       The server time zone must be UTC so that Django never sends a
+#       session level SET TIME ZONE
+#   pool: the threads of a worker share up to DB_POOL_SIZE connections
+DB_POOL_MODE = os.environ.get('DB_POOL_MODE', 'direct')
+
+for database in DATABASES.values():
+    if DB_POOL_MODE == 'pgbouncer':
+        database['DISABLE_SERVER_SIDE_CURSORS'] = True
+    elif DB_POOL_MODE == 'pool':
+        database.update({
+            'ENGINE': 'core.backends.postgresql_pool',
+            # Connections go back to the pool after every request
+            'CONN_MAX_AGE': 0,
+            'POOL_SIZE': int(os.environ.get('DB_POOL_SIZE', 4)),
+            'POOL_TIMEOUT': float(os.environ.get('DB_POOL_TIMEOUT', 10)),
+            # Idle connections are checked before reuse after this long
+            'POOL_CHECK_SECONDS': float(
+                os.environ.get('DB_POOL_CHECK_SECONDS', 1)),
+        })
+
+# Check persistent connections at the start of every request
+CONN_HEALTH_CHECKS = os.environ.get(
+    'DB_CONN_HEALTH_CHECKS', '1' if PRODUCTION else '0') == '1'
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.1/topics/cache/
+
+CACHES = {
+    # Shared between processes when MEMCACHED_LOCATION is set
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'default',
+    },
+    # Private to every process, for small values read on most requests
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'local',
+    },
+}
+
+if os.environ.get('MEMCACHED_LOCATION'):
+    CACHES['default'] = {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': os.environ['MEMCACHED_LOCATION'].split(','),
+        'TIMEOUT': 300,
+    }
+
+# Seconds to keep rendered catalog responses, compressed, in the cache.
+# Catalog changes only reach the other processes through a shared cache
+CATALOG_CACHE_SECONDS = int(os.environ.get(
+    'CATALOG_CACHE_SECONDS',
+    60 if PRODUCTION and os.environ.get('MEMCACHED_LOCATION') else 0))
+
+
+# Response compression
+
+# Smaller responses do not gain from compression
+COMPRESSION_MIN_SIZE = 1024
+# Media types, or type prefixes ending in /, worth compressing. Images
+# other than svg are compressed already
+COMPRESSION_CONTENT_TYPES = (
+    'text/',
+    'application/json',
+    'application/msgpack',
+    'application/javascript',
+    'application/xml',
+    'image/svg+xml',
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/2.1/ref/settings/#auth-password-validators
@@ -135,3 +262,54 @@ STATIC_ROOT = os.path.join(BASE_DIR, 'vol/web/static')
 MEDIA_ROOT = os.path.join(BASE_DIR, 'vol/web/media')
 
 AUTH_USER_MODEL = 'core.User'
+
+REST_FRAMEWORK = {
+    'DEFAULT_RENDERER_CLASSES': [
+        'core.renderers.JSONRenderer',
+        'core.renderers.MessagePackRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'core.parsers.JSONParser',
+        'core.parsers.MessagePackParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
+}
+
+# Emails match in any case
+AUTHENTICATION_BACKENDS = ['core.authentication.EmailBackend']
+
+
+# Background jobs
+
+JOB_WORKER_POOL = os.environ.get('JOB_WORKER_POOL', 'thread')
+JOB_WORKER_CONCURRENCY = int(os.environ.get('JOB_WORKER_CONCURRENCY', 4))
+JOB_RETRY_BACKOFF_SECONDS = 5
+JOB_RETRY_BACKOFF_MAX_SECONDS = 3600
+# Running jobs without a heartbeat for longer, a claim or progress
+# reported by the worker, are taken to have lost it and retried
+JOB_HEARTBEAT_TIMEOUT_SECONDS = int(
+    os.environ.get('JOB_HEARTBEAT_TIMEOUT_SECONDS', 600))
+
+
+# /metrics answers clients in these comma separated networks, and
+# requests with the header Authorization: Bearer METRICS_TOKEN
+METRICS_ALLOWED_NETWORKS = [
+    network.strip() for network in os.environ.get(
+        'METRICS_ALLOWED_NETWORKS', '127.0.0.1/32,::1/128').split(',')
+    if network.strip()
+]
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN')
+
+# Seconds the /healthz results are reused by a worker
+HEALTHZ_CACHE_SECONDS = 5
+
+
+# Slow query log, disabled unless SLOW_QUERY_LOG names a file. Every
+# worker process appends to it, it is rotated by logrotate or the like
+# moving it to SLOW_QUERY_LOG.1 and so on, workers then reopen it
+
+SLOW_QUERY_LOG = os.environ.get('SLOW_QUERY_LOG')
+SLOW_QUERY_THRESHOLD_MS = float(os.environ.get('SLOW_QUERY_THRESHOLD_MS', 100))
+SLOW_QUERY_SAMPLE_RATE = float(os.environ.get('SLOW_QUERY_SAMPLE_RATE', 1))
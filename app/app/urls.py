@@ -18,8 +18,14 @@ from django.urls import path, include
 from django.conf.urls.static import static
 from django.conf import settings
 
+from core.views import metrics, livez, readyz, healthz
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('metrics', metrics, name='metrics'),
+    path('livez', livez, name='livez'),
+    path('readyz', readyz, name='readyz'),
+    path('healthz', healthz, name='healthz'),
     path('api/user/', include('user.urls')),
     path('api/doctor/', include('doctor.urls')),
     path('api/', include('staff.urls'))
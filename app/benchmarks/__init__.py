@@ -0,0 +1,5 @@
+"""
+Benchmarks run against a local postgres database.
+
+Run them from the app directory, e.g. python -m benchmarks.load --help
+"""
@@ -0,0 +1,164 @@
+"""
+Benchmark of the database connection modes under the load test.
+
+Starts gunicorn once per mode, drives the load test mix against it and
+samples the number of server connections to the database while it runs:
+
+    python -m benchmarks.connections --workers 4 --threads 4 \
+        --pgbouncer 127.0.0.1:6432
+
+Modes are direct (a connection per request), persistent (connections
+kept between requests), pool (connections shared by the threads of a
+worker) and pgbouncer, when the address of a PgBouncer in transaction
+pooling mode in front of the same database is given.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+
+from benchmarks import load
+
+MODES = {
+    'direct': {'DB_POOL_MODE': 'direct', 'DB_CONN_MAX_AGE': '0'},
+    'persistent': {'DB_POOL_MODE': 'direct', 'DB_CONN_MAX_AGE': '60'},
+    'pool': {'DB_POOL_MODE': 'pool'},
+    'pgbouncer': {'DB_POOL_MODE': 'pgbouncer', 'DB_CONN_MAX_AGE': '60'},
+}
+
+
+class ConnectionMonitor(threading.Thread):
+    """Samples the number of connections to the database"""
+
+    def __init__(self, interval=0.05):
+        super().__init__(daemon=True)
+        self.interval = interval
+        self.samples = []
+        self.stopped = threading.Event()
+
+    def run(self):
+        from django.db import connection
+
+        try:
+            with connection.cursor() as cursor:
+                while not self.stopped.is_set():
+                    cursor.execute(
+                        'SELECT count(*) FROM pg_stat_activity '
+                        'WHERE datname = current_database() '
+                        'AND pid <> pg_backend_pid()')
+                    self.samples.append(cursor.fetchone()[0])
+                    time.sleep(self.interval)
+        finally:
+            connection.close()
+
+    def stop(self):
+        self.stopped.set()
+        self.join()
+
+
+def start_gunicorn(host, port, env):
+    """Starts gunicorn with the production settings and env overrides"""
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', '-c', 'python:app.gunicorn_conf',
+         '--bind', f'{host}:{port}', '--access-logfile', '/dev/null',
+         'app.wsgi'],
+        cwd=load.APP_DIR, env=dict(os.environ, **env),
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    load.wait_for_server(host, port)
+    return server
+
+
+def bench_mode(mode, env, args, data):
+    """Runs the load test against one mode, returns its results"""
+    from django.db import connections
+
+    connections.close_all()
+    server = start_gunicorn(args.host, args.port, env)
+    monitor = ConnectionMonitor()
+    try:
+        client = load.Client(f'http://{args.host}:{args.port}', data)
+        monitor.start()
+        samples, elapsed = load.run(client, args.requests, args.concurrency,
+                                    args.warmup)
+    finally:
+        monitor.stop()
+        server.terminate()
+        server.wait()
+
+    latencies = sorted(latency for endpoint in samples.values()
+                       for latency, _ in endpoint)
+    return {
+        'mode': mode,
+        'throughput': round(len(latencies) / elapsed, 2),
+        'p50': round(load.percentile(latencies, 50) * 1000, 2),
+        'p95': round(load.percentile(latencies, 95) * 1000, 2),
+        'p99': round(load.percentile(latencies, 99) * 1000, 2),
+        'errors': sum(1 for endpoint in samples.values()
+                      for _, code in endpoint if code >= 500),
+        'peak_connections': max(monitor.samples, default=0),
+        'mean_connections': round(
+            sum(monitor.samples) / (len(monitor.samples) or 1), 1),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8001)
+    parser.add_argument('--modes', nargs='+', default=['direct',
+                        'persistent', 'pool'], choices=MODES)
+    parser.add_argument('--pgbouncer', metavar='HOST:PORT',
+                        help='PgBouncer in front of the database')
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--pool-size', type=int, default=2,
+                        help='Connections per worker in pool mode')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--warmup', type=int, default=100)
+    parser.add_argument('--concurrency', type=int, default=32)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--procedures', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Save results to this JSON file')
+    args = parser.parse_args(argv)
+
+    modes = list(args.modes)
+    if args.pgbouncer and 'pgbouncer' not in modes:
+        modes.append('pgbouncer')
+
+    random.seed(args.seed)
+    load.setup_django()
+    data = load.seed(args.users, args.procedures)
+
+    results = []
+    for mode in modes:
+        env = dict(MODES[mode], WEB_CONCURRENCY=str(args.workers),
+                   WEB_THREADS=str(args.threads),
+                   DB_POOL_SIZE=str(args.pool_size))
+        if mode == 'pgbouncer':
+            if not args.pgbouncer:
+                parser.error('pgbouncer mode needs --pgbouncer HOST:PORT')
+            env['DB_HOST'], env['DB_PORT'] = args.pgbouncer.split(':')
+        results.append(bench_mode(mode, env, args, data))
+
+    print(f'{"mode":<12} {"req/s":>8} {"p50 ms":>8} {"p95 ms":>8} '
+          f'{"p99 ms":>8} {"errors":>6} {"peak conn":>9} {"mean conn":>9}')
+    for result in results:
+        print(f'{result["mode"]:<12} {result["throughput"]:>8} '
+              f'{result["p50"]:>8} {result["p95"]:>8} {result["p99"]:>8} '
+              f'{result["errors"]:>6} {result["peak_connections"]:>9} '
+              f'{result["mean_connections"]:>9}')
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump({'workers': args.workers, 'threads': args.threads,
+                       'results': results}, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
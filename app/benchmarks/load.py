@@ -0,0 +1,332 @@
+"""
+Load test of the main API endpoints.
+
+Seeds users and procedures through the ORM, drives a weighted mix of
+requests against a running server and reports p50/p95/p99 latency and
+throughput per endpoint. Results are saved as JSON and can be compared
+with a stored baseline:
+
+    python -m benchmarks.load --start-server --output after.json \
+        --baseline before.json
+"""
+import argparse
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Endpoint name and its share of the traffic
+MIX = (
+    ('procedure-list', 30),
+    ('procedure-detail', 20),
+    ('me-get', 15),
+    ('token', 10),
+    ('me-patch', 10),
+    ('user-signup', 5),
+    ('doctor-signup', 5),
+    ('user-image-upload', 5),
+)
+
+
+def setup_django():
+    """Sets up django to seed data through the ORM"""
+    sys.path.insert(0, APP_DIR)
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    import django
+    django.setup()
+
+
+def seed(users, procedures):
+    """Creates users and procedures used by the load test"""
+    from django.contrib.auth import get_user_model
+    from rest_framework.authtoken.models import Token
+    from core.models import Procedure, Speciality
+
+    run = uuid.uuid4().hex[:8]
+    password = 'loadtest@123'
+    accounts = []
+    for i in range(users):
+        user = get_user_model().objects.create_user(
+            email=f'loadtest-{run}-{i}@curesio.com',
+            password=password,
+            username=f'lt{run}{i}'
+        )
+        accounts.append({
+            'email': user.email,
+            'password': password,
+            'token': Token.objects.get(user=user).key
+        })
+
+    speciality, _ = Speciality.objects.get_or_create(name='loadtest')
+    procedure_ids = []
+    for i in range(procedures):
+        procedure = Procedure.objects.create(
+            name=f'loadtest {run} {i}', overview='load test procedure')
+        procedure.speciality.set([speciality])
+        procedure_ids.append(procedure.pk)
+
+    return {'accounts': accounts, 'procedures': procedure_ids,
+            'speciality': speciality.pk}
+
+
+def jpeg_bytes():
+    """Returns a small jpeg image"""
+    from PIL import Image
+
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 64)).save(buffer, format='JPEG')
+    return buffer.getvalue()
+
+
+class Client:
+    """Minimal HTTP client building the requests of each endpoint"""
+
+    def __init__(self, base_url, data):
+        self.base_url = base_url.rstrip('/')
+        self.data = data
+        self.image = jpeg_bytes()
+
+    def request(self, method, path, body=None, token=None,
+                content_type='application/json'):
+        headers = {'Accept': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Token {token}'
+        if body is not None:
+            if content_type == 'application/json':
+                body = json.dumps(body).encode()
+            headers['Content-Type'] = content_type
+
+        request = urllib.request.Request(
+            self.base_url + path, data=body, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=30) as response:
+                response.read()
+                return response.status
+        except urllib.error.HTTPError as error:
+            error.read()
+            return error.code
+
+    def multipart(self, name, filename, content):
+        boundary = uuid.uuid4().hex
+        body = (
+            f'--{boundary}\r\n'
+            f'Content-Disposition: form-data; name="{name}"; '
+            f'filename="{filename}"\r\n'
+            f'Content-Type: image/jpeg\r\n\r\n'
+        ).encode() + content + f'\r\n--{boundary}--\r\n'.encode()
+        return body, f'multipart/form-data; boundary={boundary}'
+
+    def call(self, endpoint):
+        """Sends one request to endpoint, returns the status code"""
+        account = random.choice(self.data['accounts'])
+        unique = uuid.uuid4().hex[:12]
+
+        if endpoint == 'procedure-list':
+            return self.request('GET', '/api/procedure/')
+        if endpoint == 'procedure-detail':
+            pk = random.choice(self.data['procedures'])
+            return self.request('GET', f'/api/procedure/{pk}/')
+        if endpoint == 'me-get':
+            return self.request('GET', '/api/user/me/',
+                                token=account['token'])
+        if endpoint == 'me-patch':
+            return self.request('PATCH', '/api/user/me/', {
+                'profile': {'city': random.choice(['Kolkata', 'Delhi'])}
+            }, token=account['token'])
+        if endpoint == 'token':
+            return self.request('POST', '/api/user/token/', {
+                'email': account['email'],
+                'password': account['password']
+            })
+        if endpoint == 'user-signup':
+            return self.request('POST', '/api/user/signup/', {
+                'email': f'lt-{unique}@curesio.com',
+                'password': 'loadtest@123',
+                'username': f'u{unique}'
+            })
+        if endpoint == 'doctor-signup':
+            return self.request('POST', '/api/doctor/signup/', {
+                'email': f'lt-doc-{unique}@curesio.com',
+                'password': 'loadtest@123',
+                'username': f'd{unique}',
+                'profile': {
+                    'first_name': 'Load', 'last_name': 'Test',
+                    'city': 'Kolkata', 'country': 'IN',
+                    'primary_language': 'EN'
+                },
+                'doctor_profile': {
+                    'qualification': 'MBBS',
+                    'speciality1': [self.data['speciality']]
+                }
+            })
+        if endpoint == 'user-image-upload':
+            body, content_type = self.multipart(
+                'image', 'load.jpg', self.image)
+            return self.request('POST', '/api/user/upload-image/', body,
+                                token=account['token'],
+                                content_type=content_type)
+
+        raise ValueError(f'Unknown endpoint: {endpoint}')
+
+
+def percentile(values, percent):
+    """Nearest rank percentile of sorted values"""
+    if not values:
+        return None
+    rank = max(int(round(percent / 100 * len(values))) - 1, 0)
+    return values[min(rank, len(values) - 1)]
+
+
+def summarise(samples, elapsed):
+    """Latency percentiles in ms and throughput of every endpoint"""
+    results = {}
+    for endpoint in sorted(samples):
+        latencies = sorted(latency for latency, _ in samples[endpoint])
+        errors = sum(1 for _, code in samples[endpoint] if code >= 400)
+        results[endpoint] = {
+            'requests': len(latencies),
+            'errors': errors,
+            'throughput': round(len(latencies) / elapsed, 2),
+            'p50': round(percentile(latencies, 50) * 1000, 2),
+            'p95': round(percentile(latencies, 95) * 1000, 2),
+            'p99': round(percentile(latencies, 99) * 1000, 2),
+        }
+    return results
+
+
+def run(client, requests, concurrency, warmup):
+    """Sends requests spread over the mix, returns samples and duration"""
+    endpoints = [name for name, _ in MIX]
+    weights = [weight for _, weight in MIX]
+    plan = random.choices(endpoints, weights, k=warmup + requests)
+    samples = {}
+    lock = threading.Lock()
+
+    def send(index, endpoint):
+        start = time.perf_counter()
+        code = client.call(endpoint)
+        latency = time.perf_counter() - start
+        if index >= warmup:
+            with lock:
+                samples.setdefault(endpoint, []).append((latency, code))
+
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(send, range(warmup), plan[:warmup]))
+        start = time.perf_counter()
+        list(pool.map(send, range(warmup, warmup + requests),
+                      plan[warmup:]))
+        elapsed = time.perf_counter() - start
+
+    return samples, elapsed
+
+
+def compare(results, baseline):
+    """Returns lines showing the change of each endpoint to baseline"""
+    lines = [f'{"endpoint":<20} {"metric":<11} {"baseline":>10} '
+             f'{"current":>10} {"change":>8}']
+    for endpoint, current in results['endpoints'].items():
+        previous = baseline['endpoints'].get(endpoint)
+        if not previous:
+            continue
+        for metric in ('p50', 'p95', 'p99', 'throughput'):
+            change = (current[metric] - previous[metric]) / \
+                (previous[metric] or 1) * 100
+            lines.append(
+                f'{endpoint:<20} {metric:<11} {previous[metric]:>10} '
+                f'{current[metric]:>10} {change:>+7.1f}%')
+    return lines
+
+
+def wait_for_server(host, port, timeout=30):
+    """Waits until the server accepts connections"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            socket.create_connection((host, port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError(f'Server on {host}:{port} did not start')
+
+
+def start_server(host, port):
+    """Starts the development server on host and port"""
+    server = subprocess.Popen(
+        [sys.executable, 'manage.py', 'runserver', '--noreload',
+         f'{host}:{port}'],
+        cwd=APP_DIR, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    wait_for_server(host, port)
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--start-server', action='store_true',
+                        help='Start the development server for the run')
+    parser.add_argument('--requests', type=int, default=1000)
+    parser.add_argument('--warmup', type=int, default=50)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--procedures', type=int, default=50)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='Save results to this JSON file')
+    parser.add_argument('--baseline', help='Compare with this JSON file')
+    args = parser.parse_args(argv)
+
+    random.seed(args.seed)
+    setup_django()
+    data = seed(args.users, args.procedures)
+
+    server = start_server(args.host, args.port) \
+        if args.start_server else None
+    try:
+        client = Client(f'http://{args.host}:{args.port}', data)
+        samples, elapsed = run(client, args.requests, args.concurrency,
+                               args.warmup)
+    finally:
+        if server:
+            server.terminate()
+            server.wait()
+
+    results = {
+        'meta': {
+            'requests': args.requests,
+            'concurrency': args.concurrency,
+            'seconds': round(elapsed, 2),
+            'throughput': round(args.requests / elapsed, 2),
+        },
+        'endpoints': summarise(samples, elapsed),
+    }
+
+    print(f'{"endpoint":<20} {"requests":>8} {"errors":>6} {"req/s":>8} '
+          f'{"p50 ms":>8} {"p95 ms":>8} {"p99 ms":>8}')
+    for endpoint, stats in results['endpoints'].items():
+        print(f'{endpoint:<20} {stats["requests"]:>8} {stats["errors"]:>6} '
+              f'{stats["throughput"]:>8} {stats["p50"]:>8} '
+              f'{stats["p95"]:>8} {stats["p99"]:>8}')
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline:
+            print('\n'.join(compare(results, json.load(baseline))))
+
+
+if __name__ == '__main__':
+    main()
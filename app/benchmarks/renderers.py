@@ -0,0 +1,131 @@
+"""
+Microbenchmark of the JSON renderer and parser against the rest
+framework ones built on the stdlib json module, and of the MessagePack
+renderer and parser against both.
+
+Payloads are serialized from the database, fill it first with
+generate_dataset:
+
+    python manage.py generate_dataset
+    python -m benchmarks.renderers --limit 500
+"""
+import argparse
+import io
+import json
+import timeit
+
+from benchmarks import load
+
+
+def payloads(limit):
+    """Returns the api payload shapes built from the database rows"""
+    from django.contrib.auth import get_user_model
+    from core.models import Procedure, Hospital, UserProfile
+    from doctor.serializer import ManageDoctorUserSerializer
+    from staff.serializer import ProcedureSerializer, HospitalSerializer
+
+    procedures = Procedure.objects.prefetch_related('speciality') \
+        .order_by('-name')[:limit]
+    doctors = get_user_model().objects.filter(is_doctor=True) \
+        .select_related('profile', 'doctor_profile') \
+        .prefetch_related('doctor_profile__speciality1',
+                          'doctor_profile__speciality2',
+                          'doctor_profile__speciality3',
+                          'doctor_profile__speciality4')[:limit]
+    hospitals = Hospital.objects.prefetch_related(
+        'accreditation', 'service', 'hospital_language',
+        'hospital_procedure__procedure', 'hospital_doctor__doctor'
+    )[:max(limit // 10, 1)]
+
+    return {
+        'procedure-list': ProcedureSerializer(procedures, many=True).data,
+        'doctor-profiles': ManageDoctorUserSerializer(doctors,
+                                                      many=True).data,
+        'hospital-list': HospitalSerializer(hospitals, many=True).data,
+        # Model values, with decimals, dates, phones and countries
+        'profile-values': list(UserProfile.objects.values(
+            'first_name', 'last_name', 'phone', 'country', 'date_of_birth',
+            'user__created_date', 'user__doctor_profile__experience'
+        )[:limit]),
+    }
+
+
+def best(function, number, repeat):
+    """Returns the best time of one call in milliseconds"""
+    return min(timeit.repeat(function, number=number,
+                             repeat=repeat)) / number * 1000
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--limit', type=int, default=500,
+                        help='Rows per payload')
+    parser.add_argument('--number', type=int, default=20,
+                        help='Calls per timing')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Save results to this JSON file')
+    args = parser.parse_args(argv)
+
+    load.setup_django()
+    from rest_framework import parsers, renderers
+    from core.parsers import JSONParser, MessagePackParser
+    from core.renderers import JSONRenderer, JSONEncoder, \
+        MessagePackRenderer, orjson
+
+    if orjson is None:
+        parser.error('orjson is not installed')
+
+    stdlib_renderer = renderers.JSONRenderer()
+    # The stdlib renderer can not encode phones and countries by itself
+    stdlib_renderer.encoder_class = JSONEncoder
+    renderer = JSONRenderer()
+    stdlib_parser = parsers.JSONParser()
+    fast_parser = JSONParser()
+    msgpack_renderer = MessagePackRenderer()
+    msgpack_parser = MessagePackParser()
+
+    results = []
+    for name, data in payloads(args.limit).items():
+        body = stdlib_renderer.render(data)
+        if renderer.render(data) != body:
+            raise SystemExit(f'{name}: renderers disagree')
+        packed = msgpack_renderer.render(data)
+
+        timings = {
+            'render_stdlib': best(lambda: stdlib_renderer.render(data),
+                                  args.number, args.repeat),
+            'render_orjson': best(lambda: renderer.render(data),
+                                  args.number, args.repeat),
+            'parse_stdlib': best(
+                lambda: stdlib_parser.parse(io.BytesIO(body)),
+                args.number, args.repeat),
+            'parse_orjson': best(
+                lambda: fast_parser.parse(io.BytesIO(body)),
+                args.number, args.repeat),
+            'render_msgpack': best(lambda: msgpack_renderer.render(data),
+                                   args.number, args.repeat),
+            'parse_msgpack': best(
+                lambda: msgpack_parser.parse(io.BytesIO(packed)),
+                args.number, args.repeat),
+        }
+        results.append(dict({'payload': name, 'bytes': len(body),
+                             'msgpack_bytes': len(packed)},
+                            **{key: round(value, 3)
+                               for key, value in timings.items()}))
+
+    columns = ('bytes', 'render_stdlib', 'render_orjson', 'parse_stdlib',
+               'parse_orjson', 'msgpack_bytes', 'render_msgpack',
+               'parse_msgpack')
+    print(f'{"payload":<16}' + ''.join(f' {column:>14}'
+                                       for column in columns))
+    for result in results:
+        print(f'{result["payload"]:<16}' + ''.join(
+            f' {result[column]:>14}' for column in columns))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Profiling benchmark of serializer setup with and without the field cache.
+
+Times building the fields of ManageDoctorUserSerializer and its nested
+serializers, serializing a doctor and a whole /api/doctor/me/ request,
+each with the fields built for every serializer and with the cached
+ones. Needs a doctor in the database, generate_dataset creates them:
+
+    python manage.py generate_dataset
+    python -m benchmarks.serializer_fields --profile
+"""
+import argparse
+import cProfile
+import json
+import pstats
+from unittest.mock import patch
+
+from benchmarks import load
+from benchmarks.renderers import best
+
+MODES = ('built', 'cached')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--number', type=int, default=200,
+                        help='Calls per timing')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--profile', action='store_true',
+                        help='Print the top functions of the setup')
+    parser.add_argument('--output', help='Save results to this JSON file')
+    args = parser.parse_args(argv)
+
+    load.setup_django()
+    from django.contrib.auth import get_user_model
+    from rest_framework.test import APIRequestFactory, force_authenticate
+    from core.serializers import CachedFieldsMixin
+    from doctor.serializer import ManageDoctorUserSerializer
+    from doctor.views import ManageDoctorUserView
+
+    doctor = get_user_model().objects.filter(is_doctor=True) \
+        .select_related('profile', 'doctor_profile').first()
+    if doctor is None:
+        parser.error('no doctor in the database')
+    request = APIRequestFactory().get('/api/doctor/me/')
+    force_authenticate(request, doctor)
+    view = ManageDoctorUserView.as_view()
+
+    def setup():
+        serializer = ManageDoctorUserSerializer(doctor)
+        serializer.fields['profile'].fields
+        serializer.fields['doctor_profile'].fields
+
+    def serialize():
+        return ManageDoctorUserSerializer(doctor).data
+
+    def me():
+        return view(request).render()
+
+    benchmarks = {'setup': setup, 'serialize': serialize, 'me': me}
+    results = {}
+    for mode in MODES:
+        with patch.object(CachedFieldsMixin, 'cache_fields',
+                          mode == 'cached'):
+            serialize()
+            results[mode] = {
+                name: round(best(function, args.number, args.repeat), 3)
+                for name, function in benchmarks.items()
+            }
+            if args.profile:
+                profile = cProfile.Profile()
+                profile.runcall(
+                    lambda: [setup() for _ in range(args.number)])
+                print(f'{mode} fields, {args.number} setups')
+                pstats.Stats(profile).sort_stats('cumulative') \
+                    .print_stats(12)
+
+    print(f'{"ms":<10}' + ''.join(f' {mode:>10}' for mode in MODES))
+    for name in benchmarks:
+        print(f'{name:<10}' + ''.join(
+            f' {results[mode][name]:>10}' for mode in MODES))
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(results, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
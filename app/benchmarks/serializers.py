@@ -0,0 +1,72 @@
+"""
+Benchmark of the procedure list fast path against ProcedureSerializer.
+
+Both sides run the query and render the page to JSON, the rendered
+bytes are checked to be the same. Fill the database with at least a
+page of procedures first:
+
+    python manage.py generate_dataset --procedures 10000
+    python -m benchmarks.serializers --rows 10000
+"""
+import argparse
+import json
+
+from benchmarks import load
+from benchmarks.renderers import best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--rows', type=int, default=10000,
+                        help='Procedures per page')
+    parser.add_argument('--number', type=int, default=3,
+                        help='Calls per timing')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--output', help='Save results to this JSON file')
+    args = parser.parse_args(argv)
+
+    load.setup_django()
+    from django.db.models import Prefetch
+    from core.models import Procedure, Speciality
+    from core.renderers import JSONRenderer
+    from staff.serializer import ProcedureSerializer, procedure_values
+
+    queryset = Procedure.objects.prefetch_related(Prefetch(
+        'speciality', queryset=Speciality.objects.order_by('id')
+    )).order_by('-name')
+    page = queryset.filter(pk__in=queryset.values('pk')[:args.rows])
+    rows = page.count()
+    if rows < args.rows:
+        print(f'only {rows} procedures in the database')
+
+    renderer = JSONRenderer()
+
+    def serializer():
+        return renderer.render(ProcedureSerializer(page, many=True).data)
+
+    def fast_path():
+        return renderer.render(procedure_values(page))
+
+    if serializer() != fast_path():
+        raise SystemExit('fast path output differs from the serializer')
+
+    result = {
+        'rows': rows,
+        'bytes': len(fast_path()),
+        'serializer_ms': round(best(serializer, args.number,
+                                    args.repeat), 3),
+        'fast_path_ms': round(best(fast_path, args.number, args.repeat), 3),
+    }
+    result['speedup'] = round(
+        result['serializer_ms'] / result['fast_path_ms'], 2)
+
+    for key, value in result.items():
+        print(f'{key:<14} {value:>12}')
+
+    if args.output:
+        with open(args.output, 'w') as output:
+            json.dump(result, output, indent=2)
+
+
+if __name__ == '__main__':
+    main()
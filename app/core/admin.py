@@ -1,7 +1,47 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
+from django.utils.text import smart_split, unescape_string_literal
 from django.utils.translation import gettext as _
-from core import models
+from core import models, jobs
+
+
+class TrigramSearchMixin:
+    """
+    Admin search that looks up every search field on its own index.
+
+    Each term is matched with icontains against trigram_search_fields
+    (backed by pg_trgm GIN indexes) and exactly against the upper case
+    code fields in code_search_fields. The matching primary keys of all
+    fields are combined with UNION, so postgres does one index scan per
+    field instead of a sequential scan over a multi-column OR.
+    """
+    trigram_search_fields = ()
+    code_search_fields = ()
+
+    def get_search_fields(self, request):
+        """Search fields shown in the admin search box"""
+        return list(self.trigram_search_fields) + \
+            list(self.code_search_fields)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Filters queryset by the per field index lookups"""
+        manager = queryset.model._default_manager
+
+        for bit in smart_split(search_term):
+            if bit.startswith(('"', "'")):
+                bit = unescape_string_literal(bit)
+
+            lookups = [
+                manager.filter(**{f'{field}__icontains': bit}).values('pk')
+                for field in self.trigram_search_fields
+            ] + [
+                manager.filter(**{field: bit.upper()}).values('pk')
+                for field in self.code_search_fields
+            ]
+            matches = lookups[0].union(*lookups[1:])
+            queryset = queryset.filter(pk__in=matches)
+
+        return queryset, False
 
 
 class ProfileInline(admin.StackedInline):
@@ -21,28 +61,38 @@ class DoctorProfileInline(admin.StackedInline):
     classes = ['collapse', ]
 
 
-class CustomUserAdmin(UserAdmin):
+class CustomUserAdmin(TrigramSearchMixin, UserAdmin):
+
+    def queue_user_update(self, request, queryset, **values):
+        """Queues a background job updating selected accounts"""
+        pks = list(queryset.values_list('pk', flat=True))
+        job = jobs.enqueue('core.update_users', pks=pks, values=values)
+        self.message_user(
+            request,
+            _('Queued job #%(job)s to update %(count)s accounts.') % {
+                'job': job.pk, 'count': len(pks)}
+        )
 
     def activate_accounts(self, request, queryset):
         """Activates selected accounts"""
-        queryset.update(is_active=True)
+        self.queue_user_update(request, queryset, is_active=True)
 
     def deactivate_accounts(self, request, queryset):
         """Deactivates selected accounts"""
-        queryset.update(is_active=False)
+        self.queue_user_update(request, queryset, is_active=False)
 
     def add_staff_permission(self, request, queryset):
         """Adds staff permission to selected accounts"""
-        queryset.update(is_staff=True)
+        self.queue_user_update(request, queryset, is_staff=True)
 
     def remove_staff_permission(self, request, queryset):
-        """Adds staff permission to selected accounts"""
-        queryset.update(is_staff=False)
+        """Removes staff permission from selected accounts"""
+        self.queue_user_update(request, queryset, is_staff=False)
 
     activate_accounts.short_description = 'Activate accounts'
     deactivate_accounts.short_description = 'Deactivate accounts'
-    add_staff_permission.short_descriptin = 'Add Staff permission'
-    remove_staff_permission.short_descriptin = 'Remove Staff permission'
+    add_staff_permission.short_description = 'Add Staff permission'
+    remove_staff_permission.short_description = 'Remove Staff permission'
 
     ordering = ['id']
     list_display = [
@@ -51,7 +101,7 @@ class CustomUserAdmin(UserAdmin):
     ]
     list_filter = ('is_superuser', 'is_staff', 'is_doctor', 'is_active')
     inlines = (ProfileInline, DoctorProfileInline, )
-    search_fields = ['email', 'username', ]
+    trigram_search_fields = ['email', 'username', ]
     actions = [
         activate_accounts,
         deactivate_accounts,
@@ -80,16 +130,16 @@ class CustomUserAdmin(UserAdmin):
     )
 
 
-class CustomUserProfile(admin.ModelAdmin):
+class CustomUserProfile(TrigramSearchMixin, admin.ModelAdmin):
     """Customizing the user profile admin page"""
     list_display = ['user', 'first_name', 'last_name',
                     'city', 'country', 'phone',
                     'primary_language', 'secondary_language',
                     'tertiary_language']
-    search_fields = ['user__username', 'first_name',
-                     'last_name', 'city', 'country',
-                     'primary_language', 'secondary_language',
-                     'tertiary_language']
+    trigram_search_fields = ['user__username', 'first_name',
+                             'last_name', 'city']
+    code_search_fields = ['country', 'primary_language',
+                          'secondary_language', 'tertiary_language']
     list_filter = ('country', )
     fieldsets = (
         (
@@ -266,6 +316,26 @@ class CustomAccreditation(admin.ModelAdmin):
     list_filter = ('hospital', )
 
 
+class CustomJob(admin.ModelAdmin):
+    """Customising the background jobs admin view"""
+    list_display = ('__str__', 'status', 'progress', 'created_date',
+                    'finished_date')
+    list_filter = ('status', 'name')
+    readonly_fields = ('name', 'payload', 'status', 'total', 'processed',
+                       'error', 'created_date', 'started_date',
+                       'heartbeat_date', 'finished_date')
+
+    def progress(self, obj):
+        """Processed items out of total"""
+        if not obj.total:
+            return '-'
+        percent = obj.processed * 100 // obj.total
+        return f'{obj.processed} / {obj.total} ({percent}%)'
+
+    def has_add_permission(self, request):
+        return False
+
+
 admin.site.register(models.User, CustomUserAdmin)
 admin.site.register(models.UserProfile, CustomUserProfile)
 admin.site.register(models.Doctor, CustomDoctor)
@@ -275,3 +345,4 @@ admin.site.register(models.Accreditation, CustomAccreditation)
 admin.site.register(models.Service, CustomService)
 admin.site.register(models.HospitalDoctor)
 admin.site.register(models.Hospital, CustomHospital)
+admin.site.register(models.Job, CustomJob)
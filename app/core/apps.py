@@ -1,5 +1,14 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from core import checks  # noqa: F401
+        from core.db import close_unusable_connections
+
+        if settings.CONN_HEALTH_CHECKS:
+            request_started.connect(close_unusable_connections)
@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+
+class EmailBackend(ModelBackend):
+    """
+    Authenticates with the email in any case. Users are looked up
+    through the unique index on lower(email), permissions are checked
+    like ModelBackend does.
+    """
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        user_model = get_user_model()
+        if username is None:
+            username = kwargs.get(user_model.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+
+        try:
+            user = user_model._default_manager.get_by_email(username)
+        except user_model.DoesNotExist:
+            # Hash the password anyway so that unknown emails take as
+            # long to reject as wrong passwords
+            user_model().set_password(password)
+            return None
+
+        if user.check_password(password) and \
+                self.user_can_authenticate(user):
+            return user
+        return None
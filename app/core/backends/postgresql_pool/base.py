@@ -0,0 +1,161 @@
+"""
+PostgreSQL backend sharing a bounded pool of connections between the
+threads of a process.
+
+Closing a connection returns it to the pool, so connections should not
+be persistent (CONN_MAX_AGE 0). POOL_SIZE in the database settings caps
+the connections of the process, a thread waits up to POOL_TIMEOUT
+seconds for a free one. A connection idle for POOL_CHECK_SECONDS or
+more is checked with SELECT 1 before it is handed out again.
+"""
+import os
+import threading
+import time
+
+import psycopg2
+from psycopg2 import extensions
+
+from django.db.backends.postgresql import base
+
+
+class ConnectionPool:
+    """Bounded pool of psycopg2 connections"""
+
+    def __init__(self, size, timeout, check_seconds=1):
+        self.size = size
+        self.timeout = timeout
+        self.check_seconds = check_seconds
+        # (connection, time it was returned) pairs, newest last
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(size)
+
+    def get(self, conn_params):
+        """Returns an idle connection or opens a new one"""
+        if not self._slots.acquire(timeout=self.timeout):
+            raise psycopg2.OperationalError(
+                f'No free connection in the pool of {self.size} after '
+                f'{self.timeout} seconds')
+        try:
+            while True:
+                with self._lock:
+                    if not self._idle:
+                        break
+                    connection, returned_at = self._idle.pop()
+                if self.usable(connection, returned_at):
+                    return connection
+            return psycopg2.connect(**conn_params)
+        except Exception:
+            self._slots.release()
+            raise
+
+    def usable(self, connection, returned_at):
+        """
+        Returns whether the idle connection still reaches the server.
+        psycopg2 only marks a connection closed once it fails, so after
+        a server restart the idle ones are dropped together.
+        """
+        if connection.closed:
+            return False
+        if time.monotonic() - returned_at < self.check_seconds:
+            return True
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT 1')
+            if connection.info.transaction_status != \
+                    extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+        except psycopg2.Error:
+            connection.close()
+            self.close_idle()
+            return False
+        return True
+
+    def put(self, connection):
+        """Returns the connection to the pool in a clean state"""
+        try:
+            if connection.closed:
+                return
+            status = connection.info.transaction_status
+            if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+                # The server connection was lost
+                connection.close()
+                return
+            if status != extensions.TRANSACTION_STATUS_IDLE:
+                connection.rollback()
+            with self._lock:
+                self._idle.append((connection, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close_idle(self):
+        """Closes the idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for connection, returned_at in idle:
+            connection.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+# Pools inherited from the parent process, their sockets are shared with
+# it and closing them in the child would end the parent's sessions
+_inherited_pools = []
+
+
+def get_pool(alias, settings_dict):
+    """Returns the pool of the database alias in this process"""
+    with _pools_lock:
+        if alias not in _pools:
+            _pools[alias] = ConnectionPool(
+                settings_dict.get('POOL_SIZE', 4),
+                settings_dict.get('POOL_TIMEOUT', 10),
+                settings_dict.get('POOL_CHECK_SECONDS', 1)
+            )
+        return _pools[alias]
+
+
+def close_idle_connections():
+    """Closes the idle connections of every pool in this process"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close_idle()
+
+
+def _forget_pools():
+    """Starts a forked child without connections"""
+    global _pools_lock
+    _inherited_pools.extend(_pools.values())
+    _pools.clear()
+    _pools_lock = threading.Lock()
+
+
+if hasattr(os, 'register_at_fork'):
+    os.register_at_fork(after_in_child=_forget_pools)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+
+    def get_new_connection(self, conn_params):
+        connection = get_pool(self.alias, self.settings_dict).get(
+            conn_params)
+
+        # Same as the postgresql backend after connecting
+        options = self.settings_dict['OPTIONS']
+        try:
+            self.isolation_level = options['isolation_level']
+        except KeyError:
+            self.isolation_level = connection.isolation_level
+        else:
+            if self.isolation_level != connection.isolation_level:
+                connection.set_session(isolation_level=self.isolation_level)
+
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            with self.wrap_database_errors:
+                get_pool(self.alias, self.settings_dict).put(
+                    self.connection)
@@ -0,0 +1,73 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core import compression, routers
+
+CATALOG_VERSION_KEY = 'catalog-version'
+
+
+def catalog_version():
+    """Returns the version of the catalog the cached responses belong to"""
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        # Starting from the time never reuses the keys of a version
+        # evicted from the cache
+        cache.add(CATALOG_VERSION_KEY, int(time.time() * 1000))
+        version = cache.get(CATALOG_VERSION_KEY)
+    return version
+
+
+def catalog_changed():
+    """Moves the cached catalog responses to a new version"""
+    try:
+        cache.incr(CATALOG_VERSION_KEY)
+    except ValueError:
+        cache.set(CATALOG_VERSION_KEY, int(time.time() * 1000))
+
+
+def catalog_cache_key(request):
+    """Cache key of the response to the url in the accepted media type"""
+    url = request.build_absolute_uri()
+    digest = hashlib.md5(
+        f'{url} {request.accepted_media_type}'.encode()).hexdigest()
+    return f'catalog:{catalog_version()}:{digest}'
+
+
+class CatalogCacheMixin:
+    """
+    Keeps rendered catalog responses in the cache for
+    CATALOG_CACHE_SECONDS. They are stored compressed, a hot response
+    is compressed once instead of on every request. Responses are
+    always rendered from the primary before they are cached. Views wrap
+    their GET handlers with cached_response.
+    """
+    cache_formats = ('json', 'msgpack')
+
+    def cached_response(self, handler, request, *args, **kwargs):
+        renderer = request.accepted_renderer
+        if not settings.CATALOG_CACHE_SECONDS or \
+                renderer.format not in self.cache_formats:
+            return handler(request, *args, **kwargs)
+
+        key = catalog_cache_key(request)
+        entry = cache.get(key)
+        if entry is None:
+            # A lagging replica would keep the catalog from before the
+            # last change in the new version
+            routers.read_from_primary()
+            response = handler(request, *args, **kwargs)
+            if response.status_code != 200:
+                return response
+            content = renderer.render(response.data,
+                                      request.accepted_media_type,
+                                      self.get_renderer_context())
+            content_type = renderer.media_type
+            if renderer.charset:
+                content_type += f'; charset={renderer.charset}'
+            entry = compression.precompress(content, content_type)
+            cache.set(key, entry, settings.CATALOG_CACHE_SECONDS)
+
+        return compression.cached_response(request, entry)
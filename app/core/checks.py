@@ -0,0 +1,43 @@
+from django.conf import settings
+from django.core import checks
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@checks.register()
+def check_catalog_cache(app_configs, **kwargs):
+    """
+    Catalog responses are dropped by moving the shared catalog version,
+    with a cache private to every process the other workers keep
+    serving the old catalog.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.CATALOG_CACHE_SECONDS and not settings.DEBUG and \
+            backend in PROCESS_LOCAL_CACHES:
+        return [checks.Error(
+            'CATALOG_CACHE_SECONDS needs a cache shared between processes.',
+            hint='Set MEMCACHED_LOCATION or CATALOG_CACHE_SECONDS=0.',
+            id='core.E001',
+        )]
+    return []
+
+
+@checks.register()
+def check_replica_pin_cache(app_configs, **kwargs):
+    """
+    Token clients send no cookie, they are kept on the primary after a
+    write by an entry in the default cache, which the next request must
+    find whichever worker serves it.
+    """
+    backend = settings.CACHES['default']['BACKEND']
+    if settings.REPLICA_DATABASES and not settings.DEBUG and \
+            backend in PROCESS_LOCAL_CACHES:
+        return [checks.Error(
+            'REPLICA_DATABASES needs a cache shared between processes.',
+            hint='Set MEMCACHED_LOCATION or leave out DB_REPLICA_HOSTS.',
+            id='core.E002',
+        )]
+    return []
@@ -0,0 +1,132 @@
+import gzip
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_sequence
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Levels for responses compressed on every request, cached responses
+# are compressed once and use the slower best levels
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+BEST_GZIP_LEVEL = 9
+BEST_BROTLI_QUALITY = 9
+
+
+def available_encodings():
+    """Returns the supported content codings, preferred first"""
+    return ('br', 'gzip') if brotli is not None else ('gzip', )
+
+
+def accepted_encodings(request):
+    """
+    Returns the content codings of Accept-Encoding with their q values,
+    codings refused with q=0 included. Codings with an invalid q value
+    are left out.
+    """
+    accepted = {}
+    for part in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        coding, _, params = part.partition(';')
+        coding = coding.strip().lower()
+        quality = params.strip().lower()
+        if not coding:
+            continue
+        if quality.startswith('q='):
+            try:
+                accepted[coding] = float(quality[2:])
+            except ValueError:
+                continue
+        else:
+            accepted[coding] = 1.0
+    return accepted
+
+
+def choose_encoding(request, encodings):
+    """
+    Returns the one of encodings with the highest q value the client
+    accepts, the earlier one on a tie, or None. * stands for the
+    codings Accept-Encoding does not name.
+    """
+    accepted = accepted_encodings(request)
+    chosen, chosen_quality = None, 0
+    for encoding in encodings:
+        quality = accepted.get(encoding, accepted.get('*', 0))
+        if quality > chosen_quality:
+            chosen, chosen_quality = encoding, quality
+    return chosen
+
+
+def compressible(content_type):
+    """Checks content type against COMPRESSION_CONTENT_TYPES"""
+    media_type = content_type.split(';')[0].strip().lower()
+    return any(
+        media_type.startswith(allowed) if allowed.endswith('/')
+        else media_type == allowed
+        for allowed in settings.COMPRESSION_CONTENT_TYPES
+    )
+
+
+def compress(content, encoding, best=False):
+    """Compresses bytes with the content coding"""
+    if encoding == 'br':
+        return brotli.compress(
+            content, quality=BEST_BROTLI_QUALITY if best else BROTLI_QUALITY)
+    return gzip.compress(
+        content, compresslevel=BEST_GZIP_LEVEL if best else GZIP_LEVEL,
+        mtime=0)
+
+
+def compress_stream(chunks, encoding):
+    """Compresses streamed chunks, flushing the output after each one"""
+    if encoding == 'gzip':
+        yield from compress_sequence(chunks)
+        return
+
+    compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+    for chunk in chunks:
+        data = compressor.process(chunk) + compressor.flush()
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+def precompress(content, content_type):
+    """
+    Returns a cache entry with the content compressed in every
+    supported coding, content too small or not compressible is kept
+    as it is.
+    """
+    entry = {'content_type': content_type}
+    if len(content) < settings.COMPRESSION_MIN_SIZE or \
+            not compressible(content_type):
+        entry['content'] = content
+    else:
+        entry['encodings'] = {
+            encoding: compress(content, encoding, best=True)
+            for encoding in available_encodings()
+        }
+    return entry
+
+
+def cached_response(request, entry):
+    """Returns a response with the encoding of entry the client accepts"""
+    encodings = entry.get('encodings')
+    if not encodings:
+        return HttpResponse(entry['content'],
+                            content_type=entry['content_type'])
+
+    encoding = choose_encoding(request, encodings)
+    if encoding is None:
+        response = HttpResponse(gzip.decompress(encodings['gzip']),
+                                content_type=entry['content_type'])
+    else:
+        response = HttpResponse(encodings[encoding],
+                                content_type=entry['content_type'])
+        response['Content-Encoding'] = encoding
+    patch_vary_headers(response, ('Accept-Encoding', ))
+    return response
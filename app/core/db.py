@@ -0,0 +1,28 @@
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+
+
+def close_unusable_connections(**kwargs):
+    """
+    Closes persistent connections which stopped working since the last
+    request, for example after a database restart, so that the request
+    opens a new connection instead of failing on its first query.
+    """
+    for connection in connections.all():
+        if connection.connection is not None and \
+                connection.settings_dict['CONN_MAX_AGE'] and \
+                not connection.is_usable():
+            connection.close()
+
+
+@contextmanager
+def execute_wrapper(wrapper):
+    """
+    Installs the execute wrapper on the connections of every database,
+    so that queries routed to a replica are seen as well
+    """
+    with ExitStack() as stack:
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(wrapper))
+        yield
@@ -0,0 +1,86 @@
+import logging
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connection
+
+
+def check_database():
+    """Runs a query on the default database"""
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+def check_cache():
+    """Writes and reads back a value in the default cache"""
+    value = str(time.time())
+    cache.set('healthz', value, 10)
+    if cache.get('healthz') != value:
+        raise RuntimeError('cache did not return the stored value')
+
+
+def check_media():
+    """Checks that uploads can be written to the media volume"""
+    if not os.path.isdir(settings.MEDIA_ROOT):
+        raise RuntimeError(f'{settings.MEDIA_ROOT} does not exist')
+    if not os.access(settings.MEDIA_ROOT, os.W_OK):
+        raise RuntimeError(f'{settings.MEDIA_ROOT} is not writable')
+
+
+CHECKS = (
+    ('database', check_database),
+    ('cache', check_cache),
+    ('media', check_media),
+)
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_result = None
+_checked_at = 0.0
+
+
+def run_checks():
+    """Runs every check, returns whether all passed and their results"""
+    results = {}
+    for name, check in CHECKS:
+        start = time.perf_counter()
+        try:
+            check()
+        except Exception:
+            # The public results leave out hosts and paths in the error
+            logger.exception('Health check %s failed', name)
+            results[name] = {'ok': False}
+        else:
+            results[name] = {'ok': True}
+        results[name]['duration_ms'] = round(
+            (time.perf_counter() - start) * 1000, 3)
+    return all(result['ok'] for result in results.values()), results
+
+
+def health():
+    """
+    Returns results of the checks, reusing them for HEALTHZ_CACHE_SECONDS
+    so that frequent probes do not load the database. Only one thread of
+    the process runs the checks at a time.
+    """
+    global _result, _checked_at
+
+    with _lock:
+        if _result is None or \
+                time.monotonic() - _checked_at >= \
+                settings.HEALTHZ_CACHE_SECONDS:
+            _result = run_checks()
+            _checked_at = time.monotonic()
+        return _result
+
+
+def reset():
+    """Forgets the cached results"""
+    global _result
+
+    with _lock:
+        _result = None
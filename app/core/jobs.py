@@ -0,0 +1,194 @@
+import datetime
+import traceback
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Job
+from core.signals import users_bulk_updated
+
+# Maps job name to the function running it
+registry = {}
+
+
+def register(name):
+    """Decorator registering function as a job with given name"""
+    def decorator(func):
+        registry[name] = func
+        return func
+    return decorator
+
+
+def enqueue(name, max_attempts=3, **payload):
+    """
+    Creates a queued job, payload is passed to the job function.
+
+    The job row is written in the caller's transaction, so workers only
+    see it once that transaction commits and a rolled back request never
+    leaves a job behind.
+    """
+    if name not in registry:
+        raise ValueError(f'Unknown job: {name}')
+
+    return Job.objects.create(
+        name=name, payload=payload, max_attempts=max_attempts)
+
+
+def retry_delay(attempts):
+    """Returns seconds to wait before retrying after given attempts"""
+    delay = settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1)
+    return min(delay, settings.JOB_RETRY_BACKOFF_MAX_SECONDS)
+
+
+def claim_job():
+    """
+    Marks the oldest due queued job as running and returns it.
+
+    Rows locked by other workers are skipped so that several workers
+    never claim the same job. Returns None if no job is due.
+    """
+    with transaction.atomic():
+        job = Job.objects.select_for_update(skip_locked=True)\
+            .filter(status=Job.QUEUED, run_after__lte=timezone.now())\
+            .order_by('run_after', 'id').first()
+
+        if job:
+            job.status = Job.RUNNING
+            job.attempts += 1
+            job.started_date = job.heartbeat_date = timezone.now()
+            job.save(update_fields=['status', 'attempts', 'started_date',
+                                    'heartbeat_date'])
+
+    return job
+
+
+def fail_job(job, error):
+    """
+    Records a failed attempt of the job and saves it, returns whether
+    the attempt was still the running one.
+
+    The job is queued again with exponential backoff until it has used
+    up max_attempts.
+    """
+    job.error = error
+    if job.attempts < job.max_attempts:
+        job.status = Job.QUEUED
+        job.run_after = timezone.now() + datetime.timedelta(
+            seconds=retry_delay(job.attempts))
+    else:
+        job.status = Job.FAILED
+
+    job.finished_date = timezone.now()
+    return bool(job.attempt().update(
+        status=job.status, error=job.error, run_after=job.run_after,
+        finished_date=job.finished_date))
+
+
+def run_job(job):
+    """
+    Runs a claimed job and records the outcome. The outcome is not
+    saved if the job was taken for stale and claimed again meanwhile.
+    """
+    try:
+        registry[job.name](job, **job.payload)
+    except Exception:
+        fail_job(job, traceback.format_exc())
+        return job
+
+    finished_date = timezone.now()
+    job.attempt().update(status=Job.DONE, finished_date=finished_date)
+    job.status = Job.DONE
+    job.finished_date = finished_date
+
+    return job
+
+
+def requeue_stale_jobs():
+    """
+    Records a failed attempt for the running jobs without a heartbeat
+    in the last JOB_HEARTBEAT_TIMEOUT_SECONDS and returns them. Their
+    worker was stopped before it could record the outcome, so they are
+    queued again with backoff like other failed jobs.
+    """
+    timeout = timezone.now() - datetime.timedelta(
+        seconds=settings.JOB_HEARTBEAT_TIMEOUT_SECONDS)
+    with transaction.atomic():
+        stale = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.RUNNING, heartbeat_date__lt=timeout)
+        )
+        for job in stale:
+            fail_job(job, 'The worker stopped while running the job.')
+
+    return stale
+
+
+def run_pending_jobs():
+    """Runs due jobs until none is left, returns number of jobs run"""
+    requeue_stale_jobs()
+    count = 0
+    job = claim_job()
+    while job:
+        run_job(job)
+        count += 1
+        job = claim_job()
+
+    return count
+
+
+@register('core.noop')
+def noop(job):
+    """Does nothing, used for benchmarking the queue"""
+
+
+@register('core.delete_files')
+def delete_files(job, names):
+    """Deletes files from the default storage"""
+    for name in names:
+        default_storage.delete(name)
+
+
+def _update_user_chunk(pks, values, skip_locked):
+    """Updates one chunk of users, returns the pks that were updated"""
+    users = get_user_model().objects
+
+    with transaction.atomic():
+        locked = list(
+            users.select_for_update(skip_locked=skip_locked)
+            .filter(pk__in=pks).values_list('pk', flat=True)
+        )
+        users.filter(pk__in=locked).update(**values)
+
+        # Invalidating caches once the chunk is committed
+        transaction.on_commit(lambda: users_bulk_updated.send(
+            sender=get_user_model(), pks=locked, values=values))
+
+    return locked
+
+
+@register('core.update_users')
+def update_users(job, pks, values, chunk_size=500):
+    """
+    Updates fields of the given users in chunks.
+
+    Each chunk is its own transaction, rows locked by another
+    transaction are skipped and retried in a final pass which waits
+    for the locks, so one busy row does not hold up the whole job.
+    """
+    job.set_total(len(pks))
+    skipped = []
+
+    for start in range(0, len(pks), chunk_size):
+        chunk = pks[start:start + chunk_size]
+        locked = _update_user_chunk(chunk, values, skip_locked=True)
+        skipped.extend(set(chunk) - set(locked))
+        job.add_progress(len(locked))
+
+    for start in range(0, len(skipped), chunk_size):
+        chunk = skipped[start:start + chunk_size]
+        _update_user_chunk(chunk, values, skip_locked=False)
+        # Counting deleted users as processed as well
+        job.add_progress(len(chunk))
@@ -0,0 +1,39 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.models import Job
+from core.worker import run_workers
+
+
+class Command(BaseCommand):
+    """
+    Django command to measure job queue throughput.
+
+    Queues no-op jobs and drains them with each given concurrency, run
+    it against a local postgres database, e.g.
+    python manage.py benchmark_jobs --jobs 5000 --concurrency 1 4 8
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--jobs', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, nargs='+',
+                            default=[1, 2, 4, 8])
+        parser.add_argument('--pool', choices=('thread', 'process'),
+                            default='thread')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"workers":>8} {"seconds":>10} {"jobs/s":>10}')
+
+        for concurrency in options['concurrency']:
+            Job.objects.bulk_create(
+                Job(name='core.noop') for _ in range(options['jobs']))
+
+            start = time.perf_counter()
+            run_workers(concurrency, pool=options['pool'], once=True)
+            elapsed = time.perf_counter() - start
+
+            Job.objects.filter(name='core.noop').delete()
+            self.stdout.write(
+                f'{concurrency:>8} {elapsed:>10.2f} '
+                f'{options["jobs"] / elapsed:>10.0f}')
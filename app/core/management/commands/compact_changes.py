@@ -0,0 +1,36 @@
+import datetime
+
+from django.core.management.base import BaseCommand
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from core.models import Change
+
+
+class Command(BaseCommand):
+    """
+    Django command to compact the catalog change outbox.
+
+    Removes changes older than the given number of days when a newer
+    change of the same object exists, the newest change of every object
+    is kept so that slow consumers still see its latest action.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=7,
+            help='Only compact changes older than this many days')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        newer = Change.objects.filter(
+            model=OuterRef('model'),
+            object_id=OuterRef('object_id'),
+            id__gt=OuterRef('id')
+        )
+        superseded = Change.objects.filter(created_date__lt=cutoff)\
+            .annotate(superseded=Exists(newer))\
+            .filter(superseded=True).values('id')
+
+        count, _ = Change.objects.filter(id__in=superseded).delete()
+        self.stdout.write(self.style.SUCCESS(f'Removed {count} change(s)'))
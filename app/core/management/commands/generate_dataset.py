@@ -0,0 +1,394 @@
+import datetime
+import hashlib
+import io
+import os
+import random
+
+from PIL import Image
+
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from core import models
+
+FIRST_NAMES = (
+    'Aarav', 'Abhishek', 'Aditi', 'Amit', 'Ananya', 'Anjali', 'Arjun',
+    'Deepak', 'Divya', 'Gaurav', 'Ishaan', 'Kavya', 'Manish', 'Meera',
+    'Neha', 'Pooja', 'Priya', 'Rahul', 'Rohan', 'Sanjay', 'Shreya',
+    'Sneha', 'Sourav', 'Sunita', 'Tanvi', 'Vikram', 'Vivek', 'Zara',
+)
+LAST_NAMES = (
+    'Banerjee', 'Bose', 'Chatterjee', 'Das', 'Ghosh', 'Gupta', 'Iyer',
+    'Jain', 'Kumar', 'Mehta', 'Mukherjee', 'Nair', 'Patel', 'Rao',
+    'Reddy', 'Roy', 'Sen', 'Shah', 'Sharma', 'Singh', 'Verma',
+)
+CITIES = (
+    'Kolkata', 'Delhi', 'Mumbai', 'Chennai', 'Bengaluru', 'Hyderabad',
+    'Pune', 'Ahmedabad', 'Jaipur', 'Lucknow', 'Patna', 'Bhubaneswar',
+)
+SPECIALITIES = (
+    'cardiology', 'orthopedics', 'neurology', 'oncology', 'urology',
+    'nephrology', 'gastroenterology', 'dermatology', 'ophthalmology',
+    'ent', 'gynecology', 'pediatrics', 'psychiatry', 'pulmonology',
+    'endocrinology', 'rheumatology', 'hematology', 'radiology',
+    'dentistry', 'plastic surgery', 'general surgery', 'neurosurgery',
+    'cardiac surgery', 'vascular surgery', 'transplant surgery',
+)
+PROCEDURE_WORDS = (
+    'knee', 'hip', 'heart', 'kidney', 'liver', 'spine', 'eye', 'lung',
+    'shoulder', 'brain', 'skin', 'dental', 'bypass', 'valve', 'cataract',
+)
+PROCEDURE_KINDS = (
+    'replacement', 'surgery', 'transplant', 'biopsy', 'repair',
+    'reconstruction', 'therapy', 'implant', 'screening',
+)
+SERVICES = (
+    'ICU', 'Pharmacy', 'Ambulance', 'Blood bank', 'Cafeteria',
+    'Radiology', 'Pathology', 'Dialysis', 'Physiotherapy', 'Emergency',
+    'Parking', 'Interpreter', 'Airport pickup', 'Wifi', 'Prayer room',
+)
+ACCREDITATIONS = ('NABH', 'JCI', 'NABL', 'ISO 9001', 'AAAHC')
+LANGUAGE_WEIGHTS = (
+    (models.Languages.ENGLISH, 50),
+    (models.Languages.HINDI, 35),
+    (models.Languages.BENGALI, 15),
+)
+STATES = [code for code, _ in
+          models.States_And_Union_Territories.STATE_IN_STATE_CHOICES]
+
+# Every image field points to one of a few small placeholder files
+PLACEHOLDER_IMAGES = 8
+BATCH_SIZE = 10000
+PASSWORD = 'password@123'
+
+
+def copy_value(value):
+    """Formats value for the postgres COPY text format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t')\
+        .replace('\n', '\\n').replace('\r', '\\r')
+
+
+def copy_rows(table, columns, rows):
+    """Loads rows into table with COPY, in batches"""
+    rows = iter(rows)
+    with connection.cursor() as cursor:
+        while True:
+            buffer = io.StringIO()
+            count = 0
+            for row in rows:
+                buffer.write('\t'.join(copy_value(v) for v in row) + '\n')
+                count += 1
+                if count == BATCH_SIZE:
+                    break
+            if not count:
+                break
+            buffer.seek(0)
+            cursor.copy_expert(
+                f'COPY {table} ({", ".join(columns)}) FROM STDIN', buffer)
+
+
+def copy_m2m(model, field_name, pairs):
+    """Loads (object id, related id) pairs into a many to many table"""
+    field = model._meta.get_field(field_name)
+    copy_rows(
+        field.remote_field.through._meta.db_table,
+        (field.m2m_column_name(), field.m2m_reverse_name()),
+        pairs
+    )
+
+
+def first_free_id(model):
+    """Returns the id after the largest id of model"""
+    return (model.objects.aggregate(id=Max('id'))['id'] or 0) + 1
+
+
+def reset_sequences(*model_list):
+    """Moves id sequences past rows loaded with explicit ids"""
+    with connection.cursor() as cursor:
+        for sql in connection.ops.sequence_reset_sql(
+                no_style(), model_list):
+            cursor.execute(sql)
+
+
+class Command(BaseCommand):
+    """
+    Django command to fill the database with a large realistic dataset
+    for benchmarking. The same seed always generates the same data.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10000,
+                            help='Number of users who are not doctors')
+        parser.add_argument('--doctors', type=int, default=500)
+        parser.add_argument('--hospitals', type=int, default=100)
+        parser.add_argument('--procedures', type=int, default=500)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        self.seed = options['seed']
+        self.rng = random.Random(self.seed)
+        self.now = timezone.now().replace(microsecond=0)
+        self.placeholders = self.create_placeholder_images()
+
+        with transaction.atomic():
+            speciality_ids = self.create_specialities()
+            self.log('specialities', len(speciality_ids))
+
+            procedure_ids = self.create_procedures(
+                options['procedures'], speciality_ids)
+            self.log('procedures', len(procedure_ids))
+
+            self.create_users(options['users'], doctor=False)
+            self.log('users', options['users'])
+
+            doctor_ids = self.create_users(options['doctors'], doctor=True)
+            self.create_doctor_profiles(doctor_ids, speciality_ids)
+            self.log('doctors', len(doctor_ids))
+
+            self.create_hospitals(
+                options['hospitals'], procedure_ids, doctor_ids)
+            self.log('hospitals', options['hospitals'])
+
+        self.stdout.write(self.style.SUCCESS('Dataset generated'))
+
+    def log(self, name, count):
+        self.stdout.write(f'Created {count} {name}')
+
+    def create_placeholder_images(self):
+        """Writes small placeholder images, returns paths per kind"""
+        placeholders = {}
+        for kind in ('user', 'procedure', 'hospital'):
+            path = f'pictures/uploads/{kind}/generated'
+            os.makedirs(os.path.join(settings.MEDIA_ROOT, path),
+                        exist_ok=True)
+            placeholders[kind] = []
+            for i in range(PLACEHOLDER_IMAGES):
+                name = f'{path}/placeholder-{i}.jpg'
+                color = tuple(self.rng.randrange(256) for _ in range(3))
+                Image.new('RGB', (32, 32), color).save(
+                    os.path.join(settings.MEDIA_ROOT, name), format='JPEG')
+                placeholders[kind].append(name)
+        return placeholders
+
+    def image(self, kind, probability):
+        """Returns a placeholder image name or None"""
+        if self.rng.random() < probability:
+            return self.rng.choice(self.placeholders[kind])
+        return None
+
+    def language(self, probability=1):
+        if self.rng.random() >= probability:
+            return None
+        codes, weights = zip(*LANGUAGE_WEIGHTS)
+        return self.rng.choices(codes, weights)[0]
+
+    def create_specialities(self):
+        """Creates the list of specialities, returns their ids"""
+        return [
+            models.Speciality.objects.get_or_create(name=name)[0].pk
+            for name in SPECIALITIES
+        ]
+
+    def create_procedures(self, count, speciality_ids):
+        """Creates procedures with one to three specialities"""
+        start = first_free_id(models.Procedure)
+        procedures = models.Procedure.objects.bulk_create(
+            (
+                models.Procedure(
+                    name=f'{self.rng.choice(PROCEDURE_WORDS)} '
+                         f'{self.rng.choice(PROCEDURE_KINDS)} {start + i}',
+                    days_in_hospital=self.rng.randint(0, 14),
+                    days_in_destination=self.rng.randint(1, 30),
+                    duration_minutes=self.rng.choice(
+                        (30, 45, 60, 90, 120, 180, 240, 360)),
+                    overview='Overview of the procedure. ' * 10,
+                    other_details='Other details. ' * 5,
+                    image=self.image('procedure', 0.7)
+                )
+                for i in range(count)
+            ),
+            batch_size=BATCH_SIZE
+        )
+        ids = [procedure.pk for procedure in procedures]
+        copy_m2m(models.Procedure, 'speciality', (
+            (procedure_id, speciality_id)
+            for procedure_id in ids
+            for speciality_id in self.rng.sample(
+                speciality_ids, self.rng.randint(1, 3))
+        ))
+        return ids
+
+    def create_users(self, count, doctor):
+        """Loads users with their profiles and tokens, returns their ids"""
+        start = first_free_id(models.User)
+        ids = range(start, start + count)
+        password = make_password(PASSWORD, salt='generateddataset')
+        kind = 'doctor' if doctor else 'user'
+
+        copy_rows(
+            models.User._meta.db_table,
+            ('id', 'password', 'is_superuser', 'email', 'username',
+             'is_active', 'is_staff', 'is_doctor', 'created_date'),
+            (
+                (user_id, password, False,
+                 f'{kind}{user_id}@example.com', f'{kind}{user_id}',
+                 self.rng.random() < 0.97, False, doctor,
+                 self.now - datetime.timedelta(
+                     minutes=self.rng.randrange(3 * 365 * 24 * 60)))
+                for user_id in ids
+            )
+        )
+        copy_rows(
+            models.UserProfile._meta.db_table,
+            ('user_id', 'first_name', 'last_name', 'phone',
+             'date_of_birth', 'city', 'country', 'postal_code', 'address',
+             'primary_language', 'secondary_language', 'tertiary_language',
+             'image'),
+            (
+                (user_id, self.rng.choice(FIRST_NAMES),
+                 self.rng.choice(LAST_NAMES),
+                 f'+91{self.rng.randrange(7000000000, 9999999999)}'
+                 if self.rng.random() < 0.8 else None,
+                 datetime.date(1950, 1, 1) + datetime.timedelta(
+                     days=self.rng.randrange(55 * 365))
+                 if self.rng.random() < 0.7 else None,
+                 self.rng.choice(CITIES), 'IN',
+                 str(self.rng.randrange(700001, 800000)),
+                 f'{self.rng.randrange(1, 500)} Main Road',
+                 self.language(), self.language(0.6), self.language(0.2),
+                 self.image('user', 0.5))
+                for user_id in ids
+            )
+        )
+        copy_rows(
+            Token._meta.db_table,
+            ('key', 'user_id', 'created'),
+            (
+                (self.token_key(user_id), user_id, self.now)
+                for user_id in ids
+            )
+        )
+        reset_sequences(models.User, models.UserProfile)
+        return list(ids)
+
+    def token_key(self, user_id):
+        """
+        Returns the token key of the user, taken from the id so that
+        running again with the same seed appends new keys
+        """
+        return hashlib.sha1(f'{self.seed}:{user_id}'.encode()).hexdigest()
+
+    def create_doctor_profiles(self, doctor_ids, speciality_ids):
+        """Loads doctor profiles and their four speciality relations"""
+        start = first_free_id(models.Doctor)
+        profile_ids = range(start, start + len(doctor_ids))
+        copy_rows(
+            models.Doctor._meta.db_table,
+            ('id', 'user_id', 'experience', 'qualification', 'highlights'),
+            (
+                (profile_id, user_id,
+                 round(min(self.rng.gammavariate(2, 6), 60), 1),
+                 self.rng.choice(('MBBS', 'MBBS, MD', 'MBBS, MS', 'MDS')),
+                 'Highlights of the doctor. ' * 3)
+                for profile_id, user_id in zip(profile_ids, doctor_ids)
+            )
+        )
+        reset_sequences(models.Doctor)
+
+        # Most doctors have one main speciality, few have more
+        for number, probability in enumerate((1, 0.4, 0.15, 0.05), 1):
+            copy_m2m(models.Doctor, f'speciality{number}', (
+                (profile_id, self.rng.choice(speciality_ids))
+                for profile_id in profile_ids
+                if self.rng.random() < probability
+            ))
+
+    def create_hospitals(self, count, procedure_ids, doctor_ids):
+        """Creates hospitals and all their child rows"""
+        hospitals = models.Hospital.objects.bulk_create(
+            (
+                models.Hospital(
+                    name=f'{self.rng.choice(LAST_NAMES)} Hospital {i}',
+                    state=self.rng.choice(STATES),
+                    postal_code=str(self.rng.randrange(100001, 900000)),
+                    street_name=f'{self.rng.randrange(1, 500)} Main Road',
+                    location_details='Near the railway station',
+                    overview='Overview of the hospital. ' * 20,
+                    staff_details='Staff details. ' * 5,
+                    content_approver_name=self.rng.choice(FIRST_NAMES),
+                    **{f'image{n}': self.image('hospital', 0.9 / n)
+                       for n in range(1, 13)}
+                )
+                for i in range(count)
+            ),
+            batch_size=BATCH_SIZE
+        )
+
+        models.Accreditation.objects.bulk_create(
+            (
+                models.Accreditation(hospital=hospital, name=name,
+                                     image=self.image('hospital', 0.5))
+                for hospital in hospitals
+                for name in self.rng.sample(
+                    ACCREDITATIONS, self.rng.randint(0, 3))
+            ),
+            batch_size=BATCH_SIZE
+        )
+        models.Service.objects.bulk_create(
+            (
+                models.Service(hospital=hospital, name=name)
+                for hospital in hospitals
+                for name in self.rng.sample(
+                    SERVICES, self.rng.randint(3, len(SERVICES)))
+            ),
+            batch_size=BATCH_SIZE
+        )
+        models.HospitalLanguage.objects.bulk_create(
+            (
+                models.HospitalLanguage(hospital=hospital, language=code)
+                for hospital in hospitals
+                for code, _ in self.rng.sample(
+                    LANGUAGE_WEIGHTS, self.rng.randint(1, 3))
+            ),
+            batch_size=BATCH_SIZE
+        )
+
+        hospital_procedures = models.HospitalProcedure.objects.bulk_create(
+            (models.HospitalProcedure(hospital=h) for h in hospitals),
+            batch_size=BATCH_SIZE
+        )
+        if procedure_ids:
+            # Popular procedures are offered by many more hospitals
+            weights = [1 / rank for rank in range(1, len(procedure_ids) + 1)]
+            copy_m2m(models.HospitalProcedure, 'procedure', (
+                (hospital_procedure.pk, procedure_id)
+                for hospital_procedure in hospital_procedures
+                for procedure_id in set(self.rng.choices(
+                    procedure_ids, weights, k=self.rng.randint(10, 100)))
+            ))
+
+        hospital_doctors = models.HospitalDoctor.objects.bulk_create(
+            (models.HospitalDoctor(hospital=h) for h in hospitals),
+            batch_size=BATCH_SIZE
+        )
+        if doctor_ids:
+            copy_m2m(models.HospitalDoctor, 'doctor', (
+                (hospital_doctor.pk, doctor_id)
+                for hospital_doctor in hospital_doctors
+                for doctor_id in self.rng.sample(
+                    doctor_ids, min(len(doctor_ids),
+                                    self.rng.randint(5, 30)))
+            ))
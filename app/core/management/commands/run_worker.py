@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.worker import run_workers
+
+
+class Command(BaseCommand):
+    """Django command to run queued background jobs"""
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int,
+            default=settings.JOB_WORKER_CONCURRENCY,
+            help='Number of jobs run in parallel')
+        parser.add_argument(
+            '--pool', choices=('thread', 'process'),
+            default=settings.JOB_WORKER_POOL,
+            help='Run jobs in threads or forked processes')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit once there are no due jobs')
+        parser.add_argument(
+            '--sleep', type=float, default=1,
+            help='Seconds to wait when there are no due jobs')
+
+    def handle(self, *args, **options):
+        self.stdout.write(
+            f'Starting {options["concurrency"]} {options["pool"]} '
+            f'worker(s)...')
+        run_workers(
+            options['concurrency'],
+            pool=options['pool'],
+            once=options['once'],
+            sleep=options['sleep'],
+            stdout=self.stdout
+        )
+        self.stdout.write(self.style.SUCCESS('Workers stopped'))
@@ -0,0 +1,61 @@
+from collections import Counter
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.slow_queries import read_log
+
+
+class Command(BaseCommand):
+    """
+    Django command to report the slow query log, queries which differ
+    only in their literals are grouped and sorted by total duration.
+    """
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--log', default=settings.SLOW_QUERY_LOG,
+            help='Slow query log file, defaults to SLOW_QUERY_LOG')
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Number of query groups to show')
+        parser.add_argument(
+            '--view', help='Only report queries of this view name')
+
+    def handle(self, *args, **options):
+        if not options['log']:
+            raise CommandError('SLOW_QUERY_LOG is not set, use --log')
+
+        groups = {}
+        for record in read_log(options['log']):
+            if options['view'] and record['view'] != options['view']:
+                continue
+            group = groups.setdefault(record['fingerprint'], {
+                'count': 0,
+                'total_ms': 0.0,
+                'max_ms': 0.0,
+                'views': Counter(),
+                'sources': Counter(),
+            })
+            group['count'] += 1
+            group['total_ms'] += record['duration_ms']
+            group['max_ms'] = max(group['max_ms'], record['duration_ms'])
+            group['views'][record['view']] += 1
+            group['sources'][record['source']] += 1
+
+        if not groups:
+            self.stdout.write('No slow queries logged')
+            return
+
+        ranked = sorted(groups.items(), key=lambda item: -item[1]['total_ms'])
+        for sql, group in ranked[:options['limit']]:
+            self.stdout.write(self.style.SUCCESS(
+                f"{group['total_ms']:.1f} ms total, {group['count']} "
+                f"queries, {group['total_ms'] / group['count']:.1f} ms "
+                f"mean, {group['max_ms']:.1f} ms max"
+            ))
+            self.stdout.write(f'  {sql}')
+            for view, count in group['views'].most_common(3):
+                self.stdout.write(f'  view {view} ({count})')
+            for source, count in group['sources'].most_common(3):
+                self.stdout.write(f'  from {source} ({count})')
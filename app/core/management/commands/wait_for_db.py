@@ -2,21 +2,46 @@ import time
 
 from django.db import connections
 from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+from django.core.management.base import BaseCommand, CommandError
 
 
 class Command(BaseCommand):
-    """Django command to pause execution until database is available"""
+    """
+    Django command to pause execution until database answers a query,
+    retrying with exponential backoff until the deadline.
+    """
 
-    def handle(self, *args, **kwargs):
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--timeout', type=float, default=60,
+            help='Seconds to wait before giving up')
+        parser.add_argument(
+            '--interval', type=float, default=0.25,
+            help='Seconds to wait after the first failed attempt')
+        parser.add_argument(
+            '--max-interval', type=float, default=5,
+            help='Longest wait between two attempts')
+
+    def handle(self, *args, **options):
         self.stdout.write('Waiting for database...')
-        db_conn = None
-        while not db_conn:
+        deadline = time.monotonic() + options['timeout']
+        interval = options['interval']
+        while True:
             try:
-                db_conn = connections['default']
-            except OperationalError:
+                with connections['default'].cursor() as cursor:
+                    cursor.execute('SELECT 1')
+                break
+            except OperationalError as error:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CommandError(
+                        f'Database unavailable after '
+                        f"{options['timeout']:g} seconds: {error}")
+                wait = min(interval, remaining)
                 self.stdout.write(
-                    'Database unavailable, waiting for 1 second...')
-                time.sleep(1)
+                    f'Database unavailable, waiting for {wait:.2f} '
+                    f'seconds...')
+                time.sleep(wait)
+                interval = min(interval * 2, options['max_interval'])
 
         self.stdout.write(self.style.SUCCESS('Database available'))
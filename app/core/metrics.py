@@ -0,0 +1,33 @@
+from prometheus_client import Histogram
+
+# Labelled by resolved url name, e.g. user:me or staff:procedure-list
+REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Wall time spent handling the request',
+    ['view', 'method', 'status']
+)
+REQUEST_DB_DURATION = Histogram(
+    'http_request_db_duration_seconds',
+    'Time spent in database queries while handling the request',
+    ['view']
+)
+REQUEST_DB_QUERIES = Histogram(
+    'http_request_db_queries',
+    'Number of database queries run while handling the request',
+    ['view'],
+    buckets=(0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 89, float('inf'))
+)
+REQUEST_SIZE = Histogram(
+    'http_request_size_bytes',
+    'Size of the request body',
+    ['view'],
+    buckets=(0, 256, 1024, 4096, 16384, 65536, 262144, 1048576,
+             4194304, 16777216, float('inf'))
+)
+RESPONSE_SIZE = Histogram(
+    'http_response_size_bytes',
+    'Size of the response body',
+    ['view'],
+    buckets=(0, 256, 1024, 4096, 16384, 65536, 262144, 1048576,
+             4194304, 16777216, float('inf'))
+)
@@ -0,0 +1,159 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils.cache import patch_vary_headers
+
+from core import compression, metrics, routers, slow_queries
+from core.db import execute_wrapper
+
+
+class QueryTimer:
+    """Database execute wrapper counting queries and their duration"""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+
+
+class RequestMetricsMiddleware:
+    """
+    Records wall time, database time, query count and request and
+    response sizes of every request, labelled by the resolved url name.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        query_timer = QueryTimer()
+        start = time.perf_counter()
+        with execute_wrapper(query_timer):
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+
+        metrics.REQUEST_DURATION.labels(
+            view, request.method, response.status_code).observe(duration)
+        metrics.REQUEST_DB_DURATION.labels(view).observe(
+            query_timer.duration)
+        metrics.REQUEST_DB_QUERIES.labels(view).observe(query_timer.count)
+        metrics.REQUEST_SIZE.labels(view).observe(
+            int(request.META.get('CONTENT_LENGTH') or 0))
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.labels(view).observe(
+                len(response.content))
+
+        return response
+
+
+class SlowQueryLogMiddleware:
+    """
+    Writes queries slower than SLOW_QUERY_THRESHOLD_MS to SLOW_QUERY_LOG
+    with the view and the project source line that issued them. It is
+    removed from the middleware chain when SLOW_QUERY_LOG is not set.
+    """
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG:
+            raise MiddlewareNotUsed
+        slow_queries.configure_logger()
+        self.get_response = get_response
+        self.threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        self.sample_rate = settings.SLOW_QUERY_SAMPLE_RATE
+
+    def __call__(self, request):
+        query_logger = slow_queries.SlowQueryLogger(
+            request, self.threshold, self.sample_rate)
+        with execute_wrapper(query_logger):
+            return self.get_response(request)
+
+
+class ReplicaPinMiddleware:
+    """
+    Keeps clients on the primary database for REPLICA_PIN_SECONDS after
+    a request which wrote to it, with a cookie for the session and a
+    cache entry for the authenticated user. It is removed from the
+    middleware chain when no REPLICA_DATABASES are configured.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_DATABASES:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.start_request()
+        try:
+            response = self.get_response(request)
+            if routers.wrote():
+                self.pin(request, response)
+        finally:
+            routers.start_request()
+        return response
+
+    def pin(self, request, response):
+        seconds = settings.REPLICA_PIN_SECONDS
+        response.set_cookie(routers.PIN_COOKIE, '1', max_age=seconds,
+                            httponly=True)
+        user = getattr(request, 'user', None)
+        if user is not None and user.is_authenticated:
+            cache.set(routers.user_pin_key(user.pk), True, seconds)
+
+
+class CompressionMiddleware:
+    """
+    Compresses responses with brotli or gzip, whichever the client
+    accepts. Only responses of the COMPRESSION_CONTENT_TYPES of at
+    least COMPRESSION_MIN_SIZE bytes are compressed, responses with a
+    Content-Encoding such as the cached catalog are sent as they are.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if response.has_header('Content-Encoding') or \
+                not compression.compressible(
+                    response.get('Content-Type', '')):
+            return response
+        if not response.streaming and \
+                len(response.content) < settings.COMPRESSION_MIN_SIZE:
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding', ))
+        encoding = compression.choose_encoding(
+            request, compression.available_encodings())
+        if encoding is None:
+            return response
+
+        if response.streaming:
+            response.streaming_content = compression.compress_stream(
+                response.streaming_content, encoding)
+            del response['Content-Length']
+        else:
+            content = compression.compress(response.content, encoding)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+
+        # The compressed body differs from the one the strong ETag
+        # was computed for
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = encoding
+        return response
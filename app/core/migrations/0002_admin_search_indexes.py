@@ -0,0 +1,54 @@
+# Generated by Django 2.2.28 on 2026-10-19 03:18
+
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations, models
+
+
+# Django filters icontains as UPPER("column"::text) LIKE UPPER(%term%),
+# so the trigram indexes are built on that same expression.
+TRIGRAM_INDEXES = (
+    ('core_user_email_trgm', 'core_user', 'email'),
+    ('core_user_username_trgm', 'core_user', 'username'),
+    ('profile_first_name_trgm', 'core_userprofile', 'first_name'),
+    ('profile_last_name_trgm', 'core_userprofile', 'last_name'),
+    ('profile_city_trgm', 'core_userprofile', 'city'),
+)
+
+
+def trigram_index_operations():
+    """Returns operations creating the trigram indexes used in admin search"""
+    return [
+        migrations.RunSQL(
+            sql=f'CREATE INDEX {name} ON {table} '
+                f'USING gin (UPPER("{column}"::text) gin_trgm_ops);',
+            reverse_sql=f'DROP INDEX {name};'
+        )
+        for name, table, column in TRIGRAM_INDEXES
+    ]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['country'], name='profile_country_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['primary_language'], name='profile_primary_lang_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['secondary_language'], name='profile_secondary_lang_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userprofile',
+            index=models.Index(fields=['tertiary_language'], name='profile_tertiary_lang_idx'),
+        ),
+    ] + trigram_index_operations()
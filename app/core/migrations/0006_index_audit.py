@@ -0,0 +1,46 @@
+# Generated by Django 2.2.28 on 2026-10-19 04:21
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_change'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hospital',
+            index=models.Index(fields=['state'], name='hospital_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hospital',
+            index=models.Index(fields=['country', 'state'], name='hospital_country_state_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='hospitallanguage',
+            index=models.Index(fields=['language'], name='hospital_language_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='service',
+            index=models.Index(fields=['hospital', 'name'], name='service_hospital_name_idx'),
+        ),
+        # The hospital index is dropped once the composite index exists
+        migrations.AlterField(
+            model_name='service',
+            name='hospital',
+            field=models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='service', to='core.Hospital'),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['is_doctor', 'is_active'], name='user_doctor_active_idx'),
+        ),
+        # Case insensitive email lookups filter on LOWER("email")
+        migrations.RunSQL(
+            sql='CREATE INDEX core_user_email_lower_idx '
+                'ON core_user (LOWER("email"));',
+            reverse_sql='DROP INDEX core_user_email_lower_idx;'
+        ),
+    ]
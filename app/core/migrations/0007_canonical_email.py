@@ -0,0 +1,60 @@
+from django.db import migrations
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def collision_report(user_model):
+    """Returns a line per email used by several users in different case"""
+    duplicated = user_model.objects.annotate(email_lower=Lower('email')) \
+        .values('email_lower').annotate(count=Count('id')) \
+        .filter(count__gt=1).values_list('email_lower', flat=True)
+    users = user_model.objects.annotate(email_lower=Lower('email')) \
+        .filter(email_lower__in=list(duplicated)) \
+        .order_by('email_lower', 'id')
+
+    groups = {}
+    for user in users:
+        groups.setdefault(user.email_lower, []).append(
+            f'{user.pk} {user.email}')
+    return [f'{email}: {", ".join(accounts)}'
+            for email, accounts in groups.items()]
+
+
+def canonicalise_emails(apps, schema_editor):
+    """
+    Lowercases the stored emails. Accounts whose emails differ only in
+    case have to be merged or renamed by hand first, the migration
+    stops with a report of them.
+    """
+    user_model = apps.get_model('core', 'User')
+    collisions = collision_report(user_model)
+    if collisions:
+        raise RuntimeError(
+            'Emails used by several accounts in different case, merge or '
+            'rename them before migrating:\n' + '\n'.join(collisions))
+
+    user_model.objects.exclude(email=Lower('email')) \
+        .update(email=Lower('email'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_index_audit'),
+    ]
+
+    operations = [
+        migrations.RunPython(canonicalise_emails, migrations.RunPython.noop),
+        migrations.RunSQL(
+            sql=[
+                'DROP INDEX core_user_email_lower_idx;',
+                'CREATE UNIQUE INDEX core_user_email_lower_uniq '
+                'ON core_user (LOWER("email"));',
+            ],
+            reverse_sql=[
+                'DROP INDEX core_user_email_lower_uniq;',
+                'CREATE INDEX core_user_email_lower_idx '
+                'ON core_user (LOWER("email"));',
+            ]
+        ),
+    ]
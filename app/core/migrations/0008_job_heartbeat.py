@@ -0,0 +1,18 @@
+# Generated by Django 2.2.28 on 2026-10-19 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0007_canonical_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='job',
+            name='heartbeat_date',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Heartbeat Date'),
+        ),
+    ]
@@ -1,7 +1,10 @@
 import os
 import uuid
 import datetime
-from django.db import models
+from django.db import models, transaction
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Lower
+from django.contrib.postgres.fields import JSONField
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, \
                                        PermissionsMixin
 from django.core.validators import validate_image_file_extension, \
@@ -9,7 +12,8 @@ from django.core.validators import validate_image_file_extension, \
 from django.utils import timezone
 from django.utils.translation import ugettext as _
 from django.dispatch import receiver
-from django.db.models.signals import post_save
+from django.db.models.signals import post_save, pre_delete, \
+                                     post_delete, m2m_changed
 
 from phonenumber_field.modelfields import PhoneNumberField
 from django_countries import Countries
@@ -17,6 +21,8 @@ from django_countries.fields import CountryField
 
 from rest_framework.authtoken.models import Token
 
+from core import caching
+
 
 class OperationalCountries(Countries):
     """Overriding countries to include only operational countries."""
@@ -159,24 +165,32 @@ def hospital_accreditation_image_upload_file_path(instance, filename):
     return full_path
 
 
-class UserManager(BaseUserManager):
+class ChangeTrackedMixin:
+    """
+    Saves the model in a transaction so that the outbox change written
+    by the post_save receiver commits or rolls back together with it.
+    """
 
-    def create_user(self, email, password, username, **extra_kwargs):
-        """Creates and saves a new user"""
+    def save(self, *args, **kwargs):
+        with transaction.atomic(using=kwargs.get('using')):
+            super().save(*args, **kwargs)
 
-        if not email:
-            raise ValueError(_('Email cannot be empty'))
 
-        if not username:
-            raise ValueError(_('Username cannot be empty'))
+class UserManager(BaseUserManager):
 
-        user = self.model(email=self.normalize_email(email),
-                          username=username, **extra_kwargs)
-        user.set_password(password)
-        user.save(using=self._db)
-        Token.objects.create(user=user)
+    @classmethod
+    def normalize_email(cls, email):
+        """Returns the canonical email, stripped and lowercased"""
+        return (email or '').strip().lower()
 
-        return user
+    def get_by_email(self, email):
+        """Returns the user with email in any case"""
+        return self.annotate(email_lower=Lower('email')) \
+            .get(email_lower=self.normalize_email(email))
+
+    def create_user(self, email, password, username, **extra_kwargs):
+        """Creates and saves a new user"""
+        return self._create(email, password, username, **extra_kwargs)
 
     def create_superuser(self, email, password, username, **extra_kwargs):
         """Creates and saves a new user with superuser permission"""
@@ -190,6 +204,17 @@ class UserManager(BaseUserManager):
 
     def create_doctor(self, email, password, username, **extra_kwargs):
         """Creates and saves a new doctor in inactive state"""
+        extra_kwargs.update(is_doctor=True, is_active=False)
+        return self._create(email, password, username, **extra_kwargs)
+
+    def _create(self, email, password, username, profile=None,
+                doctor_profile=None, **extra_kwargs):
+        """
+        Builds the user with its profiles and token and saves them in
+        one transaction, with one INSERT for every row. Profile values
+        are given as dicts, the doctor profile ones may include lists
+        for the specialities.
+        """
 
         if not email:
             raise ValueError(_('Email cannot be empty'))
@@ -197,15 +222,53 @@ class UserManager(BaseUserManager):
         if not username:
             raise ValueError(_('Username cannot be empty'))
 
-        doctor = self.model(email=self.normalize_email(email),
-                            username=username, **extra_kwargs)
-        doctor.set_password(password)
-        doctor.is_doctor = True
-        doctor.is_active = False
-        doctor.save(using=self._db)
+        user = self.model(email=self.normalize_email(email),
+                          username=username, **extra_kwargs)
+        user.set_password(password)
+
+        # The profiles are saved by the post_save receiver
+        user.profile = UserProfile(**(profile or {}))
+        relations = {}
+        if user.is_doctor:
+            doctor_profile = dict(doctor_profile or {})
+            relations = {
+                field: doctor_profile.pop(field.name, None) or []
+                for field in Doctor._meta.many_to_many
+            }
+            user.doctor_profile = Doctor(**doctor_profile)
+
+        with transaction.atomic(using=self._db):
+            user.save(using=self._db)
+            Token(user=user).save(force_insert=True, using=self._db)
+            for field, related in relations.items():
+                add_new_relations(user.doctor_profile, field, related,
+                                  self._db)
+
+        return user
+
+
+def add_new_relations(instance, field, related, using=None):
+    """
+    Adds the related objects or ids to the many to many field of a just
+    created instance in one INSERT. Related objects are kept as its
+    prefetched relations, reading them back runs no query.
+    """
+    related = list(dict.fromkeys(related))
+    through = field.remote_field.through
+    source = through._meta.get_field(field.m2m_field_name()).attname
+    target = through._meta.get_field(field.m2m_reverse_field_name()).attname
+    if related:
+        through.objects.using(using).bulk_create(
+            through(**{source: instance.pk, target: getattr(obj, 'pk', obj)})
+            for obj in related
+        )
 
-        Token.objects.create(user=doctor)
-        return doctor
+    if all(isinstance(obj, models.Model) for obj in related):
+        queryset = getattr(instance, field.name).all()
+        queryset._result_cache = related
+        queryset._prefetch_done = True
+        instance.__dict__.setdefault('_prefetched_objects_cache', {})[
+            field.name] = queryset
 
 
 class User(AbstractBaseUser, PermissionsMixin):
@@ -229,12 +292,23 @@ class User(AbstractBaseUser, PermissionsMixin):
         """String representation of user model"""
         return self.email
 
+    def save(self, *args, **kwargs):
+        """Stores email in canonical form"""
+        self.email = UserManager.normalize_email(self.email)
+        super().save(*args, **kwargs)
+
     class Meta:
         permissions = (
             ('is_active', 'User is active'),
             ('is_staff', 'User is staff'),
             ('is_doctor', 'User is doctor')
         )
+        # Doctor listings and the admin filters, lower(email) has a
+        # unique functional index created in migration 0007
+        indexes = [
+            models.Index(fields=['is_doctor', 'is_active'],
+                         name='user_doctor_active_idx'),
+        ]
 
 
 class UserProfile(models.Model, Languages):
@@ -286,12 +360,26 @@ class UserProfile(models.Model, Languages):
         validators=(validate_image_file_extension,)
     )
 
+    class Meta:
+        # Code fields are matched exactly by admin search, the free text
+        # fields have trigram indexes created in migration 0002
+        indexes = [
+            models.Index(fields=['country'],
+                         name='profile_country_idx'),
+            models.Index(fields=['primary_language'],
+                         name='profile_primary_lang_idx'),
+            models.Index(fields=['secondary_language'],
+                         name='profile_secondary_lang_idx'),
+            models.Index(fields=['tertiary_language'],
+                         name='profile_tertiary_lang_idx'),
+        ]
+
     def __str__(self):
         """String representation"""
         return str(self.user)
 
 
-class Speciality(models.Model):
+class Speciality(ChangeTrackedMixin, models.Model):
     """Creates model to store specialities"""
     name = models.CharField(_('Name'), max_length=30, unique=True)
 
@@ -335,15 +423,24 @@ class Doctor(models.Model):
         return str(self.user)
 
 
+def assigned_or_new(instance, descriptor):
+    """Returns the one to one object assigned to instance, or a new one"""
+    related = descriptor.related
+    obj = related.get_cached_value(instance, None) or related.related_model()
+    # Assigned again for the id instance got when it was saved
+    setattr(obj, related.field.name, instance)
+    return obj
+
+
 @receiver(post_save, sender=User)
-def user_is_created(sender, instance, created, **kwargs):
+def user_is_created(sender, instance, created, using, **kwargs):
     if created:
-        # Creating user profile
-        UserProfile.objects.create(user=instance)
+        # Creating user profile, or saving the one UserManager built
+        assigned_or_new(instance, User.profile).save(using=using)
 
         # Creating doctor profile
         if instance.is_doctor:
-            Doctor.objects.create(user=instance)
+            assigned_or_new(instance, User.doctor_profile).save(using=using)
     else:
         instance.profile.save()
 
@@ -352,7 +449,7 @@ def user_is_created(sender, instance, created, **kwargs):
             instance.doctor_profile.save()
 
 
-class Procedure(models.Model):
+class Procedure(ChangeTrackedMixin, models.Model):
     """Model to store procedure details"""
     name = models.CharField(_('Name'), max_length=50, unique=True)
     speciality = models.ManyToManyField(
@@ -389,7 +486,7 @@ class Procedure(models.Model):
         return self.name.capitalize()
 
 
-class Hospital(models.Model):
+class Hospital(ChangeTrackedMixin, models.Model):
     """Model to store hospital details."""
     name = models.CharField(_('Name'), max_length=100)
     state = models.CharField(
@@ -507,11 +604,18 @@ class Hospital(models.Model):
         validators=(validate_image_file_extension, )
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['state'], name='hospital_state_idx'),
+            models.Index(fields=['country', 'state'],
+                         name='hospital_country_state_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
 
-class Accreditation(models.Model):
+class Accreditation(ChangeTrackedMixin, models.Model):
     """Model for hospital accreditation"""
     hospital = models.ForeignKey(
         to='Hospital',
@@ -533,21 +637,29 @@ class Accreditation(models.Model):
         return self.name
 
 
-class Service(models.Model):
+class Service(ChangeTrackedMixin, models.Model):
     """Model for hospital services"""
     hospital = models.ForeignKey(
         to='Hospital',
         on_delete=models.CASCADE,
-        related_name='service'
+        related_name='service',
+        # Covered by the hospital and name index
+        db_index=False
     )
     name = models.CharField(
         _('Name'), max_length=30)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['hospital', 'name'],
+                         name='service_hospital_name_idx'),
+        ]
+
     def __str__(self):
         return self.name
 
 
-class HospitalLanguage(models.Model):
+class HospitalLanguage(ChangeTrackedMixin, models.Model):
     """Model for hospital languages"""
     hospital = models.ForeignKey(
         to='Hospital',
@@ -560,11 +672,17 @@ class HospitalLanguage(models.Model):
         max_length=3
     )
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['language'],
+                         name='hospital_language_idx'),
+        ]
+
     def __str__(self):
         return self.language
 
 
-class HospitalProcedure(models.Model):
+class HospitalProcedure(ChangeTrackedMixin, models.Model):
     """Model for hospital procedure"""
     hospital = models.ForeignKey(
         to='Hospital',
@@ -577,7 +695,7 @@ class HospitalProcedure(models.Model):
         return ', '.join([p.name for p in self.procedure.all()])
 
 
-class HospitalDoctor(models.Model):
+class HospitalDoctor(ChangeTrackedMixin, models.Model):
     """Model for hospital doctor"""
     hospital = models.ForeignKey(
         to='Hospital',
@@ -603,3 +721,246 @@ class HospitalDoctor(models.Model):
                     string_rep = doc.email
 
         return string_rep
+
+
+class Job(models.Model):
+    """Model to store background jobs run by the worker"""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (QUEUED, _(u'Queued')),
+        (RUNNING, _(u'Running')),
+        (DONE, _(u'Done')),
+        (FAILED, _(u'Failed')),
+    ]
+
+    name = models.CharField(_('Name'), max_length=100)
+    payload = JSONField(_('Payload'), default=dict, blank=True)
+    status = models.CharField(
+        _('Status'),
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=QUEUED
+    )
+    total = models.PositiveIntegerField(_('Total'), default=0)
+    processed = models.PositiveIntegerField(_('Processed'), default=0)
+    error = models.TextField(_('Error'), blank=True, default='')
+    attempts = models.PositiveIntegerField(_('Attempts'), default=0)
+    max_attempts = models.PositiveIntegerField(_('Max attempts'), default=3)
+    run_after = models.DateTimeField(_('Run after'), default=timezone.now)
+    created_date = models.DateTimeField(
+        _('Created Date'), default=timezone.now, editable=False)
+    started_date = models.DateTimeField(
+        _('Started Date'), null=True, blank=True)
+    # Touched by the worker while it runs the job
+    heartbeat_date = models.DateTimeField(
+        _('Heartbeat Date'), null=True, blank=True)
+    finished_date = models.DateTimeField(
+        _('Finished Date'), null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'run_after'],
+                         name='job_status_run_after_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk}'
+
+    def attempt(self):
+        """Returns the row of this job while this attempt of it runs"""
+        return Job.objects.filter(pk=self.pk, status=Job.RUNNING,
+                                  attempts=self.attempts)
+
+    def set_total(self, total):
+        """
+        Saves the number of items the job is going to process, progress
+        of an earlier attempt is started over
+        """
+        self.total = total
+        self.processed = 0
+        self.attempt().update(total=total, processed=0,
+                              heartbeat_date=timezone.now())
+
+    def add_progress(self, count):
+        """
+        Adds count to the processed items, visible to other sessions,
+        and touches the heartbeat of the job
+        """
+        self.processed += count
+        self.attempt().update(processed=models.F('processed') + count,
+                              heartbeat_date=timezone.now())
+
+
+class ChangeQuerySet(models.QuerySet):
+
+    def committed(self):
+        """
+        Changes whose transactions have finished.
+
+        Rows are only returned once every transaction older than theirs
+        has committed, so a reader can never skip a row that is
+        committed later with a smaller cursor.
+        """
+        return self.filter(transaction_id__lt=RawSQL(
+            'txid_snapshot_xmin(txid_current_snapshot())', []))
+
+    def after(self, transaction_id, change_id):
+        """Changes after the given cursor in feed order"""
+        return self.filter(
+            models.Q(transaction_id__gt=transaction_id) |
+            models.Q(transaction_id=transaction_id, id__gt=change_id)
+        ).order_by('transaction_id', 'id')
+
+
+class Change(models.Model):
+    """Outbox of changes to catalog models, written in their transaction"""
+    CREATE = 'create'
+    UPDATE = 'update'
+    DELETE = 'delete'
+    ACTION_CHOICES = [
+        (CREATE, _(u'Create')),
+        (UPDATE, _(u'Update')),
+        (DELETE, _(u'Delete')),
+    ]
+
+    id = models.BigAutoField(primary_key=True)
+    transaction_id = models.BigIntegerField(_('Transaction id'))
+    model = models.CharField(_('Model'), max_length=100)
+    object_id = models.PositiveIntegerField(_('Object id'))
+    action = models.CharField(
+        _('Action'), max_length=10, choices=ACTION_CHOICES)
+    created_date = models.DateTimeField(
+        _('Created Date'), default=timezone.now, editable=False)
+
+    objects = ChangeQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['transaction_id', 'id'],
+                         name='change_cursor_idx'),
+            models.Index(fields=['model', 'object_id'],
+                         name='change_object_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.action} {self.model} {self.object_id}'
+
+    @property
+    def cursor(self):
+        """Position of the change in the feed"""
+        return f'{self.transaction_id}-{self.id}'
+
+
+HOSPITAL_CHILD_MODELS = (
+    Accreditation, Service, HospitalLanguage, HospitalProcedure,
+    HospitalDoctor,
+)
+CHANGE_TRACKED_MODELS = (
+    Speciality, Procedure, Hospital,
+) + HOSPITAL_CHILD_MODELS
+
+
+def record_change(model, object_ids, action):
+    """Writes changes of the given objects to the outbox"""
+    # Cached catalog responses are dropped at once, and again when the
+    # change becomes visible to requests reading the catalog
+    caching.catalog_changed()
+    transaction.on_commit(caching.catalog_changed)
+    Change.objects.bulk_create(
+        Change(
+            transaction_id=RawSQL('txid_current()', []),
+            model=model._meta.label_lower,
+            object_id=object_id,
+            action=action
+        )
+        for object_id in object_ids
+    )
+
+
+def record_hospital_change(instances):
+    """Records an update of the hospitals owning the given child objects"""
+    hospital_ids = {instance.hospital_id for instance in instances}
+    record_change(Hospital, hospital_ids, Change.UPDATE)
+
+
+def catalog_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+
+    record_change(sender, [instance.pk],
+                  Change.CREATE if created else Change.UPDATE)
+    if sender in HOSPITAL_CHILD_MODELS:
+        record_hospital_change([instance])
+
+
+def catalog_deleted(sender, instance, **kwargs):
+    record_change(sender, [instance.pk], Change.DELETE)
+    if sender in HOSPITAL_CHILD_MODELS:
+        record_hospital_change([instance])
+
+
+def record_owner_changes(relation, related_pks):
+    """Records an update of the objects linked to the given related ones"""
+    field = relation.field
+    owner_pks = relation.through.objects.filter(**{
+        f'{field.m2m_reverse_field_name()}__in': related_pks
+    }).values(field.m2m_field_name())
+    owners = list(field.model.objects.filter(pk__in=owner_pks))
+    if not owners:
+        return
+
+    record_change(field.model, [owner.pk for owner in owners],
+                  Change.UPDATE)
+    if field.model in HOSPITAL_CHILD_MODELS:
+        record_hospital_change(owners)
+
+
+def catalog_relation_changed(sender, instance, action, reverse, model,
+                             pk_set, **kwargs):
+    if reverse and action == 'pre_clear':
+        # Clear from the other side has no pk_set, the owners are read
+        # from the through table before the rows are gone
+        record_owner_changes(TRACKED_RELATIONS[sender], [instance.pk])
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+
+    if not reverse:
+        owner_model, owners = type(instance), [instance]
+    elif pk_set:
+        # Relation changed from the other side, owners are in pk_set
+        owner_model, owners = model, model.objects.filter(pk__in=pk_set)
+    else:
+        return
+
+    record_change(owner_model, [owner.pk for owner in owners],
+                  Change.UPDATE)
+    if owner_model in HOSPITAL_CHILD_MODELS:
+        record_hospital_change(owners)
+
+
+def catalog_related_deleted(sender, instance, **kwargs):
+    # Deleting the related object drops its through rows without an
+    # m2m_changed signal, so the owners losing it are recorded here
+    for relation in TRACKED_RELATIONS.values():
+        if relation.field.remote_field.model is sender:
+            record_owner_changes(relation, [instance.pk])
+
+
+TRACKED_RELATIONS = {
+    relation.through: relation
+    for relation in (Procedure.speciality, HospitalProcedure.procedure,
+                     HospitalDoctor.doctor)
+}
+
+for tracked_model in CHANGE_TRACKED_MODELS:
+    post_save.connect(catalog_saved, sender=tracked_model)
+    post_delete.connect(catalog_deleted, sender=tracked_model)
+
+for through, relation in TRACKED_RELATIONS.items():
+    m2m_changed.connect(catalog_relation_changed, sender=through)
+    pre_delete.connect(catalog_related_deleted,
+                       sender=relation.field.remote_field.model)
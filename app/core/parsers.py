@@ -0,0 +1,51 @@
+import io
+import re
+
+import msgpack
+
+from django.conf import settings
+
+from rest_framework import parsers
+from rest_framework.exceptions import ParseError
+
+from core.renderers import JSONRenderer, MessagePackRenderer, orjson
+
+# orjson reads integers outside -2**63 to 2**64 - 1 as floats, bodies
+# with a run of this many digits could hold one
+LONG_DIGITS = re.compile(rb'\d{19}')
+
+
+class JSONParser(parsers.JSONParser):
+    """
+    Parses JSON with orjson. Bodies in encodings other than utf-8 or
+    with integers orjson would read as floats, and installs without
+    orjson use the stdlib json module.
+    """
+    renderer_class = JSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        parser_context = parser_context or {}
+        encoding = parser_context.get('encoding', settings.DEFAULT_CHARSET)
+        if orjson is None or encoding.lower().replace('_', '-') != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+
+        body = stream.read()
+        if LONG_DIGITS.search(body):
+            return super().parse(io.BytesIO(body), media_type,
+                                 parser_context)
+        try:
+            return orjson.loads(body)
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f'JSON parse error - {exc}')
+
+
+class MessagePackParser(parsers.BaseParser):
+    """Parses MessagePack, timestamps are returned as datetimes"""
+    media_type = 'application/msgpack'
+    renderer_class = MessagePackRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return msgpack.unpackb(stream.read(), raw=False, timestamp=3)
+        except (ValueError, msgpack.UnpackException) as exc:
+            raise ParseError(f'MessagePack parse error - {exc}')
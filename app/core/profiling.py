@@ -0,0 +1,129 @@
+import cProfile
+import io
+import marshal
+import pstats
+import time
+
+from django.http import HttpResponse
+
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.exceptions import AuthenticationFailed
+
+from core.db import execute_wrapper
+from core.middleware import QueryTimer
+
+# Self time of functions matching these file or function names is
+# reported under the category, the first matching category wins
+CATEGORIES = (
+    ('orm', ('/django/db/', 'psycopg2')),
+    ('serializer', ('/rest_framework/serializers.py',
+                    '/rest_framework/fields.py',
+                    '/rest_framework/relations.py',
+                    'serializer.py')),
+    ('renderer', ('/rest_framework/renderers.py', 'core/renderers.py',
+                  '/json/', '_json', 'orjson', 'msgpack')),
+)
+REPORT_LINES = 60
+
+
+def requested_format(request):
+    """Returns profile format asked by query flag or header, or None"""
+    value = request.GET.get('profile') or \
+        request.META.get('HTTP_X_PROFILE')
+    if value in ('1', 'true', 'text'):
+        return 'text'
+    if value == 'pstats':
+        return 'pstats'
+    return None
+
+
+def is_staff(request):
+    """Checks session user or api token user for staff access"""
+    user = getattr(request, 'user', None)
+    if user is not None and user.is_staff:
+        return True
+    try:
+        authenticated = TokenAuthentication().authenticate(request)
+    except AuthenticationFailed:
+        return False
+    return authenticated is not None and authenticated[0].is_staff
+
+
+def category(function):
+    """Returns the category of a pstats function key"""
+    filename, _, name = function
+    location = f'{filename}:{name}'
+    for label, patterns in CATEGORIES:
+        if any(pattern in location for pattern in patterns):
+            return label
+    return 'other'
+
+
+def breakdown(stats):
+    """Sums self time of profiled functions per category"""
+    totals = {label: 0.0 for label, _ in CATEGORIES}
+    totals['other'] = 0.0
+    for function, (_, _, self_time, _, _) in stats.stats.items():
+        totals[category(function)] += self_time
+    return totals
+
+
+def profile_request(request, get_response, output):
+    """
+    Runs the request under cProfile and returns the profile in place
+    of the response, as a text report or as a pstats file.
+    """
+    profiler = cProfile.Profile()
+    queries = QueryTimer()
+    start = time.perf_counter()
+    with execute_wrapper(queries):
+        profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+    duration = time.perf_counter() - start
+
+    stats = pstats.Stats(profiler)
+    if output == 'pstats':
+        profile = HttpResponse(marshal.dumps(stats.stats),
+                               content_type='application/octet-stream')
+        profile['Content-Disposition'] = \
+            'attachment; filename="request.pstats"'
+        return profile
+
+    report = io.StringIO()
+    report.write(f'{request.method} {request.get_full_path()} '
+                 f'{response.status_code}\n')
+    report.write(f'total {duration * 1000:.1f} ms, {queries.count} '
+                 f'queries in {queries.duration * 1000:.1f} ms\n\n')
+    report.write('self time by category\n')
+    for label, seconds in breakdown(stats).items():
+        report.write(f'  {label:<12}{seconds * 1000:10.1f} ms\n')
+    report.write('\n')
+
+    stats.stream = report
+    stats.sort_stats('cumulative').print_stats(REPORT_LINES)
+    return HttpResponse(report.getvalue(),
+                        content_type='text/plain; charset=utf-8')
+
+
+class RequestProfilerMiddleware:
+    """
+    Returns a cProfile report of the request instead of its response
+    when a staff user sends ?profile=1 or the X-Profile header. Other
+    requests only pay for a check of the query string and headers.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if 'profile=' not in request.META.get('QUERY_STRING', '') and \
+                'HTTP_X_PROFILE' not in request.META:
+            return self.get_response(request)
+
+        output = requested_format(request)
+        if output is None or not is_staff(request):
+            return self.get_response(request)
+        return profile_request(request, self.get_response, output)
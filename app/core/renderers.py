@@ -0,0 +1,96 @@
+import msgpack
+
+from django_countries.fields import Country
+from phonenumber_field.phonenumber import PhoneNumber
+
+from rest_framework import renderers
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Dates are passed to JSONEncoder.default so that both libraries render
+# them the same way
+ORJSON_OPTIONS = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS \
+    if orjson else 0
+
+LINE_SEPARATORS = (
+    (b'\xe2\x80\xa8', b'\\u2028'),
+    (b'\xe2\x80\xa9', b'\\u2029'),
+)
+
+
+class JSONEncoder(encoders.JSONEncoder):
+    """Encodes phone numbers and countries as their serializer fields do"""
+
+    def default(self, obj):
+        if isinstance(obj, PhoneNumber):
+            return str(obj)
+        if isinstance(obj, Country):
+            return obj.code
+        return super().default(obj)
+
+
+class JSONRenderer(renderers.JSONRenderer):
+    """
+    Renders JSON with orjson and falls back to the stdlib json module
+    when orjson is not installed, for indented output and for data
+    orjson cannot encode such as integers over 64 bits. Unlike the
+    stdlib renderer orjson renders NaN and infinity as null, and writes
+    exponents without a plus sign, 1e16 for 1e+16.
+    """
+    encoder_class = JSONEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None or \
+                self.get_indent(accepted_media_type,
+                                renderer_context or {}) is not None:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default,
+                               option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type,
+                                  renderer_context)
+
+        # Output stays a strict javascript subset like the stdlib renderer
+        for separator, escaped in LINE_SEPARATORS:
+            if separator in ret:
+                ret = ret.replace(separator, escaped)
+        return ret
+
+
+class MessagePackEncoder(JSONEncoder):
+    """
+    Encodes integers over 64 bits, which MessagePack has no type for,
+    as strings of their digits
+    """
+
+    def default(self, obj):
+        if isinstance(obj, int):
+            return str(obj)
+        return super().default(obj)
+
+
+class MessagePackRenderer(renderers.BaseRenderer):
+    """
+    Renders MessagePack for clients sending Accept: application/msgpack.
+    Values without a MessagePack type are encoded like the JSON
+    renderer does, dates and decimals included. Integers over 64 bits
+    are sent as strings of the digits the JSON output holds.
+    """
+    media_type = 'application/msgpack'
+    format = 'msgpack'
+    charset = None
+    render_style = 'binary'
+    encoder_class = MessagePackEncoder
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        return msgpack.packb(data, default=self.encoder_class().default,
+                             use_bin_type=True)
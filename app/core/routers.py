@@ -0,0 +1,136 @@
+import random
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, DatabaseError
+
+from rest_framework import permissions
+
+# Reads of these models always go to the primary, a token created by
+# login must be usable on the very next request
+PRIMARY_MODELS = {'authtoken.token'}
+
+PIN_COOKIE = 'pin_primary'
+
+LAG_SQL = '''
+    SELECT CASE
+        WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+        ELSE COALESCE(EXTRACT(EPOCH FROM
+            now() - pg_last_xact_replay_timestamp()), 0)
+    END
+'''
+
+# Replica used by the current request and whether it wrote anything
+_state = threading.local()
+
+_lock = threading.Lock()
+_replica_status = {}
+
+
+def user_pin_key(user_id):
+    return f'replica-pin:{user_id}'
+
+
+def replica_lag(alias):
+    """Returns replication lag of the replica in seconds"""
+    with connections[alias].cursor() as cursor:
+        cursor.execute(LAG_SQL)
+        return float(cursor.fetchone()[0])
+
+
+def healthy_replicas():
+    """
+    Returns the replicas which lag less than REPLICA_MAX_LAG_SECONDS.
+    The lag of a replica is checked again after REPLICA_CHECK_SECONDS,
+    an unreachable replica counts as lagging.
+    """
+    now = time.monotonic()
+    healthy = []
+    for alias in settings.REPLICA_DATABASES:
+        with _lock:
+            checked_at, ok = _replica_status.get(alias, (None, False))
+        if checked_at is None or \
+                now - checked_at >= settings.REPLICA_CHECK_SECONDS:
+            try:
+                ok = replica_lag(alias) <= settings.REPLICA_MAX_LAG_SECONDS
+            except DatabaseError:
+                ok = False
+            with _lock:
+                _replica_status[alias] = (now, ok)
+        if ok:
+            healthy.append(alias)
+    return healthy
+
+
+def start_request():
+    """Sends reads to the primary until a view asks for a replica"""
+    _state.replica = None
+    _state.wrote = False
+
+
+def wrote():
+    """Returns whether the current request wrote to the primary"""
+    return getattr(_state, 'wrote', False)
+
+
+def forget_replica_status():
+    """Checks the lag of every replica again on next use"""
+    with _lock:
+        _replica_status.clear()
+
+
+def read_from_replica():
+    """Sends the remaining reads of the request to a healthy replica"""
+    if wrote():
+        return
+    replicas = healthy_replicas()
+    _state.replica = random.choice(replicas) if replicas else None
+
+
+def read_from_primary():
+    """Sends the remaining reads of the request to the primary"""
+    _state.replica = None
+
+
+class ReplicaRouter:
+    """
+    Routes reads to the replica chosen for the current request and all
+    writes to the primary. Reads are only sent to a replica by views
+    using ReplicaReadMixin, after a write the request stays on the
+    primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        replica = getattr(_state, 'replica', None)
+        if replica is None or model._meta.label_lower in PRIMARY_MODELS:
+            return 'default'
+        return replica
+
+    def db_for_write(self, model, **hints):
+        _state.replica = None
+        _state.wrote = True
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+
+class ReplicaReadMixin:
+    """
+    Reads safe method requests of the view from a replica unless the
+    client wrote to the primary in the last REPLICA_PIN_SECONDS.
+    """
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if not settings.REPLICA_DATABASES or \
+                request.method not in permissions.SAFE_METHODS or \
+                PIN_COOKIE in request.COOKIES:
+            return
+        if request.user.is_authenticated and \
+                cache.get(user_pin_key(request.user.pk)):
+            return
+        read_from_replica()
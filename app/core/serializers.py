@@ -0,0 +1,100 @@
+import copy
+
+from collections import OrderedDict
+
+from django.db import IntegrityError
+from django.utils.translation import get_language
+
+from rest_framework import fields, relations, serializers
+from rest_framework.validators import UniqueValidator
+
+
+def copy_field(field):
+    """Returns an unbound copy of a built field for one serializer"""
+    if isinstance(field, serializers.BaseSerializer):
+        # Created again, its own fields come from the cache of its class
+        return copy.deepcopy(field)
+
+    field = copy.copy(field)
+    if '_validators' in field.__dict__:
+        # Validators of rest framework 3.10 keep the field they validate
+        field._validators = [copy.copy(validator)
+                             for validator in field._validators]
+    # Children are bound when their field is created, the copies only
+    # need the parent that holds the context
+    if isinstance(field, relations.ManyRelatedField):
+        field.child_relation = copy_field(field.child_relation)
+        field.child_relation.parent = field
+    elif isinstance(field, (fields.ListField, fields.DictField)):
+        field.child = copy_field(field.child)
+        field.child.parent = field
+    return field
+
+
+class CachedFieldsMixin:
+    """
+    Builds the fields of a serializer class once per language instead
+    of for every serializer, instances get shallow copies of them. The
+    built fields are never bound or changed, so the copies share their
+    choices with each other. Two threads missing the cache at the same
+    time both build the fields and keep the ones stored first.
+    """
+    cache_fields = True
+    _field_cache = {}
+
+    def get_fields(self):
+        if not self.cache_fields:
+            return super().get_fields()
+
+        # Choices like country names are translated when built
+        key = (type(self), get_language())
+        built = self._field_cache.get(key)
+        if built is None:
+            built = self._field_cache.setdefault(key, super().get_fields())
+        return OrderedDict((name, copy_field(field))
+                           for name, field in built.items())
+
+
+class DatabaseUniqueMixin:
+    """
+    Leaves the unique checks of the Meta.database_unique_fields to the
+    database constraints, saving a query per field on every save. A
+    save violating them fails with the errors of the unique validators.
+    """
+
+    def build_standard_field(self, field_name, model_field):
+        field_class, field_kwargs = super().build_standard_field(
+            field_name, model_field)
+        if field_name in self.Meta.database_unique_fields:
+            field_kwargs['validators'] = [
+                validator for validator in field_kwargs.get('validators', [])
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return field_class, field_kwargs
+
+    def save(self, **kwargs):
+        try:
+            return super().save(**kwargs)
+        except IntegrityError:
+            errors = self.unique_errors()
+            if not errors:
+                raise
+            raise serializers.ValidationError(errors, code='unique')
+
+    def unique_errors(self):
+        """Returns the errors of the unique values taken by other rows"""
+        model = self.Meta.model
+        queryset = model._default_manager.all()
+        if self.instance is not None:
+            queryset = queryset.exclude(pk=self.instance.pk)
+
+        errors = {}
+        for name in self.Meta.database_unique_fields:
+            if name in self.validated_data and queryset.filter(
+                    **{name: self.validated_data[name]}).exists():
+                model_field = model._meta.get_field(name)
+                errors[name] = [model_field.error_messages['unique'] % {
+                    'model_name': model._meta.verbose_name,
+                    'field_label': model_field.verbose_name
+                }]
+        return errors
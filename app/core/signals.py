@@ -0,0 +1,8 @@
+from django.dispatch import Signal
+
+
+# Sent after a chunk of users is changed with queryset.update(), which
+# bypasses post_save. It is the hook for caches of user rows, there are
+# none yet: tokens and sessions read the user from the database on
+# every request.
+users_bulk_updated = Signal(providing_args=['pks', 'values'])
@@ -0,0 +1,125 @@
+import json
+import logging
+import os
+import random
+import re
+import sys
+import time
+
+from logging.handlers import WatchedFileHandler
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger('core.slow_queries')
+logger.propagate = False
+
+# Frames from these files are never the cause of a query
+IGNORED_FILES = (__file__, os.path.join('core', 'middleware.py'))
+
+FINGERPRINT_PATTERNS = (
+    (re.compile(r'%s'), '?'),
+    (re.compile(r"'(?:[^']|'')*'"), '?'),
+    (re.compile(r'\b\d+(?:\.\d+)?\b'), '?'),
+    (re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)'), '(...)'),
+    (re.compile(r'\s+'), ' '),
+)
+
+
+def fingerprint(sql):
+    """Replaces literals in sql so that similar queries compare equal"""
+    for pattern, replacement in FINGERPRINT_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+def source_frame():
+    """Returns 'path:line in function' of the deepest project frame"""
+    base_dir = settings.BASE_DIR + os.sep
+    frame = sys._getframe(1)
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if filename.startswith(base_dir) and \
+                'site-packages' not in filename and \
+                not filename.endswith(IGNORED_FILES):
+            return f'{filename[len(base_dir):]}:{frame.f_lineno} ' \
+                   f'in {frame.f_code.co_name}'
+        frame = frame.f_back
+    return None
+
+
+def configure_logger():
+    """
+    Sends the slow query records to the SLOW_QUERY_LOG file. Worker
+    processes only append to it, rotating it in one of them would lose
+    the records of the others, so it is rotated outside of the app.
+    """
+    path = os.path.abspath(settings.SLOW_QUERY_LOG)
+    for handler in list(logger.handlers):
+        if getattr(handler, 'baseFilename', None) == path:
+            return
+        logger.removeHandler(handler)
+        handler.close()
+
+    handler = WatchedFileHandler(path)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+
+
+def log_files(path):
+    """Returns the log file followed by its rotated files, oldest last"""
+    files = [path]
+    index = 1
+    while os.path.exists(f'{path}.{index}'):
+        files.append(f'{path}.{index}')
+        index += 1
+    return [name for name in files if os.path.exists(name)]
+
+
+def read_log(path):
+    """Yields the records of the log file and its rotated files"""
+    for name in log_files(path):
+        with open(name) as log:
+            for line in log:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A line can be cut short when the log rotates
+                    continue
+
+
+class SlowQueryLogger:
+    """
+    Database execute wrapper writing a sample of the queries slower
+    than the threshold to the slow query log.
+    """
+
+    def __init__(self, request, threshold, sample_rate):
+        self.request = request
+        self.threshold = threshold
+        self.sample_rate = sample_rate
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            if duration >= self.threshold and \
+                    random.random() < self.sample_rate:
+                self.log(sql, duration, context['connection'].alias)
+
+    def log(self, sql, duration, database):
+        match = self.request.resolver_match
+        logger.info(json.dumps({
+            'time': timezone.now().isoformat(),
+            'view': match.view_name if match else '<unresolved>',
+            'method': self.request.method,
+            'path': self.request.path,
+            'database': database,
+            'duration_ms': round(duration * 1000, 3),
+            'sql': sql,
+            'fingerprint': fingerprint(sql),
+            'source': source_frame(),
+        }))
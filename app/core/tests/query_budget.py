@@ -0,0 +1,37 @@
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from core.slow_queries import fingerprint
+
+
+class QueryBudgetMixin:
+    """
+    TestCase mixin to fail tests whose block runs more queries, or more
+    repeated queries, than the declared budget. Queries differing only in
+    their parameters count as repeated, like the rows of an N+1 loop.
+    """
+
+    @contextmanager
+    def assertQueryBudget(self, max_queries, max_duplicates=0):
+        with CaptureQueriesContext(connection) as context:
+            yield context
+
+        statements = [query['sql'] for query in context.captured_queries]
+        fingerprints = [fingerprint(sql) for sql in statements]
+        counts = Counter(fingerprints)
+        duplicates = sum(count - 1 for count in counts.values())
+
+        if len(statements) > max_queries or duplicates > max_duplicates:
+            lines = [
+                f'{number}. {"[duplicate] " if counts[key] > 1 else ""}{sql}'
+                for number, (sql, key) in enumerate(
+                    zip(statements, fingerprints), start=1)
+            ]
+            self.fail(
+                f'Query budget exceeded: {len(statements)} queries '
+                f'(budget {max_queries}), {duplicates} duplicates '
+                f'(budget {max_duplicates})\n' + '\n'.join(lines)
+            )
@@ -44,3 +44,27 @@ class AdminSiteTests(TestCase):
         res = self.client.get(url)
 
         self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_user_search_by_partial_username(self):
+        """Test that searching users by part of username works"""
+        url = reverse('admin:core_user_changelist')
+        res = self.client.get(url, {'q': 'user2'})
+
+        self.assertEqual(list(res.context['cl'].result_list), [self.user])
+
+    def test_user_profile_search(self):
+        """Test that searching profiles by name and language code works"""
+        self.user.profile.first_name = 'Abhishek'
+        self.user.profile.primary_language = 'BN'
+        self.user.profile.save()
+        url = reverse('admin:core_userprofile_changelist')
+
+        res_name = self.client.get(url, {'q': 'bhish'})
+        res_language = self.client.get(url, {'q': 'bn'})
+        res_both = self.client.get(url, {'q': 'abhishek en'})
+
+        self.assertEqual(list(res_name.context['cl'].result_list),
+                         [self.user.profile])
+        self.assertEqual(list(res_language.context['cl'].result_list),
+                         [self.user.profile])
+        self.assertEqual(list(res_both.context['cl'].result_list), [])
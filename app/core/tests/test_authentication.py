@@ -0,0 +1,97 @@
+from importlib import import_module
+
+from django.apps import apps
+from django.contrib.auth import authenticate, get_user_model
+from django.db import connection, IntegrityError, transaction
+from django.db.models.functions import Upper
+from django.test import TestCase
+
+canonical_email = import_module('core.migrations.0007_canonical_email')
+
+
+class EmailBackendTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@curesio.com',
+            password='testpass@123',
+            username='testuser'
+        )
+
+    def test_authenticate_email_in_any_case(self):
+        """Test that the email authenticates in any case"""
+        for email in ('test@curesio.com', 'TEST@CURESIO.COM',
+                      'Test@Curesio.com'):
+            self.assertEqual(
+                authenticate(email=email, password='testpass@123'),
+                self.user
+            )
+
+    def test_authenticate_wrong_password_fails(self):
+        """Test that a wrong password does not authenticate"""
+        self.assertIsNone(
+            authenticate(email='TEST@curesio.com', password='wrongpass'))
+
+    def test_authenticate_unknown_email_fails(self):
+        """Test that an unknown email does not authenticate"""
+        self.assertIsNone(
+            authenticate(email='other@curesio.com', password='testpass@123'))
+
+    def test_authenticate_inactive_user_fails(self):
+        """Test that inactive users do not authenticate"""
+        self.user.is_active = False
+        self.user.save()
+
+        self.assertIsNone(
+            authenticate(email='test@curesio.com', password='testpass@123'))
+
+    def test_email_in_other_case_cannot_be_stored(self):
+        """Test that the unique index rejects an email in other case"""
+        get_user_model().objects.create_user(
+            email='other@curesio.com',
+            password='testpass@123',
+            username='other'
+        )
+
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            get_user_model().objects.filter(email='other@curesio.com') \
+                .update(email='TEST@curesio.com')
+
+
+class CanonicalEmailMigrationTests(TestCase):
+
+    def setUp(self):
+        for i, email in enumerate(('one@curesio.com', 'two@curesio.com',
+                                   'three@curesio.com')):
+            get_user_model().objects.create_user(
+                email=email, password='testpass@123', username=f'user{i}')
+
+    def test_emails_lowercased(self):
+        """Test that the migration lowercases stored emails"""
+        get_user_model().objects.filter(email='two@curesio.com') \
+            .update(email=Upper('email'))
+
+        canonical_email.canonicalise_emails(apps, None)
+
+        self.assertEqual(
+            sorted(get_user_model().objects.values_list('email', flat=True)),
+            ['one@curesio.com', 'three@curesio.com', 'two@curesio.com']
+        )
+
+    def test_collisions_reported(self):
+        """Test that emails differing only in case stop the migration"""
+        with connection.cursor() as cursor:
+            # Rolled back with the test
+            cursor.execute('DROP INDEX core_user_email_lower_uniq')
+        one = get_user_model().objects.get(email='one@curesio.com')
+        two = get_user_model().objects.get(email='two@curesio.com')
+        get_user_model().objects.filter(pk=two.pk) \
+            .update(email='ONE@curesio.com')
+
+        self.assertEqual(
+            canonical_email.collision_report(get_user_model()),
+            [f'one@curesio.com: {one.pk} one@curesio.com, '
+             f'{two.pk} ONE@curesio.com']
+        )
+        with self.assertRaisesRegex(RuntimeError, 'one@curesio.com'):
+            canonical_email.canonicalise_emails(apps, None)
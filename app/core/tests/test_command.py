@@ -1,8 +1,18 @@
-from unittest.mock import patch
+import datetime
+import tempfile
 
-from django.core.management import call_command
+from io import StringIO
+from unittest.mock import MagicMock, patch
+
+from django.core.management import call_command, CommandError
 from django.db.utils import OperationalError
-from django.test import TestCase
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from rest_framework.authtoken.models import Token
+
+from core.models import Change, Speciality, User, Doctor, Hospital, \
+    Procedure
 
 
 class CommandTests(TestCase):
@@ -10,14 +20,94 @@ class CommandTests(TestCase):
     def test_wait_for_db_ready(self):
         """Test waiting for db when db is available"""
         with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.return_value = True
             call_command('wait_for_db')
             self.assertEqual(gi.call_count, 1)
+            cursor = gi.return_value.cursor.return_value.__enter__()
+            cursor.execute.assert_called_once_with('SELECT 1')
 
     @patch('time.sleep', return_value=True)
     def test_wait_for_db(self, ts):
-        """Test waiting for db"""
+        """Test waiting for db with exponential backoff"""
         with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
-            gi.side_effect = [OperationalError] * 5 + [True]
-            call_command('wait_for_db')
+            gi.return_value.cursor.side_effect = \
+                [OperationalError] * 5 + [MagicMock()]
+            call_command('wait_for_db', interval=1, max_interval=8)
             self.assertEqual(gi.call_count, 6)
+            self.assertEqual([c[0][0] for c in ts.call_args_list],
+                             [1, 2, 4, 8, 8])
+
+    @patch('time.sleep', return_value=True)
+    def test_wait_for_db_deadline(self, ts):
+        """Test that waiting fails once deadline has passed"""
+        with patch('django.db.utils.ConnectionHandler.__getitem__') as gi:
+            gi.return_value.cursor.side_effect = OperationalError
+            with self.assertRaises(CommandError):
+                call_command('wait_for_db', timeout=0)
+            ts.assert_not_called()
+
+    @patch('core.jobs.run_pending_jobs', return_value=2)
+    def test_run_worker_once(self, rp):
+        """Test that worker runs pending jobs and exits with --once"""
+        call_command('run_worker', once=True, concurrency=1)
+        self.assertEqual(rp.call_count, 1)
+
+    def test_compact_changes(self):
+        """Test that compaction keeps only the latest change per object"""
+        speciality = Speciality.objects.create(name='ortho')
+        speciality.save()
+        other = Speciality.objects.create(name='cardio')
+        Change.objects.update(
+            created_date=timezone.now() - datetime.timedelta(days=8))
+        speciality.save()
+
+        call_command('compact_changes', days=7)
+
+        self.assertEqual(
+            list(Change.objects.order_by('id').values_list(
+                'object_id', 'action')),
+            [(other.pk, 'create'), (speciality.pk, 'update')]
+        )
+
+    def test_generate_dataset(self):
+        """Test that generated dataset is complete and repeatable"""
+        def generate():
+            with tempfile.TemporaryDirectory() as media_root:
+                with override_settings(MEDIA_ROOT=media_root):
+                    call_command('generate_dataset', users=30, doctors=5,
+                                 hospitals=3, procedures=10, seed=7,
+                                 stdout=StringIO())
+
+        generate()
+
+        self.assertEqual(User.objects.filter(is_doctor=False).count(), 30)
+        self.assertEqual(Doctor.objects.count(), 5)
+        self.assertEqual(Hospital.objects.count(), 3)
+        self.assertEqual(Procedure.objects.count(), 10)
+        self.assertFalse(User.objects.filter(profile__isnull=True).exists())
+        self.assertEqual(Token.objects.count(), 35)
+        self.assertTrue(all(
+            procedure.speciality.exists()
+            for procedure in Procedure.objects.all()))
+        names = list(User.objects.order_by('id').values_list(
+            'profile__first_name', 'profile__city'))
+
+        keys = set(Token.objects.values_list('key', flat=True))
+
+        # Running again with the same seed appends new rows
+        generate()
+        self.assertEqual(User.objects.count(), 70)
+        self.assertEqual(Token.objects.count(), 70)
+
+        # New rows take the ids after the existing ones
+        User.objects.all().delete()
+        generate()
+        self.assertEqual(set(Token.objects.values_list('key', flat=True)),
+                         keys)
+        user = User.objects.create_user(
+            'new@example.com', 'testpass', 'new')
+        self.assertEqual(user.pk, User.objects.order_by('-id')[1].pk + 1)
+        self.assertEqual(
+            list(User.objects.exclude(pk=user.pk).order_by('id')
+                 .values_list('profile__first_name', 'profile__city')),
+            names
+        )
@@ -0,0 +1,242 @@
+import gzip
+import json
+
+from unittest.mock import patch
+
+import brotli
+
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, \
+    override_settings
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+
+from core import caching, checks, compression, models
+from core.middleware import CompressionMiddleware
+
+PROCEDURE_URL = reverse('staff:procedure-list')
+SYNC_URL = reverse('staff:sync')
+
+BODY = json.dumps([{'name': f'procedure {i}', 'overview': 'bla ' * 20}
+                   for i in range(50)]).encode()
+
+
+class CompressionMiddlewareTests(SimpleTestCase):
+
+    def respond(self, response, accept_encoding='gzip, deflate, br'):
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING=accept_encoding)
+        return CompressionMiddleware(lambda request: response)(request)
+
+    def test_brotli_preferred(self):
+        """Test that brotli is used when the client accepts it"""
+        response = self.respond(
+            HttpResponse(BODY, content_type='application/json'))
+
+        self.assertEqual(response['Content-Encoding'], 'br')
+        self.assertEqual(brotli.decompress(response.content), BODY)
+        self.assertEqual(int(response['Content-Length']),
+                         len(response.content))
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_gzip(self):
+        """Test that gzip is used when brotli is not accepted"""
+        response = self.respond(
+            HttpResponse(BODY, content_type='application/msgpack'),
+            'gzip, br;q=0')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content), BODY)
+
+    def test_gzip_without_brotli(self):
+        """Test that gzip is used when brotli is not installed"""
+        with patch('core.compression.brotli', None):
+            response = self.respond(
+                HttpResponse(BODY, content_type='application/json'))
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_wildcard_does_not_override_refusal(self):
+        """Test that * only stands for the codings not named"""
+        response = self.respond(
+            HttpResponse(BODY, content_type='application/json'),
+            'br;q=0, *')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+        response = self.respond(
+            HttpResponse(BODY, content_type='application/json'),
+            'br;q=0, gzip;q=0, *')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_quality_order(self):
+        """Test that the coding with the highest q value is used"""
+        response = self.respond(
+            HttpResponse(BODY, content_type='application/json'),
+            'br;q=0.5, gzip;q=0.8')
+
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_not_accepted(self):
+        """Test that responses stay uncompressed if no coding matches"""
+        response = self.respond(
+            HttpResponse(BODY, content_type='application/json'),
+            'identity')
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, BODY)
+        self.assertIn('Accept-Encoding', response['Vary'])
+
+    def test_small_response_not_compressed(self):
+        """Test that responses under the threshold are not compressed"""
+        with self.settings(COMPRESSION_MIN_SIZE=len(BODY) + 1):
+            response = self.respond(
+                HttpResponse(BODY, content_type='application/json'))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response.content, BODY)
+
+    def test_images_not_compressed(self):
+        """Test that content types outside the allowlist are skipped"""
+        response = self.respond(HttpResponse(BODY, content_type='image/png'))
+
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertFalse(response.has_header('Vary'))
+
+    def test_encoded_response_not_compressed_again(self):
+        """Test that responses with a Content-Encoding are kept"""
+        original = HttpResponse(BODY, content_type='application/json')
+        original['Content-Encoding'] = 'gzip'
+
+        response = self.respond(original)
+
+        self.assertEqual(response.content, BODY)
+
+    def test_streaming_response(self):
+        """Test that streamed responses are compressed chunk by chunk"""
+        for encoding, decompress in (('br', brotli.decompress),
+                                     ('gzip', gzip.decompress)):
+            response = self.respond(
+                StreamingHttpResponse(
+                    (BODY[i:i + 100] for i in range(0, len(BODY), 100)),
+                    content_type='application/json'),
+                encoding)
+
+            self.assertEqual(response['Content-Encoding'], encoding)
+            self.assertEqual(
+                decompress(b''.join(response.streaming_content)), BODY)
+
+    def test_strong_etag_weakened(self):
+        """Test that the ETag of a compressed response becomes weak"""
+        original = HttpResponse(BODY, content_type='application/json')
+        original['ETag'] = '"abc"'
+
+        response = self.respond(original)
+
+        self.assertEqual(response['ETag'], 'W/"abc"')
+
+
+@override_settings(CATALOG_CACHE_SECONDS=60)
+class CatalogCacheTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        speciality = models.Speciality.objects.create(name='speciality')
+        for i in range(20):
+            procedure = models.Procedure.objects.create(
+                name=f'procedure {i}', overview='bla ' * 20)
+            procedure.speciality.set([speciality])
+
+    def test_cached_compressed_once(self):
+        """Test that the cached response is compressed only once"""
+        with patch('core.compression.compress',
+                   wraps=compression.compress) as compress:
+            res = self.client.get(PROCEDURE_URL,
+                                  HTTP_ACCEPT_ENCODING='gzip')
+            with self.assertNumQueries(0):
+                cached = self.client.get(PROCEDURE_URL,
+                                         HTTP_ACCEPT_ENCODING='gzip')
+
+        self.assertEqual(compress.call_count,
+                         len(compression.available_encodings()))
+        self.assertEqual(res['Content-Encoding'], 'gzip')
+        self.assertEqual(cached.content, res.content)
+        self.assertEqual(len(json.loads(gzip.decompress(cached.content))),
+                         20)
+        self.assertIn('Accept-Encoding', cached['Vary'])
+
+    def test_cached_response_identity(self):
+        """Test that clients without compression get the plain body"""
+        first = self.client.get(PROCEDURE_URL)
+        cached = self.client.get(PROCEDURE_URL)
+
+        self.assertFalse(cached.has_header('Content-Encoding'))
+        self.assertEqual(cached.content, first.content)
+        self.assertEqual(len(json.loads(cached.content)), 20)
+
+    def test_cached_per_media_type(self):
+        """Test that json and msgpack responses are cached apart"""
+        self.client.get(PROCEDURE_URL)
+        res = self.client.get(PROCEDURE_URL,
+                              HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(res['Content-Type'], 'application/msgpack')
+
+    def test_catalog_change_invalidates(self):
+        """Test that a catalog change is visible on the next request"""
+        self.client.get(PROCEDURE_URL)
+        self.client.get(SYNC_URL)
+
+        models.Procedure.objects.create(name='new procedure')
+
+        self.assertEqual(len(self.client.get(PROCEDURE_URL).json()), 21)
+        self.assertEqual(
+            len(self.client.get(SYNC_URL).json()['procedures']), 21)
+
+    def test_version_survives_eviction(self):
+        """Test that an evicted version does not revive old entries"""
+        version = caching.catalog_version()
+        cache.delete(caching.CATALOG_VERSION_KEY)
+
+        caching.catalog_changed()
+
+        self.assertNotEqual(caching.catalog_version(), version)
+
+    def test_errors_not_cached(self):
+        """Test that error responses are not cached"""
+        url = reverse('staff:procedure-detail', args=[0])
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        procedure = models.Procedure.objects.first()
+        url = reverse('staff:procedure-detail', args=[procedure.pk])
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+
+class CatalogCacheCheckTests(SimpleTestCase):
+
+    @override_settings(CATALOG_CACHE_SECONDS=60, DEBUG=False)
+    def test_process_local_cache_refused(self):
+        """Test that the catalog cache needs a shared cache"""
+        errors = checks.check_catalog_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['core.E001'])
+
+    @override_settings(CATALOG_CACHE_SECONDS=60, DEBUG=False, CACHES={
+        'default': {
+            'BACKEND':
+                'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': 'memcached:11211',
+        },
+    })
+    def test_shared_cache_allowed(self):
+        """Test that the catalog cache is allowed with memcached"""
+        self.assertEqual(checks.check_catalog_cache(None), [])
+
+    @override_settings(CATALOG_CACHE_SECONDS=0, DEBUG=False)
+    def test_cache_off_allowed(self):
+        """Test that a process local cache is fine with the cache off"""
+        self.assertEqual(checks.check_catalog_cache(None), [])
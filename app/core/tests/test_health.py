@@ -0,0 +1,98 @@
+from unittest.mock import MagicMock, patch
+
+import tempfile
+
+from django.db.utils import OperationalError
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+
+from core import health
+
+
+class HealthProbeTests(TestCase):
+    """Tests for the liveness and readiness probes"""
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_liveness(self):
+        """Test that liveness probe answers without the database"""
+        with patch('django.db.backends.base.base.BaseDatabaseWrapper'
+                   '.cursor', side_effect=OperationalError):
+            res = self.client.get(reverse('livez'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_readiness(self):
+        """Test that readiness probe answers when database is up"""
+        res = self.client.get(reverse('readyz'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_readiness_database_down(self):
+        """Test that readiness probe fails when database is down"""
+        with patch('django.db.backends.base.base.BaseDatabaseWrapper'
+                   '.cursor', side_effect=OperationalError):
+            res = self.client.get(reverse('readyz'))
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+
+
+class HealthzTests(TestCase):
+    """Tests for the health endpoint"""
+
+    def setUp(self):
+        self.client = Client()
+        self.media_root = tempfile.TemporaryDirectory()
+        self.settings = override_settings(MEDIA_ROOT=self.media_root.name)
+        self.settings.enable()
+        health.reset()
+
+    def tearDown(self):
+        self.settings.disable()
+        self.media_root.cleanup()
+        health.reset()
+
+    def test_healthz_reports_checks(self):
+        """Test that health endpoint reports every check"""
+        res = self.client.get(reverse('healthz'))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res.json()['status'], 'ok')
+        self.assertEqual(set(res.json()['checks']),
+                         {'database', 'cache', 'media'})
+
+    def test_healthz_failed_check(self):
+        """Test that failed check makes health endpoint unavailable"""
+        with override_settings(MEDIA_ROOT='/does/not/exist'), \
+                self.assertLogs('core.health', 'ERROR') as logs:
+            res = self.client.get(reverse('healthz'))
+
+        self.assertEqual(res.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        self.assertEqual(res.json()['status'], 'error')
+        self.assertFalse(res.json()['checks']['media']['ok'])
+        self.assertNotIn('/does/not/exist', res.content.decode())
+        self.assertIn('/does/not/exist', logs.output[0])
+        self.assertTrue(res.json()['checks']['database']['ok'])
+
+    @override_settings(HEALTHZ_CACHE_SECONDS=60)
+    def test_healthz_results_cached(self):
+        """Test that checks are not repeated within cache period"""
+        check_database = MagicMock()
+        with patch('core.health.CHECKS', [('database', check_database)]):
+            self.client.get(reverse('healthz'))
+            self.client.get(reverse('healthz'))
+
+        self.assertEqual(check_database.call_count, 1)
+
+    @override_settings(HEALTHZ_CACHE_SECONDS=0)
+    def test_healthz_results_expire(self):
+        """Test that checks run again after cache period"""
+        check_database = MagicMock()
+        with patch('core.health.CHECKS', [('database', check_database)]):
+            self.client.get(reverse('healthz'))
+            self.client.get(reverse('healthz'))
+
+        self.assertEqual(check_database.call_count, 2)
@@ -0,0 +1,116 @@
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models.functions import Lower
+from django.test import TestCase
+
+from core import models
+
+HOSPITALS = 4000
+USERS = 3000
+DOCTORS = 60
+
+
+class IndexPlanTests(TestCase):
+    """
+    Explains the hot filters on seeded data and checks that their plans
+    use the audited indexes instead of a sequential scan.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        get_user_model().objects.bulk_create(
+            get_user_model()(
+                email=f'user{i}@curesio.com',
+                username=f'user{i}',
+                password='!',
+                is_doctor=i < DOCTORS,
+                is_active=i >= DOCTORS // 3
+            )
+            for i in range(USERS)
+        )
+
+        # Hospitals are concentrated in a few states like in production
+        busy_states = ['WB', 'MH', 'DL', 'TN', 'KA']
+        states = [code for code, _ in models.States_And_Union_Territories
+                  .STATE_IN_STATE_CHOICES if code not in busy_states]
+        hospitals = models.Hospital.objects.bulk_create(
+            models.Hospital(
+                name=f'Hospital {i}',
+                state=busy_states[i % 5] if i % 10
+                else states[i // 10 % len(states)],
+                street_name='Main Road',
+                overview='Overview of the hospital. ' * 40
+            )
+            for i in range(HOSPITALS)
+        )
+        models.Service.objects.bulk_create(
+            models.Service(hospital=hospital, name=name)
+            for hospital in hospitals
+            for name in ('ICU', 'Pharmacy', 'Ambulance', 'Radiology',
+                         'Emergency')
+        )
+        models.HospitalLanguage.objects.bulk_create(
+            models.HospitalLanguage(hospital=hospital, language=language)
+            for language, every in ((models.Languages.ENGLISH, 1),
+                                    (models.Languages.HINDI, 3),
+                                    (models.Languages.BENGALI, 40))
+            for hospital in hospitals[::every]
+        )
+
+        with connection.cursor() as cursor:
+            for model in (get_user_model(), models.Hospital, models.Service,
+                          models.HospitalLanguage):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+
+    def assertUsesIndex(self, queryset, *indexes):
+        """Assert that the plan of queryset scans one of the indexes"""
+        plan = queryset.explain()
+        table = queryset.model._meta.db_table
+        self.assertNotIn(f'Seq Scan on {table}', plan)
+        self.assertTrue(any(index in plan for index in indexes), plan)
+
+    def test_doctor_listing_uses_index(self):
+        """Test that active and inactive doctors are found by index"""
+        users = get_user_model().objects
+        self.assertUsesIndex(users.filter(is_doctor=True, is_active=True),
+                             'user_doctor_active_idx')
+        self.assertUsesIndex(users.filter(is_doctor=True, is_active=False),
+                             'user_doctor_active_idx')
+        self.assertUsesIndex(users.filter(is_doctor=True),
+                             'user_doctor_active_idx')
+
+    def test_email_lookup_ignoring_case_uses_index(self):
+        """Test that lower(email) lookups use the functional index"""
+        queryset = get_user_model().objects.annotate(
+            email_lower=Lower('email')
+        ).filter(email_lower='user123@curesio.com')
+
+        self.assertUsesIndex(queryset, 'core_user_email_lower_uniq')
+
+    def test_hospital_state_filters_use_index(self):
+        """Test that state and country with state filters use indexes"""
+        hospitals = models.Hospital.objects
+        self.assertUsesIndex(hospitals.filter(state='GA'),
+                             'hospital_state_idx')
+        self.assertUsesIndex(hospitals.filter(country='IN', state='GA'),
+                             'hospital_state_idx',
+                             'hospital_country_state_idx')
+
+    def test_service_lookup_uses_composite_index(self):
+        """Test that services of a hospital are found by one index"""
+        hospital = models.Hospital.objects.order_by('?').first()
+        services = models.Service.objects
+        self.assertUsesIndex(services.filter(hospital=hospital, name='ICU'),
+                             'service_hospital_name_idx')
+        self.assertUsesIndex(
+            services.filter(hospital=hospital).order_by('name'),
+            'service_hospital_name_idx'
+        )
+
+    def test_hospital_language_filter_uses_index(self):
+        """Test that hospitals speaking a rare language use the index"""
+        self.assertUsesIndex(
+            models.HospitalLanguage.objects.filter(
+                language=models.Languages.BENGALI),
+            'hospital_language_idx'
+        )
@@ -0,0 +1,232 @@
+import datetime
+
+from django.contrib.auth import get_user_model
+from django.db import transaction, IntegrityError
+from django.test import TestCase, TransactionTestCase, Client
+from django.urls import reverse
+from django.utils import timezone
+
+from core import jobs
+from core.models import Job
+from core.signals import users_bulk_updated
+
+
+def create_users(count):
+    """Creates given number of users and returns their pks"""
+    return [
+        get_user_model().objects.create_user(
+            email=f'test{i}@curesio.com',
+            password='testpass@123',
+            username=f'testuser{i}'
+        ).pk
+        for i in range(count)
+    ]
+
+
+class JobTests(TransactionTestCase):
+    """Tests for running queued jobs"""
+
+    def test_update_users_job_in_chunks(self):
+        """Test that update users job updates all users chunk by chunk"""
+        pks = create_users(5)
+        received = []
+
+        def receiver(sender, pks, values, **kwargs):
+            received.append((pks, values))
+
+        users_bulk_updated.connect(receiver)
+        self.addCleanup(users_bulk_updated.disconnect, receiver)
+
+        job = jobs.enqueue('core.update_users', pks=pks,
+                           values={'is_active': False}, chunk_size=2)
+        count = jobs.run_pending_jobs()
+        job.refresh_from_db()
+
+        self.assertEqual(count, 1)
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.total, 5)
+        self.assertEqual(job.processed, 5)
+        self.assertFalse(get_user_model().objects.filter(
+            pk__in=pks, is_active=True).exists())
+        self.assertEqual(len(received), 3)
+        self.assertEqual(sorted(sum([r[0] for r in received], [])), pks)
+
+    def test_failed_job_records_error(self):
+        """Test that exception in a job marks the job as failed"""
+        job = jobs.enqueue('core.update_users', max_attempts=1, pks=[1],
+                           values={'not_a_field': True})
+        jobs.run_pending_jobs()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIn('not_a_field', job.error)
+
+    def test_enqueue_unknown_job_fails(self):
+        """Test that enqueueing unregistered job raises error"""
+        with self.assertRaises(ValueError):
+            jobs.enqueue('core.unknown')
+
+
+class AdminBulkActionTests(TestCase):
+    """Tests for admin bulk actions on users"""
+
+    def setUp(self):
+        self.client = Client()
+        self.admin_user = get_user_model().objects.create_superuser(
+            email='admin@curesio.com',
+            password='test_passs@123',
+            username='adminuser'
+        )
+        self.client.force_login(self.admin_user)
+
+    def test_deactivate_accounts_queues_job(self):
+        """Test that deactivate action queues a job instead of updating"""
+        pks = create_users(2)
+        url = reverse('admin:core_user_changelist')
+
+        res = self.client.post(url, {
+            'action': 'deactivate_accounts',
+            '_selected_action': pks
+        }, follow=True)
+        job = Job.objects.get()
+
+        self.assertContains(res, f'Queued job #{job.pk}')
+        self.assertEqual(job.name, 'core.update_users')
+        self.assertEqual(sorted(job.payload['pks']), pks)
+        self.assertEqual(job.payload['values'], {'is_active': False})
+        self.assertEqual(get_user_model().objects.filter(
+            pk__in=pks, is_active=True).count(), 2)
+
+
+class JobRetryTests(TransactionTestCase):
+    """Tests for retrying failed jobs"""
+
+    def test_failed_job_is_retried_with_backoff(self):
+        """Test that failed job is queued again until max attempts"""
+        job = jobs.enqueue('core.update_users', max_attempts=2, pks=[1],
+                           values={'not_a_field': True})
+
+        jobs.run_pending_jobs()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_after, job.finished_date)
+        self.assertIsNone(jobs.claim_job())
+
+        Job.objects.filter(pk=job.pk).update(run_after=job.created_date)
+        jobs.run_pending_jobs()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_stale_running_job_is_retried(self):
+        """Test that job of a stopped worker is queued again"""
+        job = jobs.enqueue('core.noop', max_attempts=2)
+        claimed = jobs.claim_job()
+        self.assertEqual(claimed.pk, job.pk)
+
+        # The worker stops here without recording the outcome
+        self.assertEqual(jobs.requeue_stale_jobs(), [])
+        with self.settings(JOB_HEARTBEAT_TIMEOUT_SECONDS=0):
+            self.assertEqual(
+                [stale.pk for stale in jobs.requeue_stale_jobs()], [job.pk])
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_after, job.started_date)
+        self.assertIn('worker stopped', job.error)
+
+        Job.objects.filter(pk=job.pk).update(run_after=job.created_date)
+        self.assertEqual(jobs.run_pending_jobs(), 1)
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual(job.attempts, 2)
+
+    def test_heartbeat_keeps_job_running(self):
+        """Test that job reporting progress is not taken for stale"""
+        jobs.enqueue('core.noop')
+        job = jobs.claim_job()
+        Job.objects.filter(pk=job.pk).update(
+            heartbeat_date=timezone.now() - datetime.timedelta(hours=1))
+
+        job.add_progress(1)
+
+        with self.settings(JOB_HEARTBEAT_TIMEOUT_SECONDS=60):
+            self.assertEqual(jobs.requeue_stale_jobs(), [])
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.RUNNING)
+
+    def test_outdated_worker_does_not_change_job(self):
+        """Test that worker of a requeued attempt leaves the row alone"""
+        jobs.enqueue('core.noop')
+        outdated = jobs.claim_job()
+        with self.settings(JOB_HEARTBEAT_TIMEOUT_SECONDS=0):
+            jobs.requeue_stale_jobs()
+        Job.objects.filter(pk=outdated.pk).update(run_after=timezone.now())
+        current = jobs.claim_job()
+
+        outdated.add_progress(1)
+        jobs.run_job(outdated)
+        current.refresh_from_db()
+
+        self.assertEqual(current.status, Job.RUNNING)
+        self.assertEqual(current.attempts, 2)
+        self.assertEqual(current.processed, 0)
+
+        jobs.run_job(current)
+        current.refresh_from_db()
+        self.assertEqual(current.status, Job.DONE)
+
+    def test_retried_job_progress_starts_over(self):
+        """Test that progress of a failed attempt is not counted again"""
+        pks = create_users(3)
+        job = jobs.enqueue('core.update_users', pks=pks,
+                           values={'is_active': False}, chunk_size=2)
+        claimed = jobs.claim_job()
+        claimed.set_total(3)
+        claimed.add_progress(2)
+        with self.settings(JOB_HEARTBEAT_TIMEOUT_SECONDS=0):
+            jobs.requeue_stale_jobs()
+        Job.objects.filter(pk=job.pk).update(run_after=timezone.now())
+
+        jobs.run_pending_jobs()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.DONE)
+        self.assertEqual((job.processed, job.total), (3, 3))
+
+    def test_stale_job_fails_after_max_attempts(self):
+        """Test that stale job with no attempts left is failed"""
+        jobs.enqueue('core.noop', max_attempts=1)
+        job = jobs.claim_job()
+
+        with self.settings(JOB_HEARTBEAT_TIMEOUT_SECONDS=0):
+            jobs.requeue_stale_jobs()
+        job.refresh_from_db()
+
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertIsNone(jobs.claim_job())
+
+    def test_retry_delay_doubles(self):
+        """Test that retry delay grows exponentially up to the maximum"""
+        with self.settings(JOB_RETRY_BACKOFF_SECONDS=5,
+                           JOB_RETRY_BACKOFF_MAX_SECONDS=30):
+            self.assertEqual(jobs.retry_delay(1), 5)
+            self.assertEqual(jobs.retry_delay(2), 10)
+            self.assertEqual(jobs.retry_delay(3), 20)
+            self.assertEqual(jobs.retry_delay(4), 30)
+
+    def test_job_enqueued_in_rolled_back_transaction_is_discarded(self):
+        """Test that workers never see jobs from rolled back requests"""
+        try:
+            with transaction.atomic():
+                jobs.enqueue('core.noop')
+                raise IntegrityError
+        except IntegrityError:
+            pass
+
+        self.assertFalse(Job.objects.exists())
@@ -0,0 +1,75 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+
+from prometheus_client import REGISTRY
+
+METRICS_URL = reverse('metrics')
+
+
+def get_sample(name, **labels):
+    """Returns current value of a metric sample"""
+    return REGISTRY.get_sample_value(name, labels) or 0
+
+
+class RequestMetricsTests(TestCase):
+    """Tests for request metrics middleware and endpoint"""
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_request_recorded_by_url_name(self):
+        """Test that request is recorded under its resolved url name"""
+        url = reverse('staff:procedure-list')
+        before = get_sample('http_request_duration_seconds_count',
+                            view='staff:procedure-list', method='GET',
+                            status='200')
+        queries_before = get_sample('http_request_db_queries_sum',
+                                    view='staff:procedure-list')
+
+        self.client.get(url)
+
+        after = get_sample('http_request_duration_seconds_count',
+                           view='staff:procedure-list', method='GET',
+                           status='200')
+        queries_after = get_sample('http_request_db_queries_sum',
+                                   view='staff:procedure-list')
+        self.assertEqual(after - before, 1)
+        self.assertEqual(queries_after - queries_before, 1)
+
+    def test_metrics_endpoint(self):
+        """Test that metrics are exposed in prometheus text format"""
+        self.client.get(reverse('staff:procedure-list'))
+
+        res = self.client.get(METRICS_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        self.assertContains(
+            res, 'http_request_duration_seconds_count{method="GET",'
+                 'status="200",view="staff:procedure-list"}')
+
+    def test_metrics_other_network_forbidden(self):
+        """Test that metrics are hidden from clients outside the networks"""
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='203.0.113.5')
+
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(METRICS_ALLOWED_NETWORKS=['10.0.0.0/8'])
+    def test_metrics_allowed_network(self):
+        """Test that clients in the allowed networks get metrics"""
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='10.1.2.3')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_token(self):
+        """Test that the metrics token lets any client in"""
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='203.0.113.5',
+                              HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        res = self.client.get(METRICS_URL, REMOTE_ADDR='203.0.113.5',
+                              HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(res.status_code, status.HTTP_403_FORBIDDEN)
@@ -3,6 +3,7 @@ import datetime
 
 from unittest.mock import patch
 
+from django.db import IntegrityError
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
@@ -38,6 +39,33 @@ class UserModelTests(TestCase):
 
         self.assertEqual(user.email, email.lower())
 
+    def test_email_stored_in_canonical_form(self):
+        """Test that the whole email is lowercased when saved"""
+        user = get_user_model().objects.create_user(
+            email=' Test.User@Curesio.com ',
+            password='test_pass@123',
+            username='testuser'
+        )
+        self.assertEqual(user.email, 'test.user@curesio.com')
+
+        user.email = 'Other@Curesio.com'
+        user.save()
+        user.refresh_from_db()
+        self.assertEqual(user.email, 'other@curesio.com')
+
+    def test_get_user_by_email_in_any_case(self):
+        """Test that users are found by email typed in any case"""
+        user = get_user_model().objects.create_user(
+            email='test@curesio.com',
+            password='test_pass@123',
+            username='testuser'
+        )
+
+        self.assertEqual(
+            get_user_model().objects.get_by_email('TEST@Curesio.COM'), user)
+        with self.assertRaises(get_user_model().DoesNotExist):
+            get_user_model().objects.get_by_email('other@curesio.com')
+
     def test_email_required(self):
         """Test that email is required to create a new user"""
         with self.assertRaises(ValueError):
@@ -222,6 +250,50 @@ class DoctorTests(TestCase):
         self.assertEqual(
             str(doctor_profile.speciality4), 'core.Speciality.None')
 
+    def test_create_doctor_with_profiles(self):
+        """Test that doctor is created with the given profile details"""
+        doctor = get_user_model().objects.create_doctor(
+            email='doctor@curesio.com',
+            username='doctorname',
+            password='doctorname@curesio.com',
+            profile={'first_name': 'first', 'city': 'Kolkata'},
+            doctor_profile={
+                'qualification': 'MBBS',
+                'speciality1': [self.speciality1, self.speciality1],
+                'speciality2': [self.speciality2.pk]
+            }
+        )
+
+        with self.assertNumQueries(0):
+            self.assertEqual(doctor.profile.first_name, 'first')
+            self.assertEqual(list(doctor.doctor_profile.speciality1.all()),
+                             [self.speciality1])
+            self.assertEqual(list(doctor.doctor_profile.speciality3.all()),
+                             [])
+        doctor_profile = Doctor.objects.get(user=doctor)
+        self.assertEqual(UserProfile.objects.get(user=doctor).city,
+                         'Kolkata')
+        self.assertEqual(doctor_profile.qualification, 'MBBS')
+        self.assertEqual(list(doctor_profile.speciality1.all()),
+                         [self.speciality1])
+        self.assertEqual(list(doctor_profile.speciality2.all()),
+                         [self.speciality2])
+
+    def test_create_doctor_in_one_transaction(self):
+        """Test that a failed doctor creation leaves no rows behind"""
+        with patch('core.models.Token.save',
+                   side_effect=IntegrityError('token')):
+            with self.assertRaises(IntegrityError):
+                get_user_model().objects.create_doctor(
+                    email='doctor@curesio.com',
+                    username='doctorname',
+                    password='doctorname@curesio.com'
+                )
+
+        self.assertFalse(get_user_model().objects.exists())
+        self.assertFalse(UserProfile.objects.exists())
+        self.assertFalse(Doctor.objects.exists())
+
 
 class SpecialityTests(TestCase):
     """Tests the speciality model"""
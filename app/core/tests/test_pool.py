@@ -0,0 +1,111 @@
+import threading
+
+from unittest.mock import patch
+
+import psycopg2
+
+from django.db import connection, connections
+from django.test import SimpleTestCase
+
+from core.backends.postgresql_pool.base import ConnectionPool, \
+    close_idle_connections
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Tests for the in process connection pool"""
+    databases = {'default'}
+
+    def setUp(self):
+        self.params = connection.get_connection_params()
+        self.pool = ConnectionPool(size=2, timeout=0.1)
+        self.addCleanup(self.pool.close_idle)
+
+    def test_connection_reused(self):
+        """Test that returned connection is handed out again"""
+        first = self.pool.get(self.params)
+        self.pool.put(first)
+
+        self.assertIs(self.pool.get(self.params), first)
+
+    def test_pool_bounded(self):
+        """Test that no more than size connections are handed out"""
+        connections = [self.pool.get(self.params) for _ in range(2)]
+
+        with self.assertRaises(psycopg2.OperationalError):
+            self.pool.get(self.params)
+
+        self.pool.put(connections[0])
+        self.assertIs(self.pool.get(self.params), connections[0])
+
+    def test_open_transaction_rolled_back(self):
+        """Test that connection is returned without open transaction"""
+        conn = self.pool.get(self.params)
+        conn.cursor().execute('SELECT 1')
+
+        self.pool.put(conn)
+
+        self.assertEqual(conn.info.transaction_status,
+                         psycopg2.extensions.TRANSACTION_STATUS_IDLE)
+
+    def test_closed_connection_discarded(self):
+        """Test that closed connection is not handed out again"""
+        conn = self.pool.get(self.params)
+        conn.close()
+        self.pool.put(conn)
+
+        self.assertIsNot(self.pool.get(self.params), conn)
+
+    def test_dead_connection_discarded(self):
+        """Test that idle connections are checked before reuse"""
+        pool = ConnectionPool(size=2, timeout=0.1, check_seconds=0)
+        self.addCleanup(pool.close_idle)
+        conns = [pool.get(self.params) for _ in range(2)]
+        pids = [conn.get_backend_pid() for conn in conns]
+        for conn in conns:
+            pool.put(conn)
+        with connections['default'].cursor() as cursor:
+            for pid in pids:
+                cursor.execute('SELECT pg_terminate_backend(%s)', [pid])
+
+        conn = pool.get(self.params)
+
+        self.assertNotIn(conn, conns)
+        self.assertTrue(all(dead.closed for dead in conns))
+        with conn.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        pool.put(conn)
+
+    def test_threads_share_connections(self):
+        """Test that many threads open at most size connections"""
+        connections.databases['pool-test'] = dict(
+            connection.settings_dict, POOL_SIZE=2, POOL_TIMEOUT=5,
+            ENGINE='core.backends.postgresql_pool')
+        self.addCleanup(connections.databases.pop, 'pool-test')
+        self.addCleanup(close_idle_connections)
+        opened = []
+        errors = []
+        connect = psycopg2.connect
+
+        def counting_connect(**params):
+            opened.append(1)
+            return connect(**params)
+
+        def work():
+            wrapper = connections['pool-test']
+            try:
+                for _ in range(5):
+                    with wrapper.cursor() as cursor:
+                        cursor.execute('SELECT pg_sleep(0.01)')
+                    wrapper.close()
+            except Exception as error:
+                errors.append(error)
+
+        with patch('psycopg2.connect', side_effect=counting_connect):
+            threads = [threading.Thread(target=work) for _ in range(8)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertLessEqual(len(opened), 2)
@@ -0,0 +1,115 @@
+import gc
+import io
+import os
+import runpy
+
+from unittest.mock import patch
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.core.handlers.wsgi import WSGIHandler
+from django.core.signals import request_finished, request_started
+from django.db import close_old_connections, connection
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.db import close_unusable_connections
+from core.models import Procedure
+
+# Set MEMORY_TEST_REQUESTS=100000 for the full soak run
+MEMORY_TEST_REQUESTS = int(os.environ.get('MEMORY_TEST_REQUESTS', 1000))
+
+
+SETTINGS_PATH = os.path.join(settings.BASE_DIR, 'app', 'settings.py')
+
+
+class ProductionSettingsTests(TestCase):
+    """Tests for settings loaded in production"""
+
+    def test_missing_secret_key_fails(self):
+        """Test that production refuses to start without a secret key"""
+        environ = {key: value for key, value in os.environ.items()
+                   if key != 'SECRET_KEY'}
+        environ['DJANGO_ENV'] = 'production'
+        with patch.dict(os.environ, environ, clear=True):
+            with self.assertRaises(ImproperlyConfigured):
+                runpy.run_path(SETTINGS_PATH)
+
+    def test_secret_key_read_from_environment(self):
+        """Test that production uses the secret key it is given"""
+        with patch.dict(os.environ, DJANGO_ENV='production',
+                        SECRET_KEY='production-key'):
+            loaded = runpy.run_path(SETTINGS_PATH)
+
+        self.assertEqual(loaded['SECRET_KEY'], 'production-key')
+
+
+class ConnectionHealthCheckTests(TestCase):
+    """Tests for the persistent connection health check"""
+
+    @patch.dict(connection.settings_dict, CONN_MAX_AGE=60)
+    def test_unusable_connection_closed(self):
+        """Test that broken persistent connection is closed"""
+        connection.ensure_connection()
+        with patch.object(connection, 'is_usable', return_value=False), \
+                patch.object(connection, 'close') as close:
+            close_unusable_connections()
+
+        close.assert_called_once_with()
+
+    @patch.dict(connection.settings_dict, CONN_MAX_AGE=60)
+    def test_usable_connection_kept(self):
+        """Test that working persistent connection is kept open"""
+        connection.ensure_connection()
+        with patch.object(connection, 'close') as close:
+            close_unusable_connections()
+
+        close.assert_not_called()
+
+
+@override_settings(DEBUG=False)
+class WorkerMemoryTests(TestCase):
+    """Tests that serving requests does not grow worker memory"""
+
+    def setUp(self):
+        self.handler = WSGIHandler()
+        for i in range(5):
+            Procedure.objects.create(name=f'procedure{i}', overview='bla')
+
+        # The test database connection must stay open inside the test
+        for signal in (request_started, request_finished):
+            signal.disconnect(close_old_connections)
+            self.addCleanup(signal.connect, close_old_connections)
+
+    def get(self, path):
+        """Serves a request through the wsgi handler like a worker does"""
+        environ = {
+            'REQUEST_METHOD': 'GET',
+            'PATH_INFO': path,
+            'QUERY_STRING': '',
+            'SERVER_NAME': 'testserver',
+            'SERVER_PORT': '80',
+            'HTTP_ACCEPT': 'application/json',
+            'wsgi.input': io.BytesIO(),
+            'wsgi.url_scheme': 'http',
+        }
+        response = self.handler(environ, lambda status, headers: None)
+        b''.join(response)
+        response.close()
+        self.assertEqual(response.status_code, 200)
+
+    def test_memory_flat_over_requests(self):
+        """Test that memory stays flat while serving many requests"""
+        url = reverse('staff:procedure-list')
+        for _ in range(200):
+            self.get(url)
+
+        gc.collect()
+        before = len(gc.get_objects())
+        for _ in range(MEMORY_TEST_REQUESTS):
+            self.get(url)
+        gc.collect()
+        growth = len(gc.get_objects()) - before
+
+        self.assertEqual(len(connection.queries_log), 0)
+        self.assertLess(growth, 100)
@@ -0,0 +1,77 @@
+import marshal
+
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient
+
+PROCEDURE_URL = reverse('staff:procedure-list')
+
+
+class RequestProfilerTests(TestCase):
+    """Tests for the staff request profiler"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_user(
+            'staff@curesio.com', 'testpass', 'staff', is_staff=True)
+        self.user = get_user_model().objects.create_user(
+            'user@curesio.com', 'testpass', 'user')
+
+    def authenticate(self, user):
+        token, _ = Token.objects.get_or_create(user=user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {token.key}')
+
+    def test_staff_gets_profile_report(self):
+        """Test that staff user gets profile with category breakdown"""
+        self.authenticate(self.staff)
+
+        res = self.client.get(PROCEDURE_URL, {'profile': '1'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        report = res.content.decode()
+        self.assertIn(f'GET {PROCEDURE_URL}?profile=1 200', report)
+        for label in ('orm', 'serializer', 'renderer', 'other'):
+            self.assertIn(f'  {label}', report)
+        self.assertIn('cumulative', report)
+
+    def test_profile_requested_by_header(self):
+        """Test that header triggers profile in pstats format"""
+        self.authenticate(self.staff)
+
+        res = self.client.get(PROCEDURE_URL, HTTP_X_PROFILE='pstats')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/octet-stream')
+        self.assertIsInstance(marshal.loads(res.content), dict)
+
+    def test_non_staff_gets_normal_response(self):
+        """Test that profile flag is ignored for other users"""
+        self.authenticate(self.user)
+
+        res = self.client.get(PROCEDURE_URL, {'profile': '1'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/json')
+
+    def test_anonymous_gets_normal_response(self):
+        """Test that profile flag is ignored without authentication"""
+        res = self.client.get(PROCEDURE_URL, HTTP_X_PROFILE='1')
+
+        self.assertEqual(res['Content-Type'], 'application/json')
+
+    @patch('core.profiling.is_staff')
+    def test_no_checks_without_flag(self, is_staff):
+        """Test that requests without flag skip the profiler checks"""
+        self.authenticate(self.staff)
+
+        res = self.client.get(PROCEDURE_URL)
+
+        self.assertEqual(res['Content-Type'], 'application/json')
+        is_staff.assert_not_called()
@@ -0,0 +1,193 @@
+import datetime
+import decimal
+import io
+import json
+import uuid
+
+from collections import OrderedDict
+from unittest.mock import patch
+
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+
+import msgpack
+
+from django_countries.fields import Country
+from phonenumber_field.phonenumber import to_python
+
+from rest_framework import renderers
+from rest_framework.exceptions import ParseError
+
+from core.parsers import JSONParser, MessagePackParser
+from core.renderers import JSONRenderer, JSONEncoder, \
+    MessagePackRenderer
+
+
+def payload():
+    """Returns data with every type the api renders"""
+    return OrderedDict([
+        ('id', 1),
+        ('name', 'Knee replacement क'),
+        ('experience', decimal.Decimal('12.50')),
+        ('created_date', datetime.datetime(
+            2020, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc)),
+        ('date_of_birth', datetime.date(1990, 5, 17)),
+        ('opens', datetime.time(9, 30)),
+        ('uuid', uuid.UUID('12345678123456781234567812345678')),
+        ('phone', to_python('+919876543210')),
+        ('country', Country('IN')),
+        ('label', gettext_lazy('English')),
+        ('speciality', [1, 2, 3]),
+        ('profile', {'city': 'Kolkata', 'rating': 4.5, 'verified': True,
+                     'image': None}),
+    ])
+
+
+class JSONRendererTests(SimpleTestCase):
+
+    def stdlib_render(self, data):
+        """Renders with the rest framework renderer and our encoder"""
+        renderer = renderers.JSONRenderer()
+        renderer.encoder_class = JSONEncoder
+        return renderer.render(data)
+
+    def test_renders_like_stdlib_renderer(self):
+        """Test that orjson output matches the stdlib json output"""
+        data = payload()
+
+        self.assertEqual(JSONRenderer().render(data),
+                         self.stdlib_render(data))
+
+    def test_special_types(self):
+        """Test rendering of decimals, dates, phones and countries"""
+        rendered = JSONRenderer().render(payload()).decode()
+
+        self.assertIn('"experience":12.5', rendered)
+        self.assertIn('"created_date":"2020-01-02T03:04:05.678901Z"',
+                      rendered)
+        self.assertIn('"date_of_birth":"1990-05-17"', rendered)
+        self.assertIn('"opens":"09:30:00"', rendered)
+        self.assertIn('"phone":"+919876543210"', rendered)
+        self.assertIn('"country":"IN"', rendered)
+        self.assertIn('"label":"English"', rendered)
+
+    def test_falls_back_without_orjson(self):
+        """Test that the stdlib json module is used without orjson"""
+        data = payload()
+
+        with patch('core.renderers.orjson', None):
+            rendered = JSONRenderer().render(data)
+
+        self.assertEqual(rendered, self.stdlib_render(data))
+
+    def test_indented_output_uses_stdlib(self):
+        """Test that indented output for the browsable api is unchanged"""
+        renderer = JSONRenderer()
+        rendered = renderer.render({'a': [1]}, 'application/json; indent=4')
+
+        self.assertEqual(rendered, b'{\n    "a": [\n        1\n    ]\n}')
+
+    def test_large_integer_falls_back(self):
+        """Test that integers orjson cannot encode are rendered"""
+        self.assertEqual(JSONRenderer().render({'id': 2 ** 70}),
+                         b'{"id":1180591620717411303424}')
+
+    def test_line_separators_escaped(self):
+        """Test that output stays a strict javascript subset"""
+        self.assertEqual(JSONRenderer().render(['a b c']),
+                         b'["a\\u2028b\\u2029c"]')
+
+    def test_none_renders_empty(self):
+        """Test that no data renders an empty body"""
+        self.assertEqual(JSONRenderer().render(None), b'')
+
+
+class JSONParserTests(SimpleTestCase):
+
+    def parse(self, body, encoding='utf-8'):
+        return JSONParser().parse(io.BytesIO(body), 'application/json',
+                                  {'encoding': encoding})
+
+    def test_parse(self):
+        """Test that json bodies are parsed"""
+        self.assertEqual(
+            self.parse('{"name": "क", "ids": [1, 2.5, null]}'.encode()),
+            {'name': 'क', 'ids': [1, 2.5, None]}
+        )
+
+    def test_parse_invalid_json_fails(self):
+        """Test that invalid json raises a parse error"""
+        for body in (b'{"name": ', b'[NaN]', b'\xff'):
+            with self.assertRaises(ParseError):
+                self.parse(body)
+
+    def test_parse_large_integers(self):
+        """Test that integers over 64 bits are parsed exactly"""
+        for number in (2 ** 64, -2 ** 63 - 1,
+                       123456789012345678901234567890):
+            self.assertEqual(self.parse(f'{{"id": {number}}}'.encode()),
+                             {'id': number})
+
+    def test_parse_large_integer_invalid_fails(self):
+        """Test that invalid json with long numbers raises a parse error"""
+        with self.assertRaises(ParseError):
+            self.parse(b'[12345678901234567890, ')
+
+    def test_parse_other_encoding(self):
+        """Test that bodies in other encodings are parsed"""
+        self.assertEqual(self.parse('["é"]'.encode('latin-1'),
+                                    'latin-1'),
+                         ['é'])
+
+    def test_parse_without_orjson(self):
+        """Test that the stdlib json module is used without orjson"""
+        with patch('core.parsers.orjson', None):
+            self.assertEqual(self.parse(b'{"a": 1}'), {'a': 1})
+
+
+class MessagePackTests(SimpleTestCase):
+
+    def test_render_same_values_as_json(self):
+        """Test that msgpack holds the values of the JSON output"""
+        data = payload()
+
+        self.assertEqual(
+            msgpack.unpackb(MessagePackRenderer().render(data)),
+            json.loads(JSONRenderer().render(data))
+        )
+
+    def test_render_none_empty(self):
+        """Test that no data renders an empty body"""
+        self.assertEqual(MessagePackRenderer().render(None), b'')
+
+    def test_render_large_integers(self):
+        """Test that integers over 64 bits are rendered as strings"""
+        data = {'ids': [2 ** 64 - 1, -2 ** 63, 2 ** 70, -2 ** 70]}
+
+        self.assertEqual(
+            msgpack.unpackb(MessagePackRenderer().render(data)),
+            {'ids': [2 ** 64 - 1, -2 ** 63, '1180591620717411303424',
+                     '-1180591620717411303424']}
+        )
+
+    def test_parse(self):
+        """Test that msgpack bodies are parsed with timestamps"""
+        created = datetime.datetime(2020, 1, 2, 3, 4, 5,
+                                    tzinfo=datetime.timezone.utc)
+        body = msgpack.packb({'name': 'क', 'ids': [1, 2.5, None],
+                              'created': created, 'image': b'\x00'},
+                             datetime=True)
+
+        self.assertEqual(
+            MessagePackParser().parse(io.BytesIO(body)),
+            {'name': 'क', 'ids': [1, 2.5, None], 'created': created,
+             'image': b'\x00'}
+        )
+
+    def test_parse_invalid_fails(self):
+        """Test that invalid msgpack raises a parse error"""
+        for body in (b'\xc1', b'\x92\x01', msgpack.packb(1) + b'\x01',
+                     msgpack.packb({1: 'a'})):
+            with self.assertRaises(ParseError):
+                MessagePackParser().parse(io.BytesIO(body))
@@ -0,0 +1,227 @@
+import os
+import tempfile
+
+from unittest.mock import patch
+
+from prometheus_client import REGISTRY
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connections
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import checks, routers, slow_queries
+from core.models import Procedure, UserProfile
+
+PROCEDURE_URL = reverse('staff:procedure-list')
+SYNC_URL = reverse('staff:sync')
+ME_URL = reverse('user:me')
+
+
+class ReplicaDatabaseTestCase(TestCase):
+    """
+    Test case with a second local database standing in for a replica.
+    Rows are written to each database separately, so the response tells
+    which database served the read.
+    """
+    databases = {'default', 'replica'}
+
+    @classmethod
+    def setUpClass(cls):
+        replica = dict(connections['default'].settings_dict)
+        replica['TEST'] = {'NAME': f"{replica['NAME']}_replica"}
+        connections.databases['replica'] = replica
+        connections.ensure_defaults('replica')
+        connections.prepare_test_settings('replica')
+        cls.replica_name = connections['replica'].creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        connections['replica'].creation.destroy_test_db(
+            cls.replica_name, verbosity=0)
+        del connections.databases['replica']
+        del connections['replica']
+
+    def setUp(self):
+        self.settings = override_settings(REPLICA_DATABASES=['replica'])
+        self.settings.enable()
+        self.addCleanup(self.settings.disable)
+        routers.forget_replica_status()
+        cache.clear()
+
+
+class ReplicaRouterTests(ReplicaDatabaseTestCase):
+    """Tests for routing reads to replicas"""
+
+    def setUp(self):
+        super().setUp()
+        self.client = APIClient()
+        self.staff = get_user_model().objects.create_user(
+            'staff@curesio.com', 'testpass', 'staff', is_staff=True)
+        Procedure.objects.create(name='primary', overview='bla')
+        Procedure.objects.using('replica').bulk_create([
+            Procedure(name='replica', overview='bla')
+        ])
+
+    def procedure_names(self, client=None):
+        res = (client or self.client).get(PROCEDURE_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        return [procedure['name'] for procedure in res.data]
+
+    def test_safe_read_uses_replica(self):
+        """Test that procedure list is read from the replica"""
+        self.assertEqual(self.procedure_names(), ['replica'])
+
+    def test_session_pinned_after_write(self):
+        """Test that reads after a write stay on the primary"""
+        self.client.force_authenticate(self.staff)
+
+        res = self.client.post(PROCEDURE_URL,
+                               {'name': 'new', 'overview': 'bla'})
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertIn(routers.PIN_COOKIE, res.cookies)
+        self.assertEqual(self.procedure_names(), ['primary', 'new'])
+
+    def test_user_pinned_after_write(self):
+        """Test that user is pinned to primary without the cookie"""
+        self.client.force_authenticate(self.staff)
+        self.client.post(PROCEDURE_URL, {'name': 'new', 'overview': 'bla'})
+
+        other_client = APIClient()
+        other_client.force_authenticate(self.staff)
+
+        self.assertEqual(self.procedure_names(other_client),
+                         ['primary', 'new'])
+        self.assertEqual(self.procedure_names(APIClient()), ['replica'])
+
+    @patch('core.routers.replica_lag', return_value=60)
+    def test_lagging_replica_out_of_rotation(self, replica_lag):
+        """Test that lagging replica is not used"""
+        self.assertEqual(self.procedure_names(), ['primary'])
+
+    @patch('core.routers.replica_lag', side_effect=OperationalError)
+    def test_unreachable_replica_out_of_rotation(self, replica_lag):
+        """Test that replica which cannot be reached is not used"""
+        self.assertEqual(self.procedure_names(), ['primary'])
+
+    @override_settings(REPLICA_CHECK_SECONDS=60)
+    @patch('core.routers.replica_lag', return_value=0)
+    def test_lag_check_cached(self, replica_lag):
+        """Test that replica lag is not checked on every request"""
+        self.procedure_names()
+        self.procedure_names()
+
+        self.assertEqual(replica_lag.call_count, 1)
+
+    @override_settings(CATALOG_CACHE_SECONDS=60)
+    def test_catalog_cache_filled_from_primary(self):
+        """Test that cached catalog responses are read from the primary"""
+        for _ in range(2):
+            res = self.client.get(PROCEDURE_URL)
+
+            self.assertEqual([procedure['name'] for procedure in res.json()],
+                             ['primary'])
+
+    @patch('core.routers.replica_lag', return_value=0)
+    def test_replica_queries_measured(self, replica_lag):
+        """Test that replica queries are in the metrics and slow log"""
+        tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(tempdir.cleanup)
+        log = os.path.join(tempdir.name, 'slow.log')
+        labels = {'view': 'staff:procedure-list'}
+
+        def queries():
+            return REGISTRY.get_sample_value(
+                'http_request_db_queries_sum', labels) or 0
+
+        before = queries()
+        with override_settings(SLOW_QUERY_LOG=log,
+                               SLOW_QUERY_THRESHOLD_MS=0):
+            self.assertEqual(self.procedure_names(APIClient()), ['replica'])
+        for handler in list(slow_queries.logger.handlers):
+            slow_queries.logger.removeHandler(handler)
+            handler.close()
+
+        self.assertEqual(queries() - before, 1)
+        self.assertEqual(
+            [record['database'] for record in slow_queries.read_log(log)],
+            ['replica'])
+
+    def test_other_views_use_primary(self):
+        """Test that views without replica reads use the primary"""
+        res = self.client.get(SYNC_URL)
+
+        self.assertEqual([procedure['name'] for procedure in
+                          res.data['procedures']], ['primary'])
+
+
+class ReplicaProfileTests(ReplicaDatabaseTestCase):
+    """Tests for reading profiles from replicas"""
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(
+            'test@curesio.com', 'testpass', 'test')
+        UserProfile.objects.filter(user=self.user).update(first_name='new')
+        get_user_model().objects.using('replica').bulk_create(
+            [get_user_model()(pk=self.user.pk, email=self.user.email,
+                              username=self.user.username)])
+        UserProfile.objects.using('replica').bulk_create(
+            [UserProfile(user_id=self.user.pk, first_name='old')])
+        self.client = APIClient()
+        self.client.force_authenticate(
+            get_user_model().objects.get(pk=self.user.pk))
+
+    def test_profile_read_from_replica(self):
+        """Test that profile is read from the replica"""
+        res = self.client.get(ME_URL)
+
+        self.assertEqual(res.data['profile']['first_name'], 'old')
+
+    def test_profile_read_from_primary_after_update(self):
+        """Test that updated profile is read back from the primary"""
+        self.client.patch(ME_URL, {'profile': {'last_name': 'name'}},
+                          format='json')
+
+        other_client = APIClient()
+        other_client.force_authenticate(
+            get_user_model().objects.get(pk=self.user.pk))
+        res = other_client.get(ME_URL)
+
+        self.assertEqual(res.data['profile']['first_name'], 'new')
+        self.assertEqual(res.data['profile']['last_name'], 'name')
+
+
+class ReplicaPinCacheCheckTests(SimpleTestCase):
+
+    @override_settings(REPLICA_DATABASES=['replica1'], DEBUG=False)
+    def test_process_local_cache_refused(self):
+        """Test that replicas need a shared cache for the user pins"""
+        errors = checks.check_replica_pin_cache(None)
+
+        self.assertEqual([error.id for error in errors], ['core.E002'])
+
+    @override_settings(REPLICA_DATABASES=['replica1'], DEBUG=False, CACHES={
+        'default': {
+            'BACKEND':
+                'django.core.cache.backends.memcached.MemcachedCache',
+            'LOCATION': 'memcached:11211',
+        },
+    })
+    def test_shared_cache_allowed(self):
+        """Test that replicas are allowed with memcached"""
+        self.assertEqual(checks.check_replica_pin_cache(None), [])
+
+    @override_settings(REPLICA_DATABASES=[], DEBUG=False)
+    def test_without_replicas_allowed(self):
+        """Test that a process local cache is fine without replicas"""
+        self.assertEqual(checks.check_replica_pin_cache(None), [])
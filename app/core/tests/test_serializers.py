@@ -0,0 +1,114 @@
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import translation
+
+from rest_framework.validators import UniqueValidator
+
+from core.serializers import CachedFieldsMixin
+from doctor.serializer import ManageDoctorUserSerializer
+
+
+class CachedFieldsTests(TestCase):
+
+    def setUp(self):
+        self.doctor = get_user_model().objects.create_doctor(
+            email='doctor@curesio.com',
+            password='testpass@4',
+            username='doctor'
+        )
+
+    def test_fields_built_once(self):
+        """Test that fields of a serializer class are built once"""
+        ManageDoctorUserSerializer(self.doctor).data
+
+        with patch('rest_framework.serializers.ModelSerializer.get_fields',
+                   side_effect=AssertionError) as get_fields:
+            data = ManageDoctorUserSerializer(self.doctor).data
+
+        self.assertFalse(get_fields.called)
+        self.assertEqual(data['email'], 'doctor@curesio.com')
+        self.assertEqual(data['profile']['country'], '')
+
+    def test_same_output_as_built_fields(self):
+        """Test that cached fields serialize like newly built ones"""
+        cached = ManageDoctorUserSerializer(self.doctor).data
+
+        with patch.object(CachedFieldsMixin, 'cache_fields', False):
+            built = ManageDoctorUserSerializer(self.doctor).data
+
+        self.assertEqual(cached, built)
+
+    def test_instances_get_own_fields(self):
+        """Test that serializers get copies bound to themselves"""
+        first = ManageDoctorUserSerializer(self.doctor)
+        second = ManageDoctorUserSerializer(self.doctor)
+
+        for name, field in first.fields.items():
+            self.assertIsNot(field, second.fields[name])
+            self.assertIs(field.parent, first)
+        profile = first.fields['profile']
+        self.assertIsNot(profile.fields['country'],
+                         second.fields['profile'].fields['country'])
+        self.assertIs(profile.fields['country'].root, first)
+        speciality = first.fields['doctor_profile'].fields['speciality1']
+        self.assertIs(speciality.child_relation.root, first)
+
+    def test_choices_shared(self):
+        """Test that the country choices are built once per language"""
+        first = ManageDoctorUserSerializer(self.doctor)
+        second = ManageDoctorUserSerializer(self.doctor)
+        with translation.override('hi'):
+            translated = ManageDoctorUserSerializer(self.doctor)
+            translated = translated.fields['profile'].fields['country']
+
+        country = first.fields['profile'].fields['country']
+        self.assertIs(country.choices,
+                      second.fields['profile'].fields['country'].choices)
+        self.assertIsNot(country.choices, translated.choices)
+
+    def test_validators_not_shared(self):
+        """Test that stateful validators are copied for every serializer"""
+        def unique_validators(serializer):
+            return [validator
+                    for validator in serializer.fields['username'].validators
+                    if isinstance(validator, UniqueValidator)]
+
+        first = unique_validators(ManageDoctorUserSerializer())
+        second = unique_validators(ManageDoctorUserSerializer())
+
+        self.assertEqual(len(first), 1)
+        self.assertIsNot(first[0], second[0])
+
+    def test_concurrent_serialization(self):
+        """Test that serializers in threads do not share field state"""
+        other = get_user_model().objects.create_doctor(
+            email='other@curesio.com',
+            password='testpass@4',
+            username='other'
+        )
+        other.profile.first_name = 'other'
+        other.profile.save()
+        doctors = list(
+            get_user_model().objects.filter(is_doctor=True)
+            .select_related('profile', 'doctor_profile')
+            .prefetch_related('doctor_profile__speciality1',
+                              'doctor_profile__speciality2',
+                              'doctor_profile__speciality3',
+                              'doctor_profile__speciality4')
+        )
+        expected = {doctor.pk: ManageDoctorUserSerializer(doctor).data
+                    for doctor in doctors}
+
+        def serialize(i):
+            doctor = doctors[i % len(doctors)]
+            return doctor.pk, ManageDoctorUserSerializer(doctor).data
+
+        with self.assertNumQueries(0):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                results = list(executor.map(serialize, range(400)))
+
+        for pk, data in results:
+            self.assertEqual(data, expected[pk])
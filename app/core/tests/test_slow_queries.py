@@ -0,0 +1,129 @@
+import json
+import logging
+import os
+import tempfile
+
+from io import StringIO
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from core import slow_queries
+from core.middleware import SlowQueryLogMiddleware
+from core.models import Speciality
+
+
+class SlowQueryLogTests(TestCase):
+    """Tests for the slow query log and its report"""
+
+    def setUp(self):
+        self.client = Client()
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.log = os.path.join(self.tempdir.name, 'slow.log')
+        self.settings = override_settings(
+            SLOW_QUERY_LOG=self.log, SLOW_QUERY_THRESHOLD_MS=0)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        for handler in list(slow_queries.logger.handlers):
+            slow_queries.logger.removeHandler(handler)
+            handler.close()
+        self.tempdir.cleanup()
+
+    def records(self):
+        return list(slow_queries.read_log(self.log))
+
+    def test_fingerprint_ignores_literals(self):
+        """Test that queries differing only in literals share fingerprint"""
+        self.assertEqual(
+            slow_queries.fingerprint(
+                "SELECT * FROM t WHERE id IN (1, 2, 3) AND name = 'a'"),
+            slow_queries.fingerprint(
+                "SELECT *  FROM t WHERE id IN (%s) AND name = 'it''s'")
+        )
+
+    def test_request_queries_logged_with_view(self):
+        """Test that queries above threshold are logged with the view"""
+        Speciality.objects.create(name='ortho')
+
+        self.client.get(reverse('staff:procedure-list'))
+
+        records = self.records()
+        self.assertTrue(records)
+        self.assertEqual(records[0]['view'], 'staff:procedure-list')
+        self.assertIn('core_procedure', records[0]['sql'])
+        self.assertIn('fingerprint', records[0])
+        self.assertIn('duration_ms', records[0])
+
+    def test_source_is_deepest_project_frame(self):
+        """Test that query is attributed to the project line issuing it"""
+        slow_queries.configure_logger()
+        request = Client().get(reverse('staff:procedure-list')).wsgi_request
+        query_logger = slow_queries.SlowQueryLogger(request, 0, 1)
+
+        with connection.execute_wrapper(query_logger):
+            list(Speciality.objects.all())
+
+        source = self.records()[-1]['source']
+        self.assertTrue(source.startswith(
+            os.path.join('core', 'tests', 'test_slow_queries.py')))
+        self.assertTrue(source.endswith(
+            'in test_source_is_deepest_project_frame'))
+
+    def test_log_reopened_after_rotation(self):
+        """Test that records go to a new file once the log is rotated"""
+        self.client.get(reverse('staff:procedure-list'))
+        count = len(self.records())
+        os.rename(self.log, f'{self.log}.1')
+
+        self.client.get(reverse('staff:procedure-list'))
+
+        self.assertTrue(os.path.exists(self.log))
+        self.assertEqual(len(self.records()), count * 2)
+
+    def test_non_file_handler_replaced(self):
+        """Test that a handler without a file does not break the log"""
+        slow_queries.logger.addHandler(logging.StreamHandler(StringIO()))
+
+        self.client.get(reverse('staff:procedure-list'))
+
+        self.assertTrue(self.records())
+
+    def test_queries_below_threshold_not_logged(self):
+        """Test that fast queries are not logged"""
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=60000):
+            self.client.get(reverse('staff:procedure-list'))
+
+        self.assertEqual(self.records(), [])
+
+    def test_disabled_without_log(self):
+        """Test that middleware is not used when log is not set"""
+        with override_settings(SLOW_QUERY_LOG=None):
+            with self.assertRaises(MiddlewareNotUsed):
+                SlowQueryLogMiddleware(lambda request: None)
+
+    def test_report_groups_by_fingerprint(self):
+        """Test that report groups queries and sorts by total time"""
+        with open(self.log, 'w') as log:
+            for view, duration, sql in (
+                ('a', 5, 'SELECT 1 FROM t WHERE id = 1'),
+                ('a', 7, 'SELECT 1 FROM t WHERE id = 2'),
+                ('b', 3, "SELECT 2 FROM u WHERE name = 'x'"),
+            ):
+                log.write(json.dumps({
+                    'view': view, 'duration_ms': duration, 'sql': sql,
+                    'fingerprint': slow_queries.fingerprint(sql),
+                    'source': 'x.py:1 in f',
+                }) + '\n')
+        out = StringIO()
+
+        call_command('slow_queries', log=self.log, stdout=out)
+
+        report = out.getvalue()
+        self.assertIn('12.0 ms total, 2 queries', report)
+        self.assertIn('3.0 ms total, 1 queries', report)
+        self.assertLess(report.index('FROM t'), report.index('FROM u'))
@@ -0,0 +1,76 @@
+import hmac
+import ipaddress
+import os
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.http import HttpResponse, HttpResponseForbidden, JsonResponse
+
+from prometheus_client import CollectorRegistry, REGISTRY, \
+    CONTENT_TYPE_LATEST, generate_latest, multiprocess
+
+from core import health
+
+
+def metrics_allowed(request):
+    """
+    Checks that the client is in METRICS_ALLOWED_NETWORKS or sends
+    METRICS_TOKEN as its bearer token
+    """
+    if settings.METRICS_TOKEN:
+        token = request.META.get('HTTP_AUTHORIZATION', '')
+        if hmac.compare_digest(token.encode(),
+                               f'Bearer {settings.METRICS_TOKEN}'.encode()):
+            return True
+
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False)
+               for network in settings.METRICS_ALLOWED_NETWORKS)
+
+
+def metrics(request):
+    """
+    Exposes request metrics in prometheus text format to the clients
+    metrics_allowed lets in.
+
+    When prometheus_multiproc_dir is set every gunicorn worker writes
+    its samples there and the metrics of all workers are merged.
+    """
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+
+    if 'prometheus_multiproc_dir' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+
+    return HttpResponse(generate_latest(registry),
+                        content_type=CONTENT_TYPE_LATEST)
+
+
+def livez(request):
+    """Liveness probe, answers while the worker can serve requests"""
+    return HttpResponse('ok', content_type='text/plain')
+
+
+def readyz(request):
+    """Readiness probe, answers once the database accepts queries"""
+    try:
+        health.check_database()
+    except DatabaseError:
+        return HttpResponse('database unavailable', status=503,
+                            content_type='text/plain')
+    return HttpResponse('ok', content_type='text/plain')
+
+
+def healthz(request):
+    """Reports readiness of the database, cache and media volume"""
+    ok, checks = health.health()
+    return JsonResponse(
+        {'status': 'ok' if ok else 'error', 'checks': checks},
+        status=200 if ok else 503
+    )
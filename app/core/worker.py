@@ -0,0 +1,78 @@
+import multiprocessing
+import signal
+import threading
+
+from django.db import connections
+
+from core import jobs
+
+
+def work(stop, once, sleep, stdout=None):
+    """Runs due jobs until stop is set, or no job is due if once is set"""
+    try:
+        while not stop.is_set():
+            count = jobs.run_pending_jobs()
+            if count and stdout:
+                stdout.write(f'Ran {count} job(s)')
+
+            if once:
+                break
+            if not count:
+                stop.wait(sleep)
+    finally:
+        # Every thread and process has its own database connection
+        connections.close_all()
+
+
+def _work_in_process(stop, once, sleep):
+    """Process pool target, leaves signal handling to the parent"""
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    work(stop, once, sleep)
+
+
+def run_workers(concurrency, pool='thread', once=False, sleep=1,
+                stdout=None):
+    """
+    Runs concurrency workers in threads or forked processes and waits
+    for them to finish. SIGINT and SIGTERM stop the workers after their
+    current job.
+    """
+    if pool == 'process':
+        context = multiprocessing.get_context('fork')
+        stop = context.Event()
+        # Children must not inherit the parent's open connections
+        connections.close_all()
+        workers = [
+            context.Process(target=_work_in_process,
+                            args=(stop, once, sleep))
+            for _ in range(concurrency)
+        ]
+    elif pool == 'thread':
+        stop = threading.Event()
+        workers = [
+            threading.Thread(target=work, args=(stop, once, sleep, stdout))
+            for _ in range(concurrency)
+        ]
+    else:
+        raise ValueError(f'Unknown pool: {pool}')
+
+    def handle_signal(signum, frame):
+        stop.set()
+
+    in_main_thread = threading.current_thread() is threading.main_thread()
+    if in_main_thread:
+        previous = {
+            signum: signal.signal(signum, handle_signal)
+            for signum in (signal.SIGINT, signal.SIGTERM)
+        }
+
+    try:
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+    finally:
+        if in_main_thread:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
@@ -7,9 +7,11 @@ from django_countries.serializer_fields import CountryField
 from django_countries.serializers import CountryFieldMixin
 
 from core.models import UserProfile, Doctor, Languages, Speciality
+from core.serializers import CachedFieldsMixin, DatabaseUniqueMixin
 
 
-class ProfileSerializer(CountryFieldMixin, serializers.ModelSerializer):
+class ProfileSerializer(CachedFieldsMixin, CountryFieldMixin,
+                        serializers.ModelSerializer):
     """Serializer for user profile"""
     country = CountryField(required=True)
     first_name = serializers.CharField(required=True)
@@ -33,7 +35,7 @@ class ProfileSerializer(CountryFieldMixin, serializers.ModelSerializer):
         }
 
 
-class SpecialitySerializer(serializers.ModelSerializer):
+class SpecialitySerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for speciality model"""
 
     class Meta:
@@ -42,7 +44,7 @@ class SpecialitySerializer(serializers.ModelSerializer):
         read_only_fields = ('id', )
 
 
-class DoctorProfileSerializer(serializers.ModelSerializer):
+class DoctorProfileSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for doctor model"""
     speciality1 = serializers.PrimaryKeyRelatedField(
         many=True,
@@ -72,7 +74,8 @@ class DoctorProfileSerializer(serializers.ModelSerializer):
                   'speciality4')
 
 
-class CreateDoctorSerializer(serializers.ModelSerializer):
+class CreateDoctorSerializer(CachedFieldsMixin, DatabaseUniqueMixin,
+                             serializers.ModelSerializer):
     """Serializer for creating doctor user"""
     password = serializers.CharField(
         write_only=True,
@@ -91,83 +94,22 @@ class CreateDoctorSerializer(serializers.ModelSerializer):
             'is_doctor', 'is_staff'
         )
         read_only_fields = ('is_active', 'is_doctor', 'is_staff')
+        database_unique_fields = ('email', 'username')
 
-    def create(self, validated_data):
-        """Create a new user with encrypted password and return it."""
-        profile_data = validated_data.pop('profile', None)
-        doc_profile_data = validated_data.pop('doctor_profile', None)
-        doctor = get_user_model().objects.create_doctor(**validated_data)
-
-        # Trying to save additional details of doctor
-        # Saving profile data if persent
-        if profile_data:
-            profile = UserProfile.objects.get(user=doctor)
-            profile.first_name = profile_data.get(
-                'first_name', profile.first_name)
-            profile.last_name = profile_data.get(
-                'last_name', profile.last_name)
-            profile.phone = profile_data.get(
-                'phone', profile.phone)
-            profile.date_of_birth = profile_data.get(
-                'date_of_birth', profile.date_of_birth)
-            profile.city = profile_data.get(
-                'city', profile.city)
-            profile.country = profile_data.get(
-                'country', profile.country)
-            profile.postal_code = profile_data.get(
-                'postal_code', profile.postal_code)
-            profile.address = profile_data.get(
-                'address', profile.address)
-            profile.primary_language = profile_data.get(
-                'primary_language', profile.primary_language)
-            profile.secondary_language = profile_data.get(
-                'secondary_language', profile.secondary_language)
-            profile.tertiary_language = profile_data.get(
-                'tertiary_language', profile.tertiary_language)
-
-            profile.save()
-
-        # Check to prevent user from uploading doctor details
-        # Saving doctor profile data if present
-        if doc_profile_data:
-            doc_pro = Doctor.objects.get(user=doctor)
-            doc_pro.qualification = doc_profile_data.get(
-                'qualification', doc_pro.qualification
-            )
-            doc_pro.experience = doc_profile_data.get(
-                'experience', doc_pro.experience
-            )
-            doc_pro.highlights = doc_profile_data.get(
-                'highlights', doc_pro.highlights
-            )
-            doc_pro.save()
-
-            # Saving many to many field data if present
-            if doc_profile_data.get('speciality1', None):
-                doc_pro.speciality1.set(doc_profile_data.get(
-                    'speciality1'))
-
-            if doc_profile_data.get('speciality2', None):
-                doc_pro.speciality2.set(doc_profile_data.get(
-                    'speciality2'))
+    def validate_email(self, value):
+        """Returns the canonical email"""
+        return get_user_model().objects.normalize_email(value)
 
-            if doc_profile_data.get('speciality3', None):
-                doc_pro.speciality3.set(doc_profile_data.get(
-                    'speciality3'))
-
-            if doc_profile_data.get('speciality4', None):
-                doc_pro.speciality4.set(doc_profile_data.get(
-                    'speciality4'))
-
-            doc_pro.save()
-
-        # Refreshing the object with latest saved data
-        doctor.refresh_from_db()
-
-        return doctor
+    def create(self, validated_data):
+        """
+        Create a new doctor with encrypted password and the profiles in
+        one transaction and return it.
+        """
+        return get_user_model().objects.create_doctor(**validated_data)
 
 
-class ManageDoctorUserSerializer(serializers.ModelSerializer):
+class ManageDoctorUserSerializer(CachedFieldsMixin,
+                                 serializers.ModelSerializer):
     """Serializer for editing users details and profile details"""
     profile = ProfileSerializer(required=False)
     doctor_profile = DoctorProfileSerializer(required=False)
@@ -295,7 +237,7 @@ class AuthTokenSerializer(serializers.Serializer):
             msg = _('Unable to authenticate with provided credentials.')
 
             try:
-                doctor = get_user_model().objects.get(email=email)
+                doctor = get_user_model().objects.get_by_email(email)
                 valid_user = doctor.check_password(password)
 
                 # Creating custom error message if user is inactive but valid
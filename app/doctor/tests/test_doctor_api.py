@@ -245,6 +245,20 @@ class PublicUserApiTests(TestCase):
         self.assertNotIn('token', res.data)
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_inactive_doctor_email_in_other_case_reported(self):
+        """Test that inactive doctor is told so in any email case"""
+        get_user_model().objects.create_doctor(
+            email='test@curesio.com', password='Appis@404wrong',
+            username='testusername')
+
+        res = self.client.post(
+            TOKEN_URL, {'email': 'TEST@curesio.com',
+                        'password': 'Appis@404wrong'}
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('inactive', str(res.data['non_field_errors'][0]))
+
     def test_get_not_allowed_on_doctor_signup_url(self):
         """Test that retrieving profile details of others fails"""
         create_new_doctor(**{
@@ -0,0 +1,168 @@
+import tempfile
+from PIL import Image
+
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import UserProfile, Languages, Speciality
+from core.tests.query_budget import QueryBudgetMixin
+from doctor.tests.test_doctor_api import create_new_doctor
+
+DOCTOR_SIGNUP_URL = reverse("doctor:doctor-signup")
+TOKEN_URL = reverse("doctor:token")
+ME_URL = reverse("doctor:me")
+IMAGE_UPLOAD_URL = reverse('doctor:doctor-image-upload')
+
+
+class DoctorQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query budgets of the doctor endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.speciality = Speciality.objects.create(name='ortho')
+        self.payload = {
+            'email': 'test@curesio.com',
+            'password': 'Appis@404wrong',
+            'username': 'testusername'
+        }
+
+    def test_signup_budget(self):
+        """Test query budget of doctor signup with minimal details"""
+        payload = dict(self.payload, profile={
+            'first_name': 'first_name',
+            'last_name': 'last name',
+            'city': 'Kolkata',
+            'country': 'IN',
+            'primary_language': Languages.ENGLISH
+        })
+
+        with self.assertQueryBudget(6):
+            res = self.client.post(DOCTOR_SIGNUP_URL, payload,
+                                   format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_signup_full_details_budget(self):
+        """Test query budget of doctor signup with all specialities"""
+        specialities = [self.speciality.pk]
+        payload = dict(self.payload, profile={
+            'first_name': 'first_name',
+            'last_name': 'last name',
+            'city': 'Kolkata',
+            'country': 'IN',
+            'primary_language': Languages.ENGLISH
+        }, doctor_profile={
+            'qualification': 'MBBS',
+            'experience': 3.0,
+            'speciality1': specialities,
+            'speciality2': specialities,
+            'speciality3': specialities,
+            'speciality4': specialities
+        })
+
+        with self.assertQueryBudget(14, max_duplicates=3):
+            res = self.client.post(DOCTOR_SIGNUP_URL, payload,
+                                   format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_token_budget(self):
+        """Test query budget of doctor token"""
+        create_new_doctor(**self.payload)
+
+        with self.assertQueryBudget(2):
+            res = self.client.post(TOKEN_URL, {
+                'email': self.payload['email'],
+                'password': self.payload['password']
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_me_budget(self):
+        """Test query budget of retrieving and updating doctor"""
+        doctor = create_new_doctor(**self.payload)
+        self.client.force_authenticate(user=doctor)
+
+        # The refreshed doctor comes without profiles, like a token user
+        with self.assertQueryBudget(6):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        # Each speciality field looks up its pks and the nested profiles
+        # are saved again, which repeat with other parameters
+        with self.assertQueryBudget(20, max_duplicates=6):
+            res = self.client.patch(ME_URL, {
+                'profile': {'first_name': 'first', 'city': 'Kolkata'},
+                'doctor_profile': {
+                    'qualification': 'MBBS',
+                    'speciality1': [self.speciality.pk],
+                    'speciality2': [self.speciality.pk]
+                }
+            }, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_image_upload_budget(self):
+        """Test query budget of uploading and viewing doctor image"""
+        doctor = create_new_doctor(**self.payload)
+        self.client.force_authenticate(user=doctor)
+
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            img = Image.new('RGB', (10, 10))
+            img.save(ntf, format='JPEG')
+            ntf.seek(0)
+
+            with self.assertQueryBudget(3):
+                res = self.client.post(IMAGE_UPLOAD_URL, {'image': ntf},
+                                       format='multipart')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.addCleanup(
+            UserProfile.objects.get(user=doctor).image.delete, save=False)
+
+        with self.assertQueryBudget(3):
+            res = self.client.get(IMAGE_UPLOAD_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class DoctorSignupTransactionTests(QueryBudgetMixin, TransactionTestCase):
+    """Query budgets of doctor signup outside of a test transaction"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.payload = {
+            'email': 'test@curesio.com',
+            'password': 'Appis@404wrong',
+            'username': 'testusername',
+            'profile': {
+                'first_name': 'first_name',
+                'last_name': 'last name',
+                'city': 'Kolkata',
+                'country': 'IN',
+                'primary_language': Languages.ENGLISH
+            }
+        }
+
+    def test_signup_budget(self):
+        """Test that doctor signup inserts every row once"""
+        with self.assertQueryBudget(4):
+            res = self.client.post(DOCTOR_SIGNUP_URL, self.payload,
+                                   format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_signup_specialities_budget(self):
+        """Test that doctor signup inserts specialities in bulk"""
+        specialities = [Speciality.objects.create(name='ortho').pk]
+        payload = dict(self.payload, doctor_profile={
+            'qualification': 'MBBS',
+            'speciality1': specialities,
+            'speciality2': specialities
+        })
+
+        with self.assertQueryBudget(8, max_duplicates=1):
+            res = self.client.post(DOCTOR_SIGNUP_URL, payload,
+                                   format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
@@ -1,6 +1,16 @@
+import functools
+import string
+
+from django.contrib.postgres.aggregates import ArrayAgg
+from django.db import connections, router
+from django.db.models import Q
+
 from rest_framework import serializers
+from rest_framework.settings import api_settings
 
-from core.models import Procedure, Speciality
+from core.models import Procedure, Speciality, Hospital, Accreditation, \
+    Service, HospitalLanguage, HospitalProcedure, HospitalDoctor, User, \
+    UserProfile
 
 
 class ProcedureSerializer(serializers.ModelSerializer):
@@ -17,3 +27,285 @@ class ProcedureSerializer(serializers.ModelSerializer):
                   'days_in_hospital', 'days_in_destination',
                   'duration_minutes', 'overview', 'other_details')
         read_only_fields = ('id', )
+
+
+def procedure_values(queryset, context=None):
+    """
+    Returns the data of ProcedureSerializer(queryset, many=True) read
+    from values rows, the speciality ids aggregated in the same query.
+    No model instances are built and no fields are run per row, the
+    rendered output is the same as the serializer one.
+    """
+    fields = ProcedureSerializer.Meta.fields
+    rows = queryset.prefetch_related(None).values(
+        *(field for field in fields if field != 'speciality')
+    ).annotate(speciality_ids=ArrayAgg(
+        'speciality', ordering='speciality__id',
+        filter=Q(speciality__isnull=False)
+    ))
+
+    request = (context or {}).get('request')
+    storage = Procedure._meta.get_field('image').storage
+    data = []
+    for row in rows:
+        row['speciality'] = row.pop('speciality_ids') or []
+        image = row['image']
+        if not image:
+            row['image'] = None
+        elif api_settings.UPLOADED_FILES_USE_URL:
+            url = storage.url(image)
+            row['image'] = request.build_absolute_uri(url) \
+                if request is not None else url
+        data.append({field: row[field] for field in fields})
+    return data
+
+
+class AccreditationSerializer(serializers.ModelSerializer):
+    """Serializer for hospital accreditation model"""
+
+    class Meta:
+        model = Accreditation
+        fields = ('id', 'name', 'image')
+        read_only_fields = ('id', )
+
+
+class ServiceSerializer(serializers.ModelSerializer):
+    """Serializer for hospital service model"""
+
+    class Meta:
+        model = Service
+        fields = ('id', 'name')
+        read_only_fields = ('id', )
+
+
+class HospitalLanguageSerializer(serializers.ModelSerializer):
+    """Serializer for hospital language model"""
+
+    class Meta:
+        model = HospitalLanguage
+        fields = ('id', 'language')
+        read_only_fields = ('id', )
+
+
+class HospitalProcedureSerializer(serializers.ModelSerializer):
+    """Serializer for hospital procedure model"""
+
+    class Meta:
+        model = HospitalProcedure
+        fields = ('id', 'procedure')
+        read_only_fields = ('id', )
+
+
+class HospitalDoctorSerializer(serializers.ModelSerializer):
+    """Serializer for hospital doctor model"""
+
+    class Meta:
+        model = HospitalDoctor
+        fields = ('id', 'doctor')
+        read_only_fields = ('id', )
+
+
+class HospitalSerializer(serializers.ModelSerializer):
+    """Read only serializer for hospital model with its details"""
+    accreditation = AccreditationSerializer(many=True, read_only=True)
+    service = ServiceSerializer(many=True, read_only=True)
+    hospital_language = HospitalLanguageSerializer(many=True, read_only=True)
+    hospital_procedure = HospitalProcedureSerializer(
+        many=True, read_only=True)
+    hospital_doctor = HospitalDoctorSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Hospital
+        fields = ('id', 'name', 'state', 'country', 'postal_code',
+                  'street_name', 'location_details', 'overview',
+                  'staff_details', 'content_approver_name',
+                  'image1', 'image2', 'image3', 'image4',
+                  'image5', 'image6', 'image7', 'image8',
+                  'image9', 'image10', 'image11', 'image12',
+                  'accreditation', 'service', 'hospital_language',
+                  'hospital_procedure', 'hospital_doctor')
+        read_only_fields = fields
+
+
+class ProcedureSummarySerializer(serializers.ModelSerializer):
+    """Serializer for the procedures offered by a hospital"""
+
+    class Meta:
+        model = Procedure
+        fields = ('id', 'name')
+        read_only_fields = fields
+
+
+class DoctorSummarySerializer(serializers.ModelSerializer):
+    """Serializer for the doctors of a hospital with their names"""
+    first_name = serializers.CharField(source='profile.first_name',
+                                       read_only=True)
+    last_name = serializers.CharField(source='profile.last_name',
+                                      read_only=True)
+    image = serializers.ImageField(source='profile.image', read_only=True)
+
+    class Meta:
+        model = User
+        fields = ('id', 'first_name', 'last_name', 'image')
+        read_only_fields = fields
+
+
+class HospitalProcedureDetailSerializer(serializers.ModelSerializer):
+    """Serializer for hospital procedure model with the procedures"""
+    procedure = ProcedureSummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = HospitalProcedure
+        fields = ('id', 'procedure')
+        read_only_fields = fields
+
+
+class HospitalDoctorDetailSerializer(serializers.ModelSerializer):
+    """Serializer for hospital doctor model with the doctors"""
+    doctor = DoctorSummarySerializer(many=True, read_only=True)
+
+    class Meta:
+        model = HospitalDoctor
+        fields = ('id', 'doctor')
+        read_only_fields = fields
+
+
+class HospitalDetailSerializer(HospitalSerializer):
+    """Read only serializer for the hospital detail page"""
+    hospital_procedure = HospitalProcedureDetailSerializer(
+        many=True, read_only=True)
+    hospital_doctor = HospitalDoctorDetailSerializer(
+        many=True, read_only=True)
+
+
+# Characters filepath_to_uri leaves unquoted in storage urls
+URI_SAFE_CHARS = string.ascii_letters + string.digits + "_.-/~!*()'"
+
+
+def uri_path(column):
+    """SQL of the column percent quoted the same way as filepath_to_uri"""
+    safe = URI_SAFE_CHARS.replace("'", "''")
+    path = f"replace({column}, '\\', '/')"
+    quoted = (
+        f"(SELECT string_agg(CASE WHEN strpos('{safe}', c) > 0 THEN c "
+        f"ELSE regexp_replace(upper(encode(convert_to(c, 'UTF8'), 'hex')), "
+        f"'(..)', '%%\\1', 'g') END, '' ORDER BY i) "
+        f"FROM regexp_split_to_table({path}, '') "
+        f"WITH ORDINALITY AS chars(c, i))"
+    )
+    # Most names need no quoting, only those are split to characters
+    return f"CASE WHEN ltrim({path}, '{safe}') = '' THEN {path} " \
+        f"ELSE {quoted} END"
+
+
+def json_image(column):
+    """SQL of the url of an image column, null when there is no image"""
+    return f"CASE WHEN {column} <> '' " \
+        f"THEN %(media_url)s || {uri_path(column)} END"
+
+
+def json_object(alias, model, fields, **nested):
+    """SQL of json_build_object with fields of the model table alias"""
+    values = []
+    for field in fields:
+        if field in nested:
+            value = nested[field]
+        else:
+            column = f'{alias}.{model._meta.get_field(field).column}'
+            value = json_image(column) if field.startswith('image') \
+                else column
+        values.append(f"'{field}', {value}")
+    return f"json_build_object({', '.join(values)})"
+
+
+def json_array(element, source, where, order):
+    """SQL of the json array of element over the source rows"""
+    return (f"COALESCE((SELECT json_agg({element} ORDER BY {order}) "
+            f"FROM {source} WHERE {where}), '[]')")
+
+
+@functools.lru_cache()
+def hospital_document_sql():
+    """
+    Returns SQL of the HospitalDetailSerializer output of the hospital
+    %(id)s as JSON text. Nested rows are aggregated by json_agg
+    subqueries in id order, quoted image names are appended to
+    %(media_url)s.
+    """
+    def table(model):
+        return model._meta.db_table
+
+    def through(model, name):
+        field = model._meta.get_field(name)
+        return (field.remote_field.through._meta.db_table,
+                field.m2m_column_name(), field.m2m_reverse_name())
+
+    procedures, procedure_owner, procedure_id = through(
+        HospitalProcedure, 'procedure')
+    doctors, doctor_owner, doctor_id = through(HospitalDoctor, 'doctor')
+
+    procedure = json_object('p', Procedure,
+                            ProcedureSummarySerializer.Meta.fields)
+    doctor = json_object(
+        'd', UserProfile, DoctorSummarySerializer.Meta.fields,
+        id='u.id')
+    children = {
+        'accreditation': json_array(
+            json_object('a', Accreditation,
+                        AccreditationSerializer.Meta.fields),
+            f'{table(Accreditation)} a', 'a.hospital_id = h.id', 'a.id'),
+        'service': json_array(
+            json_object('s', Service, ServiceSerializer.Meta.fields),
+            f'{table(Service)} s', 's.hospital_id = h.id', 's.id'),
+        'hospital_language': json_array(
+            json_object('l', HospitalLanguage,
+                        HospitalLanguageSerializer.Meta.fields),
+            f'{table(HospitalLanguage)} l', 'l.hospital_id = h.id', 'l.id'),
+        'hospital_procedure': json_array(
+            json_object(
+                'hp', HospitalProcedure,
+                HospitalProcedureDetailSerializer.Meta.fields,
+                procedure=json_array(
+                    procedure,
+                    f'{table(Procedure)} p JOIN {procedures} hpp '
+                    f'ON hpp.{procedure_id} = p.id',
+                    f'hpp.{procedure_owner} = hp.id', 'p.id')),
+            f'{table(HospitalProcedure)} hp', 'hp.hospital_id = h.id',
+            'hp.id'),
+        'hospital_doctor': json_array(
+            json_object(
+                'hd', HospitalDoctor,
+                HospitalDoctorDetailSerializer.Meta.fields,
+                doctor=json_array(
+                    doctor,
+                    f'{table(User)} u JOIN {doctors} hdd '
+                    f'ON hdd.{doctor_id} = u.id '
+                    f'LEFT JOIN {table(UserProfile)} d ON d.user_id = u.id',
+                    f'hdd.{doctor_owner} = hd.id', 'u.id')),
+            f'{table(HospitalDoctor)} hd', 'hd.hospital_id = h.id',
+            'hd.id'),
+    }
+    hospital = json_object('h', Hospital,
+                           HospitalDetailSerializer.Meta.fields, **children)
+    return (f'SELECT {hospital}::text FROM {table(Hospital)} h '
+            f'WHERE h.id = %(id)s')
+
+
+def hospital_document(pk, context=None):
+    """
+    Returns the HospitalDetailSerializer data of the hospital rendered
+    to JSON by Postgres in one query, None when it does not exist.
+    """
+    request = (context or {}).get('request')
+    media_url = ''
+    if api_settings.UPLOADED_FILES_USE_URL:
+        media_url = Hospital._meta.get_field('image1').storage.url('')
+        if request is not None:
+            media_url = request.build_absolute_uri(media_url)
+
+    connection = connections[router.db_for_read(Hospital)]
+    with connection.cursor() as cursor:
+        cursor.execute(hospital_document_sql(),
+                       {'id': pk, 'media_url': media_url})
+        row = cursor.fetchone()
+    return row[0] if row else None
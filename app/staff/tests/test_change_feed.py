@@ -0,0 +1,119 @@
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models
+
+CHANGES_URL = reverse('staff:changes')
+
+
+class ChangeFeedTests(TransactionTestCase):
+    """Tests for the catalog change feed"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.speciality = models.Speciality.objects.create(name='ortho')
+
+    def test_changes_recorded_for_catalog_models(self):
+        """Test that save, delete and relation changes are recorded"""
+        procedure = models.Procedure.objects.create(
+            name='procedure1',
+            overview='bla bla bla'
+        )
+        procedure.speciality.set([self.speciality.pk])
+        procedure_id = procedure.pk
+        procedure.delete()
+
+        res = self.client.get(CHANGES_URL)
+        changes = [(c['model'], c['id'], c['action'])
+                   for c in res.data['changes']]
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(changes, [
+            ('core.speciality', self.speciality.pk, 'create'),
+            ('core.procedure', procedure_id, 'create'),
+            ('core.procedure', procedure_id, 'update'),
+            ('core.procedure', procedure_id, 'delete'),
+        ])
+        self.assertFalse(res.data['has_more'])
+
+    def test_owner_changes_recorded_for_reverse_clear(self):
+        """Test that clearing a relation from the other side is recorded"""
+        procedure = models.Procedure.objects.create(name='procedure1')
+        procedure.speciality.set([self.speciality.pk])
+        cursor = self.client.get(CHANGES_URL).data['cursor']
+
+        self.speciality.speciality.clear()
+
+        res = self.client.get(CHANGES_URL, {'since': cursor})
+        self.assertEqual(
+            [(c['model'], c['id'], c['action'])
+             for c in res.data['changes']],
+            [('core.procedure', procedure.pk, 'update')]
+        )
+
+    def test_owner_changes_recorded_for_related_delete(self):
+        """Test that deleting a related object records its owners"""
+        procedure = models.Procedure.objects.create(name='procedure1')
+        procedure.speciality.set([self.speciality.pk])
+        hospital = models.Hospital.objects.create(
+            name='hospital', state='WB', street_name='street')
+        hospital_procedure = models.HospitalProcedure.objects.create(
+            hospital=hospital)
+        hospital_procedure.procedure.set([procedure.pk])
+        speciality_id, procedure_id = self.speciality.pk, procedure.pk
+        cursor = self.client.get(CHANGES_URL).data['cursor']
+
+        self.speciality.delete()
+        procedure.delete()
+
+        res = self.client.get(CHANGES_URL, {'since': cursor})
+        self.assertEqual(
+            [(c['model'], c['id'], c['action'])
+             for c in res.data['changes']],
+            [
+                ('core.procedure', procedure_id, 'update'),
+                ('core.speciality', speciality_id, 'delete'),
+                ('core.hospitalprocedure', hospital_procedure.pk, 'update'),
+                ('core.hospital', hospital.pk, 'update'),
+                ('core.procedure', procedure_id, 'delete'),
+            ]
+        )
+
+    def test_changes_paginated_by_cursor(self):
+        """Test that passing the returned cursor gives the next page"""
+        hospital = models.Hospital.objects.create(
+            name='hospital', state='WB', street_name='street')
+        models.Service.objects.create(hospital=hospital, name='service')
+
+        first = self.client.get(CHANGES_URL, {'limit': 2})
+        second = self.client.get(
+            CHANGES_URL, {'limit': 2, 'since': first.data['cursor']})
+        third = self.client.get(
+            CHANGES_URL, {'since': second.data['cursor']})
+
+        self.assertEqual(len(first.data['changes']), 2)
+        self.assertTrue(first.data['has_more'])
+        self.assertEqual(
+            [(c['model'], c['action']) for c in second.data['changes']],
+            [('core.service', 'create'), ('core.hospital', 'update')]
+        )
+        self.assertFalse(second.data['has_more'])
+        self.assertEqual(third.data['changes'], [])
+        self.assertEqual(third.data['cursor'], second.data['cursor'])
+
+    def test_invalid_cursor_fails(self):
+        """Test that invalid cursor returns bad request"""
+        res = self.client.get(CHANGES_URL, {'since': 'abc'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_invalid_limit_fails(self):
+        """Test that a limit below one returns bad request"""
+        for limit in (0, -1, -5, 'abc'):
+            res = self.client.get(CHANGES_URL, {'limit': limit})
+
+            self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+            self.assertIn('since', res.data)
@@ -0,0 +1,156 @@
+import json
+
+import msgpack
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models
+from core.renderers import JSONRenderer
+from staff import serializer
+from staff.views import HospitalViewSet
+
+HOSPITAL_URL = reverse('staff:hospital-list')
+
+
+def get_detail_url(pk):
+    """Returns the hospital detail url"""
+    return reverse('staff:hospital-detail', args=[pk])
+
+
+class HospitalApiTests(TestCase):
+    """Tests for the hospital endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.hospital = models.Hospital.objects.create(
+            name='Hospital क',
+            state='WB',
+            street_name='street',
+            overview='Line\nbreak "quoted"',
+            image1='pictures/uploads/hospital/image1.jpg'
+        )
+        models.Accreditation.objects.create(
+            hospital=self.hospital, name='nabh',
+            image='pictures/uploads/hospital/accreditation/nabh.png')
+        models.Accreditation.objects.create(
+            hospital=self.hospital, name='jci')
+        for name in ('icu', 'blood bank'):
+            models.Service.objects.create(hospital=self.hospital, name=name)
+        models.HospitalLanguage.objects.create(
+            hospital=self.hospital, language='hi')
+
+        hospital_procedure = models.HospitalProcedure.objects.create(
+            hospital=self.hospital)
+        hospital_procedure.procedure.set([
+            models.Procedure.objects.create(name=f'procedure{i}',
+                                            overview='bla')
+            for i in range(2)
+        ])
+        models.HospitalProcedure.objects.create(hospital=self.hospital)
+
+        doctors = [
+            get_user_model().objects.create_doctor(
+                email=f'doctor{i}@curesio.com',
+                password='testpass@4',
+                username=f'doctor{i}'
+            )
+            for i in range(2)
+        ]
+        profile = doctors[0].profile
+        profile.first_name = 'Asha'
+        profile.last_name = 'Roy'
+        profile.image = 'pictures/uploads/user/asha.jpg'
+        profile.save()
+        hospital_doctor = models.HospitalDoctor.objects.create(
+            hospital=self.hospital)
+        hospital_doctor.doctor.set(doctors)
+
+        models.Hospital.objects.create(name='Other', state='DL',
+                                       street_name='street')
+
+    def serialized(self, request):
+        """Returns the detail serializer output as parsed JSON"""
+        view = HospitalViewSet(action='retrieve')
+        hospital = view.get_queryset().get(pk=self.hospital.pk)
+        data = serializer.HospitalDetailSerializer(
+            hospital, context={'request': request}).data
+        return json.loads(JSONRenderer().render(data))
+
+    def test_list_hospitals(self):
+        """Test that hospitals are listed"""
+        res = self.client.get(HOSPITAL_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual([hospital['name'] for hospital in res.data],
+                         ['Hospital क', 'Other'])
+
+    def test_detail_document_same_as_serializer(self):
+        """Test that the database document matches the serializer"""
+        res = self.client.get(get_detail_url(self.hospital.pk))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/json')
+        document = json.loads(res.content)
+        self.assertEqual(document, self.serialized(res.wsgi_request))
+        self.assertEqual(
+            document['hospital_doctor'][0]['doctor'][0]['image'],
+            'http://testserver/media/pictures/uploads/user/asha.jpg')
+        self.assertEqual(document['hospital_procedure'][1]['procedure'], [])
+
+    def test_detail_document_quotes_image_names(self):
+        """Test that image urls are quoted the same as by the storage"""
+        models.Hospital.objects.filter(pk=self.hospital.pk).update(
+            image2='pictures/uploads/hospital/छवि 100%.jpg')
+
+        res = self.client.get(get_detail_url(self.hospital.pk))
+        document = json.loads(res.content)
+
+        self.assertEqual(document, self.serialized(res.wsgi_request))
+        self.assertEqual(
+            document['image2'],
+            'http://testserver/media/pictures/uploads/hospital/'
+            '%E0%A4%9B%E0%A4%B5%E0%A4%BF%20100%25.jpg')
+
+    def test_detail_document_single_query(self):
+        """Test that the detail page is read with one query"""
+        with self.assertNumQueries(1):
+            res = self.client.get(get_detail_url(self.hospital.pk))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_detail_msgpack_serialized(self):
+        """Test that msgpack detail falls back to the serializer"""
+        res = self.client.get(get_detail_url(self.hospital.pk),
+                              HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(msgpack.unpackb(res.content),
+                         self.serialized(res.wsgi_request))
+
+    def test_detail_missing_hospital(self):
+        """Test that a missing hospital is not found"""
+        for pk in (0, 'abc'):
+            res = self.client.get(get_detail_url(pk))
+
+            self.assertEqual(res.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_create_hospital_not_allowed(self):
+        """Test that hospitals are read only"""
+        staff = get_user_model().objects.create_user(
+            email='staff@curesio.com',
+            password='testpass@4',
+            username='staffuser',
+        )
+        staff.is_staff = True
+        staff.save()
+        self.client.force_authenticate(staff)
+
+        res = self.client.post(HOSPITAL_URL, {'name': 'new'})
+
+        self.assertEqual(res.status_code,
+                         status.HTTP_405_METHOD_NOT_ALLOWED)
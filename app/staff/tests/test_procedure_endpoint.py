@@ -1,14 +1,19 @@
+import json
 import tempfile
 from PIL import Image
 
+import msgpack
+
 from django.contrib.auth import get_user_model
-from django.test import TestCase
+from django.db.models import Prefetch
+from django.test import TestCase, RequestFactory
 from django.urls import reverse
 
 from rest_framework import status
 from rest_framework.test import APIClient
 
 from core import models
+from core.renderers import JSONRenderer
 from staff import serializer
 
 PROCEDURE_URL = reverse("staff:procedure-list")
@@ -73,6 +78,23 @@ class PublicUserAPITests(TestCase):
         self.assertEqual(len(res.data), 2)
         self.assertEqual(res.data, ser.data)
 
+    def test_list_procedure_msgpack(self):
+        """Test that procedures are rendered as msgpack when accepted"""
+        procedure = models.Procedure.objects.create(
+            name='procedure1',
+            overview='bla bla bla'
+        )
+        procedure.speciality.set([self.speciality.pk])
+
+        json_res = self.client.get(PROCEDURE_URL)
+        res = self.client.get(PROCEDURE_URL,
+                              HTTP_ACCEPT='application/msgpack')
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(res['Content-Type'], 'application/msgpack')
+        self.assertEqual(msgpack.unpackb(res.content),
+                         json.loads(json_res.content))
+
     def test_unauthenticated_user_post_request_failure(self):
         """Test that post request fails for unauthenticated user"""
 
@@ -389,3 +411,70 @@ class ProcedureImageUploadTests(TestCase):
         )
 
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class ProcedureValuesTests(TestCase):
+    """Tests for the procedure list fast path"""
+
+    def setUp(self):
+        self.specialities = [
+            models.Speciality.objects.create(name=f'speciality{i}')
+            for i in range(3)
+        ]
+        with_all = models.Procedure.objects.create(
+            name='Knee replacement क',
+            days_in_hospital=2,
+            duration_minutes=90,
+            overview='<strong>Bla</strong> bla "bla"',
+            other_details='line\nbreak',
+            image='uploads/procedure/knee image.jpg'
+        )
+        with_all.speciality.set(reversed(self.specialities))
+        with_one = models.Procedure.objects.create(
+            name='Hip replacement', overview='bla')
+        with_one.speciality.set(self.specialities[1:2])
+        models.Procedure.objects.create(name='Checkup', overview='bla')
+
+    def assertSameOutput(self, context):
+        queryset = models.Procedure.objects.prefetch_related(Prefetch(
+            'speciality', queryset=models.Speciality.objects.order_by('id')
+        )).order_by('-name')
+
+        expected = serializer.ProcedureSerializer(
+            queryset, many=True, context=context).data
+        data = serializer.procedure_values(queryset, context)
+
+        self.assertEqual(JSONRenderer().render(data),
+                         JSONRenderer().render(expected))
+
+    def test_same_output_as_serializer(self):
+        """Test that the fast path renders like the serializer"""
+        self.assertSameOutput({})
+
+    def test_same_output_with_request(self):
+        """Test that image urls are absolute like the serializer ones"""
+        self.assertSameOutput({'request': RequestFactory().get('/')})
+
+    def test_speciality_ids(self):
+        """Test that procedures without specialities get an empty list"""
+        data = serializer.procedure_values(
+            models.Procedure.objects.order_by('name'))
+
+        self.assertEqual([row['speciality'] for row in data], [
+            [],
+            [self.specialities[1].pk],
+            [speciality.pk for speciality in self.specialities],
+        ])
+
+    def test_list_endpoint_single_query(self):
+        """Test that the list endpoint returns the fast path output"""
+        with self.assertNumQueries(1):
+            res = APIClient().get(PROCEDURE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            res.content,
+            JSONRenderer().render(serializer.procedure_values(
+                models.Procedure.objects.order_by('-name'),
+                {'request': res.wsgi_request}))
+        )
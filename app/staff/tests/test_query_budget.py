@@ -0,0 +1,78 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models
+from core.tests.query_budget import QueryBudgetMixin
+from staff.tests.test_procedure_endpoint import create_new_user
+
+PROCEDURE_URL = reverse("staff:procedure-list")
+
+
+def create_procedures(count, specialities):
+    """Creates procedures linked to the given specialities"""
+    for i in range(count):
+        procedure = models.Procedure.objects.create(
+            name=f'procedure{i}',
+            overview='bla bla bla'
+        )
+        procedure.speciality.set(specialities)
+
+
+class ProcedureQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query budgets of the procedure endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.specialities = [
+            models.Speciality.objects.create(name=f'speciality{i}')
+            for i in range(2)
+        ]
+
+    def test_list_budget_does_not_grow_with_rows(self):
+        """Test that listing procedures runs a fixed number of queries"""
+        create_procedures(10, self.specialities)
+
+        with self.assertQueryBudget(1):
+            res = self.client.get(PROCEDURE_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data), 10)
+
+    def test_repeated_lookups_with_other_parameters_fail(self):
+        """Test that an N+1 loop over different pks exceeds the budget"""
+        with self.assertRaisesMessage(AssertionError, '1 duplicates'):
+            with self.assertQueryBudget(2):
+                for speciality in self.specialities:
+                    models.Speciality.objects.get(pk=speciality.pk)
+
+    def test_detail_budget(self):
+        """Test query budget of retrieving a procedure"""
+        create_procedures(1, self.specialities)
+        procedure = models.Procedure.objects.get()
+
+        with self.assertQueryBudget(2):
+            res = self.client.get(
+                reverse('staff:procedure-detail', args=[procedure.pk]))
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_create_budget(self):
+        """Test query budget of creating a procedure by staff"""
+        staff = create_new_user()
+        staff.is_staff = True
+        staff.save()
+        self.client.force_authenticate(user=staff)
+
+        # Specialities are looked up one by one, and the create and the
+        # relation update are written to the change outbox
+        with self.assertQueryBudget(12, max_duplicates=2):
+            res = self.client.post(PROCEDURE_URL, {
+                'name': 'knee replacement',
+                'speciality': [s.pk for s in self.specialities],
+                'overview': 'bla bla bla'
+            }, format='json')
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
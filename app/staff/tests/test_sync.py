@@ -0,0 +1,62 @@
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import models
+
+SYNC_URL = reverse('staff:sync')
+
+
+class SyncApiTests(TransactionTestCase):
+    """Tests for delta sync of the catalog"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.speciality = models.Speciality.objects.create(name='ortho')
+        self.procedure = models.Procedure.objects.create(
+            name='procedure1',
+            overview='bla bla bla'
+        )
+        self.hospital = models.Hospital.objects.create(
+            name='hospital', state='WB', street_name='street')
+
+    def test_sync_without_cursor_returns_catalog(self):
+        """Test that first sync returns the whole catalog"""
+        res = self.client.get(SYNC_URL)
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(res.data['procedures']), 1)
+        self.assertEqual(len(res.data['specialities']), 1)
+        self.assertEqual(len(res.data['hospitals']), 1)
+        self.assertNotEqual(res.data['cursor'], '0-0')
+
+    def test_sync_returns_only_changes_since_cursor(self):
+        """Test that sync returns changed records and tombstones"""
+        cursor = self.client.get(SYNC_URL).data['cursor']
+
+        models.Service.objects.create(hospital=self.hospital, name='icu')
+        procedure_id = self.procedure.pk
+        self.procedure.delete()
+
+        res = self.client.get(SYNC_URL, {'since': cursor})
+        hospitals = res.data['hospitals']
+
+        self.assertEqual(res.data['procedures'], [])
+        self.assertEqual(res.data['specialities'], [])
+        self.assertEqual(res.data['deleted']['procedures'], [procedure_id])
+        self.assertEqual(len(hospitals), 1)
+        self.assertEqual(hospitals[0]['service'][0]['name'], 'icu')
+        self.assertFalse(res.data['has_more'])
+
+        res = self.client.get(SYNC_URL, {'since': res.data['cursor']})
+
+        self.assertEqual(res.data['hospitals'], [])
+        self.assertEqual(res.data['deleted']['procedures'], [])
+
+    def test_sync_invalid_cursor_fails(self):
+        """Test that invalid cursor returns bad request"""
+        res = self.client.get(SYNC_URL, {'since': '12'})
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
@@ -8,7 +8,10 @@ app_name = 'staff'
 
 router = DefaultRouter()
 router.register('procedure', views.ProcedureViewSet)
+router.register('hospital', views.HospitalViewSet)
 
 urlpatterns = [
      path('', include(router.urls)),
+     path('changes/', views.ChangeFeedView.as_view(), name='changes'),
+     path('sync/', views.SyncView.as_view(), name='sync'),
 ]
@@ -1,12 +1,24 @@
-from django.db import IntegrityError
+from django.db import IntegrityError, connections, router
+from django.db.models import Prefetch
+from django.http import Http404, HttpResponse
 from django.utils.translation import ugettext_lazy as _
 
 from rest_framework import authentication, permissions, status
-from rest_framework.viewsets import ModelViewSet
+from rest_framework.viewsets import ModelViewSet, ReadOnlyModelViewSet
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
 from . import serializer
 from core import models
+from core.caching import CatalogCacheMixin
+from core.routers import ReplicaReadMixin
+from doctor.serializer import SpecialitySerializer
+
+
+def parse_cursor(cursor):
+    """Returns transaction id and change id of a change feed cursor"""
+    transaction_id, change_id = cursor.split('-')
+    return int(transaction_id), int(change_id)
 
 
 class IsStaffOrReadOnly(permissions.BasePermission):
@@ -20,7 +32,7 @@ class IsStaffOrReadOnly(permissions.BasePermission):
             return False
 
 
-class ProcedureViewSet(ModelViewSet):
+class ProcedureViewSet(CatalogCacheMixin, ReplicaReadMixin, ModelViewSet):
     """Manage procedure in database by staff users"""
     authentication_classes = (authentication.TokenAuthentication, )
     permission_classes = (IsStaffOrReadOnly, )
@@ -29,7 +41,24 @@ class ProcedureViewSet(ModelViewSet):
 
     def get_queryset(self):
         """Return queryset ordered by name"""
-        return self.queryset.order_by("-name")
+        # Speciality ids are listed in id order, like procedure_values
+        return self.queryset.prefetch_related(Prefetch(
+            'speciality', queryset=models.Speciality.objects.order_by('id')
+        )).order_by("-name")
+
+    def list(self, request, *args, **kwargs):
+        return self.cached_response(self.list_values, request,
+                                    *args, **kwargs)
+
+    def list_values(self, request, *args, **kwargs):
+        """Lists procedures without building serializers per row"""
+        queryset = self.filter_queryset(self.get_queryset())
+        return Response(serializer.procedure_values(
+            queryset, self.get_serializer_context()))
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached_response(super().retrieve, request,
+                                    *args, **kwargs)
 
     def create(self, request, *args, **kwargs):
         """Overriding create method to raise integrity error"""
@@ -39,3 +68,205 @@ class ProcedureViewSet(ModelViewSet):
         except IntegrityError:
             msg = {'name': [_('Procedure with this name already exists.')]}
             return Response(msg, status=status.HTTP_400_BAD_REQUEST)
+
+
+class HospitalViewSet(ReplicaReadMixin, ReadOnlyModelViewSet):
+    """
+    Lists hospitals and retrieves the hospital detail page.
+
+    On Postgres a JSON detail is built as one document by the database
+    and sent as it is, skipping serialization in Python.
+    """
+    authentication_classes = (authentication.TokenAuthentication, )
+    permission_classes = (IsStaffOrReadOnly, )
+    queryset = models.Hospital.objects.all()
+
+    def get_serializer_class(self):
+        if self.action == 'retrieve':
+            return serializer.HospitalDetailSerializer
+        return serializer.HospitalSerializer
+
+    def get_queryset(self):
+        """Return queryset with the details of the hospitals"""
+        queryset = self.queryset.prefetch_related(
+            Prefetch('accreditation',
+                     models.Accreditation.objects.order_by('id')),
+            Prefetch('service', models.Service.objects.order_by('id')),
+            Prefetch('hospital_language',
+                     models.HospitalLanguage.objects.order_by('id')),
+        ).order_by('name', 'id')
+        if self.action != 'retrieve':
+            return queryset.prefetch_related('hospital_procedure__procedure',
+                                             'hospital_doctor__doctor')
+        return queryset.prefetch_related(
+            Prefetch('hospital_procedure',
+                     models.HospitalProcedure.objects.order_by('id')),
+            Prefetch('hospital_procedure__procedure',
+                     models.Procedure.objects.order_by('id')),
+            Prefetch('hospital_doctor',
+                     models.HospitalDoctor.objects.order_by('id')),
+            Prefetch('hospital_doctor__doctor',
+                     models.User.objects.select_related('profile')
+                     .order_by('id')),
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        connection = connections[router.db_for_read(models.Hospital)]
+        if connection.vendor != 'postgresql' or \
+                request.accepted_media_type != 'application/json':
+            return super().retrieve(request, *args, **kwargs)
+
+        try:
+            pk = int(kwargs['pk'])
+        except ValueError:
+            raise Http404
+        document = serializer.hospital_document(
+            pk, self.get_serializer_context())
+        if document is None:
+            raise Http404
+        return HttpResponse(document, content_type='application/json')
+
+
+class ChangeFeedView(APIView):
+    """
+    Lists catalog changes after the since cursor, oldest first.
+
+    Consumers store the returned cursor and pass it as since on the
+    next request to sync incrementally.
+    """
+    authentication_classes = (authentication.TokenAuthentication, )
+    permission_classes = (IsStaffOrReadOnly, )
+    default_limit = 100
+    max_limit = 1000
+
+    def get(self, request, format=None):
+        since = request.query_params.get('since', '0-0')
+        try:
+            transaction_id, change_id = parse_cursor(since)
+            limit = min(int(request.query_params.get(
+                'limit', self.default_limit)), self.max_limit)
+            if limit < 1:
+                raise ValueError(limit)
+        except ValueError:
+            msg = {'since': [_('Invalid cursor or limit.')]}
+            return Response(msg, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = list(
+            models.Change.objects.committed()
+            .after(transaction_id, change_id)[:limit + 1]
+        )
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+
+        return Response({
+            'changes': [
+                {
+                    'model': change.model,
+                    'id': change.object_id,
+                    'action': change.action,
+                    'created_date': change.created_date,
+                }
+                for change in changes
+            ],
+            'cursor': changes[-1].cursor if changes else since,
+            'has_more': has_more,
+        })
+
+
+class SyncView(CatalogCacheMixin, APIView):
+    """
+    Delta sync of the procedure, speciality and hospital catalog.
+
+    Without since the whole catalog is returned. With since only the
+    records changed after that cursor are returned, together with the
+    ids of deleted records. Clients store the returned cursor and sync
+    again while has_more is true.
+    """
+    authentication_classes = (authentication.TokenAuthentication, )
+    permission_classes = (IsStaffOrReadOnly, )
+    max_changes = 1000
+
+    # Change model label: response key, queryset, serializer
+    catalog = {
+        'core.procedure': (
+            'procedures',
+            models.Procedure.objects.prefetch_related('speciality'),
+            serializer.ProcedureSerializer
+        ),
+        'core.speciality': (
+            'specialities',
+            models.Speciality.objects.all(),
+            SpecialitySerializer
+        ),
+        'core.hospital': (
+            'hospitals',
+            models.Hospital.objects.prefetch_related(
+                'accreditation', 'service', 'hospital_language',
+                'hospital_procedure__procedure', 'hospital_doctor__doctor'
+            ),
+            serializer.HospitalSerializer
+        ),
+    }
+
+    def get(self, request, format=None):
+        return self.cached_response(self.get_catalog, request)
+
+    def get_catalog(self, request):
+        """Returns the catalog snapshot or the changes since the cursor"""
+        since = request.query_params.get('since')
+        if since is None:
+            return Response(self.get_snapshot())
+
+        try:
+            transaction_id, change_id = parse_cursor(since)
+        except ValueError:
+            msg = {'since': [_('Invalid cursor.')]}
+            return Response(msg, status=status.HTTP_400_BAD_REQUEST)
+
+        changes = list(
+            models.Change.objects.committed()
+            .filter(model__in=self.catalog)
+            .after(transaction_id, change_id)[:self.max_changes + 1]
+        )
+        has_more = len(changes) > self.max_changes
+        changes = changes[:self.max_changes]
+
+        # Only the last action of every object matters
+        last_action = {
+            (change.model, change.object_id): change.action
+            for change in changes
+        }
+        data = {'cursor': changes[-1].cursor if changes else since,
+                'has_more': has_more,
+                'deleted': {}}
+        for label, (key, queryset, serializer_class) in self.catalog.items():
+            changed = [object_id
+                       for (model, object_id), action in last_action.items()
+                       if model == label and action != models.Change.DELETE]
+            data[key] = serializer_class(
+                queryset.filter(pk__in=changed), many=True,
+                context={'request': request}).data
+            data['deleted'][key] = [
+                object_id
+                for (model, object_id), action in last_action.items()
+                if model == label and action == models.Change.DELETE
+            ]
+
+        return Response(data)
+
+    def get_snapshot(self):
+        """Returns the whole catalog with the cursor to sync from"""
+        # Reading the cursor first, changes made while the catalog is
+        # read are sent again on the next sync
+        latest = models.Change.objects.committed()\
+            .order_by('-transaction_id', '-id').first()
+        data = {'cursor': latest.cursor if latest else '0-0',
+                'has_more': False,
+                'deleted': {}}
+        for key, queryset, serializer_class in self.catalog.values():
+            data[key] = serializer_class(
+                queryset.all(), many=True,
+                context={'request': self.request}).data
+            data['deleted'][key] = []
+
+        return data
@@ -7,9 +7,11 @@ from django_countries.serializer_fields import CountryField
 from django_countries.serializers import CountryFieldMixin
 
 from core.models import UserProfile
+from core.serializers import CachedFieldsMixin, DatabaseUniqueMixin
 
 
-class ProfileSerializer(CountryFieldMixin, serializers.ModelSerializer):
+class ProfileSerializer(CachedFieldsMixin, CountryFieldMixin,
+                        serializers.ModelSerializer):
     """Serializer for user profile"""
     country = CountryField()
 
@@ -23,7 +25,8 @@ class ProfileSerializer(CountryFieldMixin, serializers.ModelSerializer):
         read_only_fields = ('image', )
 
 
-class CreateUserSerializer(serializers.ModelSerializer):
+class CreateUserSerializer(CachedFieldsMixin, DatabaseUniqueMixin,
+                           serializers.ModelSerializer):
     """Serializer for creating user"""
     password = serializers.CharField(
         write_only=True,
@@ -39,6 +42,11 @@ class CreateUserSerializer(serializers.ModelSerializer):
             'is_active', 'is_doctor', 'is_staff'
         )
         read_only_fields = ('is_active', 'is_doctor', 'is_staff')
+        database_unique_fields = ('email', 'username')
+
+    def validate_email(self, value):
+        """Returns the canonical email"""
+        return get_user_model().objects.normalize_email(value)
 
     def create(self, validated_data):
         """Create a new user with encrypted password and return it."""
@@ -46,7 +54,7 @@ class CreateUserSerializer(serializers.ModelSerializer):
         return get_user_model().objects.create_user(**validated_data)
 
 
-class ManageUserSerializer(serializers.ModelSerializer):
+class ManageUserSerializer(CachedFieldsMixin, serializers.ModelSerializer):
     """Serializer for editing users details and profile details"""
     profile = ProfileSerializer(required=False)
 
@@ -0,0 +1,101 @@
+import tempfile
+from PIL import Image
+
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+
+from rest_framework.test import APIClient
+from rest_framework import status
+
+from core.models import UserProfile
+from core.tests.query_budget import QueryBudgetMixin
+from user.tests.test_user_api import create_new_user
+
+USER_SIGNUP_URL = reverse("user:user-signup")
+TOKEN_URL = reverse("user:token")
+ME_URL = reverse("user:me")
+IMAGE_UPLOAD_URL = reverse('user:user-image-upload')
+
+
+class UserQueryBudgetTests(QueryBudgetMixin, TestCase):
+    """Query budgets of the user endpoints"""
+
+    def setUp(self):
+        self.client = APIClient()
+        self.payload = {
+            'email': 'test@curesio.com',
+            'password': 'Appis@404wrong',
+            'username': 'testusername'
+        }
+
+    def test_signup_budget(self):
+        """Test query budget of user signup"""
+        with self.assertQueryBudget(5):
+            res = self.client.post(USER_SIGNUP_URL, self.payload)
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+
+    def test_token_budget(self):
+        """Test query budget of user token"""
+        create_new_user(**self.payload)
+
+        with self.assertQueryBudget(2):
+            res = self.client.post(TOKEN_URL, {
+                'email': self.payload['email'],
+                'password': self.payload['password']
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_me_budget(self):
+        """Test query budget of retrieving and updating user"""
+        user = create_new_user(**self.payload)
+        self.client.force_authenticate(user=user)
+
+        with self.assertQueryBudget(0):
+            res = self.client.get(ME_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+        # The user and the profile rows are saved again with new values
+        with self.assertQueryBudget(6, max_duplicates=3):
+            res = self.client.patch(ME_URL, {
+                'username': 'newusername',
+                'profile': {'first_name': 'first', 'city': 'Kolkata'}
+            }, format='json')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+    def test_image_upload_budget(self):
+        """Test query budget of uploading and viewing user image"""
+        user = create_new_user(**self.payload)
+        self.client.force_authenticate(user=user)
+
+        with tempfile.NamedTemporaryFile(suffix='.jpg') as ntf:
+            img = Image.new('RGB', (10, 10))
+            img.save(ntf, format='JPEG')
+            ntf.seek(0)
+
+            with self.assertQueryBudget(3):
+                res = self.client.post(IMAGE_UPLOAD_URL, {'image': ntf},
+                                       format='multipart')
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.addCleanup(
+            UserProfile.objects.get(user=user).image.delete, save=False)
+
+        with self.assertQueryBudget(3):
+            res = self.client.get(IMAGE_UPLOAD_URL)
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+
+
+class UserSignupTransactionTests(QueryBudgetMixin, TransactionTestCase):
+    """Query budget of user signup outside of a test transaction"""
+
+    def test_signup_budget(self):
+        """Test that user signup inserts every row once"""
+        with self.assertQueryBudget(3):
+            res = APIClient().post(USER_SIGNUP_URL, {
+                'email': 'test@curesio.com',
+                'password': 'Appis@404wrong',
+                'username': 'testusername'
+            })
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
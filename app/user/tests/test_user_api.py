@@ -1,6 +1,8 @@
 import tempfile
 from PIL import Image
 
+import msgpack
+
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 from django.urls import reverse
@@ -62,6 +64,62 @@ class PublicUserApiTests(TestCase):
 
         self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
 
+    def test_user_exists_in_other_case_fails(self):
+        """Test that signing up with a taken email in other case fails"""
+        create_new_user(email='abck22@gmail.com', password='Test@123life',
+                        username='testuser4')
+
+        res = self.client.post(USER_SIGNUP_URL, {
+            'email': 'AbCk22@Gmail.com',
+            'password': 'Test@123lifeisabitch',
+            'username': 'testuser5'
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('email', res.data)
+        self.assertEqual(get_user_model().objects.count(), 1)
+
+    def test_username_taken_fails(self):
+        """Test that signing up with a taken username fails"""
+        create_new_user(email='abck22@gmail.com', password='Test@123life',
+                        username='testuser4')
+
+        res = self.client.post(USER_SIGNUP_URL, {
+            'email': 'other@gmail.com',
+            'password': 'Test@123lifeisabitch',
+            'username': 'testuser4'
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(list(res.data), ['username'])
+        self.assertEqual(res.data['username'][0].code, 'unique')
+        self.assertEqual(get_user_model().objects.count(), 1)
+
+    def test_email_and_username_taken_fails(self):
+        """Test that both taken values are reported"""
+        create_new_user(email='abck22@gmail.com', password='Test@123life',
+                        username='testuser4')
+
+        res = self.client.post(USER_SIGNUP_URL, {
+            'email': 'abck22@gmail.com',
+            'password': 'Test@123lifeisabitch',
+            'username': 'testuser4'
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(set(res.data), {'email', 'username'})
+
+    def test_create_user_stores_canonical_email(self):
+        """Test that the email of a new user is stored in lowercase"""
+        res = self.client.post(USER_SIGNUP_URL, {
+            'email': 'Test.User@CuresIO.com',
+            'password': 'Appis@404wrong',
+            'username': 'testusername'
+        })
+
+        self.assertEqual(res.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(res.data['email'], 'test.user@curesio.com')
+
     def test_user_creation_password_too_short(self):
         """Test that user creation with password too short fails"""
         payload = {
@@ -90,6 +148,33 @@ class PublicUserApiTests(TestCase):
         self.assertEqual(res.status_code, status.HTTP_200_OK)
         self.assertIn('token', res.data)
 
+    def test_create_token_email_in_other_case(self):
+        """Test that token is created for email typed in other case"""
+        create_new_user(email='test@gmail.com', password='test@1234is_bad',
+                        username='testusername')
+
+        res = self.client.post(TOKEN_URL, {'email': ' Test@GMAIL.com',
+                                           'password': 'test@1234is_bad'})
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', res.data)
+
+    def test_create_token_msgpack(self):
+        """Test that token requests and responses can be msgpack"""
+        create_new_user(email='test@gmail.com', password='test@1234is_bad',
+                        username='testusername')
+
+        res = self.client.post(
+            TOKEN_URL,
+            msgpack.packb({'email': 'test@gmail.com',
+                           'password': 'test@1234is_bad'}),
+            content_type='application/msgpack',
+            HTTP_ACCEPT='application/msgpack'
+        )
+
+        self.assertEqual(res.status_code, status.HTTP_200_OK)
+        self.assertIn('token', msgpack.unpackb(res.content))
+
     def test_create_token_invalid_credentials(self):
         """Test that no token is created invalid credentials"""
         payload = {
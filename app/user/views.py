@@ -6,11 +6,13 @@ from rest_framework import generics, authentication, permissions,\
 from rest_framework.authtoken.views import ObtainAuthToken
 from rest_framework.settings import api_settings
 from rest_framework.response import Response
-from rest_framework.parsers import MultiPartParser, JSONParser
+from rest_framework.parsers import MultiPartParser
 from rest_framework.views import APIView
 
 from . import serializer
-from core import models
+from core import models, jobs
+from core.parsers import JSONParser, MessagePackParser
+from core.routers import ReplicaReadMixin
 
 
 def check_file_size_limit(picture_size, size_limit):
@@ -34,9 +36,11 @@ class CreateTokenView(ObtainAuthToken):
     """Create a new auth token for user"""
     serializer_class = serializer.AuthTokenSerializer
     renderer_classes = api_settings.DEFAULT_RENDERER_CLASSES
+    parser_classes = api_settings.DEFAULT_PARSER_CLASSES
 
 
-class ManageUserView(generics.RetrieveUpdateAPIView):
+class ManageUserView(ReplicaReadMixin,
+                     generics.RetrieveUpdateAPIView):
     """Manage the authenticated user"""
     serializer_class = serializer.ManageUserSerializer
     authentication_classes = [authentication.TokenAuthentication, ]
@@ -47,12 +51,12 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
         return self.request.user
 
 
-class UserImageUploadView(APIView):
+class UserImageUploadView(ReplicaReadMixin, APIView):
     """View to upload or view image for user"""
     serializer_class = serializer.UserImageUploadSerializer
     authentication_classes = [authentication.TokenAuthentication, ]
     permission_classes = [permissions.IsAuthenticated, ]
-    parser_classes = [JSONParser, MultiPartParser]
+    parser_classes = [JSONParser, MessagePackParser, MultiPartParser]
 
     def get(self, request, format=None):
         """To get user profile picture"""
@@ -98,12 +102,14 @@ class UserImageUploadView(APIView):
                     res = {'image': [msg]}
                     return Response(res, status=status.HTTP_400_BAD_REQUEST)
 
-                # Deleting the old image before uploading new image
-                if user_profile.image:
-                    user_profile.image.delete()
+                old_image = user_profile.image.name
 
                 # Saving the model
                 ser.save(user=user)
+
+                # Deleting the old image in background
+                if old_image:
+                    jobs.enqueue('core.delete_files', names=[old_image])
             return_ser_data = {'id': ser.data.get('id'),
                                'image': ser.data.get('image')}
             return Response(return_ser_data, status=status.HTTP_200_OK)